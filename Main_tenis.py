@@ -1,4 +1,4 @@
-from flask import Flask, render_template_string, request, jsonify, Response, render_template, redirect, url_for
+from flask import Flask, jsonify, Response, render_template, redirect, url_for
 from flask_jwt_extended import JWTManager, jwt_required, get_jwt_identity
 from flask_cors import CORS
 from controllers.torneo_controller import torneo_bp
@@ -7,14 +7,14 @@ from controllers.usuario_controller import usuario_bp
 from controllers.inscripcion_controller import inscripcion_bp
 from controllers.cuadro_controller import cuadro_bp
 from controllers.notificacion_controller import notificacion_bp
-from controllers.auth_controller import auth_bp, register_jwt_error_handlers
-from config.jwt_config import JWT_SECRET_KEY, JWT_ACCESS_TOKEN_EXPIRES
-from config.database import get_db_session
-from models.usuario_model import Usuario
-from models.torneo_model import Torneo
-from models.partido_model import Partido
-from models.inscripcion_model import Inscripcion
-import requests
+from controllers.stream_controller import stream_bp
+from controllers.auth_controller import auth_bp, register_jwt_error_handlers, register_jwt_blocklist
+from config.jwt_config import JWT_SECRET_KEY, JWT_ACCESS_TOKEN_EXPIRES, JWT_REFRESH_TOKEN_EXPIRES
+from config.database import get_db_session, register_db_session_teardown
+from services.estadisticas_service import EstadisticasService
+from services.recordatorios_job import iniciar_programador_recordatorios
+from services.entrega_notificaciones import iniciar_pool_entregas
+import os
 
 app = Flask(__name__)
 
@@ -24,10 +24,27 @@ CORS(app, origins=['*'], methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'], al
 # Configurar JWT
 app.config['JWT_SECRET_KEY'] = JWT_SECRET_KEY
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = JWT_ACCESS_TOKEN_EXPIRES
+app.config['JWT_REFRESH_TOKEN_EXPIRES'] = JWT_REFRESH_TOKEN_EXPIRES
 jwt = JWTManager(app)
 
 # Registrar manejadores de errores JWT
 register_jwt_error_handlers(app)
+register_jwt_blocklist(jwt)
+
+# Cerrar la sesión de base de datos al final de cada request
+register_db_session_teardown(app)
+
+def iniciar_tareas_segundo_plano():
+    """
+    Inicia los hilos de fondo del proceso que atiende las peticiones. No se llama al
+    importar el módulo; con un servidor WSGI debe llamarse una vez por worker
+    (por ejemplo desde el hook post_worker_init de gunicorn).
+    """
+    # Job diario de recordatorios de partidos (solo si RECORDATORIOS_HORA está configurada)
+    iniciar_programador_recordatorios()
+
+    # Entrega en segundo plano de la bandeja de salida de notificaciones
+    iniciar_pool_entregas()
 
 # Registrar todos los blueprints
 app.register_blueprint(auth_bp, url_prefix='/api')
@@ -37,6 +54,7 @@ app.register_blueprint(usuario_bp, url_prefix='/api')
 app.register_blueprint(inscripcion_bp, url_prefix='/api')
 app.register_blueprint(cuadro_bp, url_prefix='/api')
 app.register_blueprint(notificacion_bp, url_prefix='/api')
+app.register_blueprint(stream_bp, url_prefix='/api')
 
 # Rutas del Dashboard
 @app.route('/')
@@ -60,42 +78,27 @@ def dashboard_stats():
     """API para obtener estadísticas del dashboard"""
     try:
         session = get_db_session()
-        
-        # Estadísticas básicas
-        total_usuarios = session.query(Usuario).filter(Usuario.activo == True).count()
-        total_torneos = session.query(Torneo).count()
-        total_partidos = session.query(Partido).count()
-        total_inscripciones = session.query(Inscripcion).count()
-        
-        # Torneos activos (en_curso)
-        torneos_activos = session.query(Torneo).filter(Torneo.estado == 'en_curso').count()
-        
-        # Inscripciones pendientes
-        inscripciones_pendientes = session.query(Inscripcion).filter(Inscripcion.estado == 'pendiente').count()
-        
+        service = EstadisticasService(session)
+
+        # Estadísticas globales (una consulta, cacheadas con TTL corto)
+        globales = service.obtener_estadisticas_globales()
+
         # Estadísticas del usuario actual
         user_id = get_jwt_identity()
-        user_torneos = session.query(Inscripcion).filter(
-            Inscripcion.deportista_id == user_id
-        ).count()
-        
-        user_partidos = session.query(Partido).filter(
-            (Partido.deportista1_id == user_id) | (Partido.deportista2_id == user_id)
-        ).count()
+        usuario = service.obtener_estadisticas_usuario(user_id)
         
         stats = {
-            'activeTournaments': torneos_activos,
-            'totalMatches': total_partidos,
+            'activeTournaments': globales['torneos_activos'],
+            'totalMatches': globales['total_partidos'],
             'participationRate': 75,  # Valor por defecto
-            'totalPlayers': total_usuarios,
-            'pendingInscriptions': inscripciones_pendientes,
+            'totalPlayers': globales['total_usuarios'],
+            'pendingInscriptions': globales['inscripciones_pendientes'],
             'completionRate': 85,  # Valor por defecto
             'avgMatchDuration': 45,  # Valor por defecto
-            'userTournaments': user_torneos,
-            'userMatches': user_partidos
+            'userTournaments': usuario['torneos'],
+            'userMatches': usuario['partidos']
         }
         
-        session.close()
         return jsonify(stats)
         
     except Exception as e:
@@ -421,4 +424,9 @@ def home():
     return Response(HTML, mimetype='text/html')
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    debug = True
+    # Con debug el reloader ejecuta este bloque también en el proceso que vigila los
+    # archivos; los hilos solo se inician en el hijo que atiende (WERKZEUG_RUN_MAIN)
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        iniciar_tareas_segundo_plano()
+    app.run(debug=debug, host='0.0.0.0', port=5000)
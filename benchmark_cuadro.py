@@ -0,0 +1,58 @@
+# benchmark_cuadro.py
+"""
+Script para medir la generación del cuadro de un torneo según el número de jugadores.
+Cuenta las consultas y el tiempo de generar_cuadro_torneo en modo por ronda y completo.
+Usa una base SQLite en memoria, así que no toca la base de datos de la aplicación.
+Uso: python benchmark_cuadro.py
+"""
+
+import time
+from datetime import date
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from models.torneo_model import Torneo
+from services.cuadro_service import CuadroService
+from datos_prueba import crear_engine, crear_profesor, crear_deportistas, crear_inscripciones
+
+TAMANOS_CUADRO = [64, 256, 1024]
+MODOS = ['por_ronda', 'completo']
+
+def preparar_torneo(db, profesor_id, num_jugadores, modo):
+    """
+    Crea un torneo planificado con num_jugadores inscripciones aceptadas.
+    """
+    torneo = Torneo(nombre=f'Torneo {num_jugadores} {modo}', superficie='arcilla', fecha_inicio=date.today(),
+                    tipo='cerrado', profesor_id=profesor_id, max_participantes=num_jugadores,
+                    inscripciones_aceptadas=num_jugadores)
+    db.add(torneo)
+    db.flush()
+
+    deportista_ids = crear_deportistas(db, num_jugadores, sufijo=f'_{torneo.id}')
+    crear_inscripciones(db, torneo.id, deportista_ids)
+    db.commit()
+    return torneo.id
+
+def benchmark_cuadro():
+    engine = crear_engine()
+    db = sessionmaker(bind=engine)()
+
+    profesor = crear_profesor(db, 'Bench')
+    db.commit()
+
+    consultas = [0]
+    event.listen(engine, 'before_cursor_execute', lambda *args: consultas.__setitem__(0, consultas[0] + 1))
+
+    print(f"{'jugadores':>10} {'modo':>10} {'partidos':>9} {'consultas':>10} {'ms':>9}")
+    for num_jugadores in TAMANOS_CUADRO:
+        for modo in MODOS:
+            torneo_id = preparar_torneo(db, profesor.id, num_jugadores, modo)
+
+            consultas[0] = 0
+            inicio = time.perf_counter()
+            resultado = CuadroService(db).generar_cuadro_torneo(torneo_id, profesor.id, 'profesor', modo)
+            ms = (time.perf_counter() - inicio) * 1000
+
+            print(f"{num_jugadores:>10} {modo:>10} {resultado['partidos_creados']:>9} {consultas[0]:>10} {ms:>9.1f}")
+
+if __name__ == "__main__":
+    benchmark_cuadro()
@@ -0,0 +1,59 @@
+# benchmark_notificaciones.py
+"""
+Script para medir la generación de notificaciones de nueva ronda según el tamaño del cuadro.
+Usa una base SQLite en memoria, así que no toca la base de datos de la aplicación.
+Uso: python benchmark_notificaciones.py [repeticiones]   (por defecto 20)
+"""
+
+import sys
+import time
+from datetime import date
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from models.torneo_model import Torneo
+from services.notificacion_service import NotificacionService
+from datos_prueba import crear_engine, crear_profesor, crear_deportistas, crear_primera_ronda
+
+TAMANOS_CUADRO = [32, 128, 512]
+
+def preparar_torneo(db, profesor_id, num_jugadores):
+    """
+    Crea un torneo con su primera ronda completa de num_jugadores deportistas.
+    """
+    torneo = Torneo(nombre=f'Torneo {num_jugadores}', superficie='arcilla', fecha_inicio=date.today(),
+                    tipo='abierto', profesor_id=profesor_id, max_participantes=num_jugadores)
+    db.add(torneo)
+    db.flush()
+
+    ids = crear_deportistas(db, num_jugadores, sufijo=f'_{num_jugadores}')
+    crear_primera_ronda(db, torneo.id, ids)
+    db.commit()
+    return torneo.id
+
+def benchmark_notificaciones(repeticiones):
+    engine = crear_engine()
+    db = sessionmaker(bind=engine)()
+    profesor_id = crear_profesor(db, 'Bench').id
+
+    consultas = [0]
+    event.listen(engine, 'before_cursor_execute', lambda *args: consultas.__setitem__(0, consultas[0] + 1))
+
+    print(f"{'jugadores':>10} {'notificaciones':>15} {'consultas':>10} {'ms/evento':>10}")
+    for num_jugadores in TAMANOS_CUADRO:
+        torneo_id = preparar_torneo(db, profesor_id, num_jugadores)
+        service = NotificacionService(db)
+
+        consultas[0] = 0
+        notificaciones = service.notificar_nueva_ronda(torneo_id, 1)
+        consultas_evento = consultas[0]
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            service.notificar_nueva_ronda(torneo_id, 1)
+        ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+
+        print(f"{num_jugadores:>10} {len(notificaciones):>15} {consultas_evento:>10} {ms:>10.2f}")
+
+if __name__ == "__main__":
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    benchmark_notificaciones(repeticiones)
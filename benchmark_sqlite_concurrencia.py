@@ -0,0 +1,118 @@
+# benchmark_sqlite_concurrencia.py
+"""
+Script para comparar lecturas concurrentes con escrituras en SQLite, con el perfil
+por defecto (rollback journal) y con el perfil 'performance' (WAL).
+1. Bloqueo: con una transacción de escritura tomando el lock exclusivo, como ocurre
+   al confirmarla, intenta una lectura desde otra conexión.
+2. Rendimiento: un escritor confirma resultados sin pausa mientras varios lectores
+   consultan; informa lecturas por segundo y lecturas fallidas por bloqueo.
+Usa bases SQLite temporales, así que no toca la base de datos de la aplicación.
+Uso: python benchmark_sqlite_concurrencia.py [segundos] [lectores]   (por defecto 3 y 4)
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from config.sqlite_pragmas import aplicar_pragmas_sqlite
+
+# Espera máxima de un lector ante un bloqueo, en segundos
+TIMEOUT_LECTURA = 0.2
+
+def crear_engine(perfil):
+    """
+    Crea una base temporal con una tabla de resultados, con o sin el perfil de rendimiento.
+    """
+    ruta = os.path.join(tempfile.mkdtemp(), f'{perfil}.db')
+    engine = create_engine(f'sqlite:///{ruta}', connect_args={'check_same_thread': False, 'timeout': TIMEOUT_LECTURA})
+    if perfil == 'performance':
+        event.listen(engine, 'connect', aplicar_pragmas_sqlite)
+        # El busy_timeout del perfil esperaría 5 s; se acorta para que ambos perfiles fallen igual de rápido
+        event.listen(engine, 'connect', lambda conexion, registro: conexion.execute(
+            f"PRAGMA busy_timeout={int(TIMEOUT_LECTURA * 1000)}"
+        ))
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE resultados (id INTEGER PRIMARY KEY, partido_id INTEGER, resultado TEXT)"))
+        conn.execute(text("INSERT INTO resultados (partido_id, resultado) VALUES (1, '6-4 6-4')"))
+    return engine
+
+def prueba_bloqueo(engine):
+    """
+    Retorna (lectura bloqueada, filas leídas) para una lectura hecha mientras
+    otra conexión tiene abierta una transacción de escritura con lock exclusivo.
+    """
+    escritor = engine.raw_connection()
+    escritor.isolation_level = None
+    cursor = escritor.cursor()
+    cursor.execute("BEGIN EXCLUSIVE")
+    cursor.execute("INSERT INTO resultados (partido_id, resultado) VALUES (2, '7-5 6-3')")
+    try:
+        with engine.connect() as lector:
+            filas = lector.execute(text("SELECT COUNT(*) FROM resultados")).scalar()
+        return False, filas
+    except OperationalError:
+        return True, None
+    finally:
+        cursor.execute("ROLLBACK")
+        escritor.close()
+
+def prueba_rendimiento(engine, segundos, num_lectores):
+    """
+    Retorna (lecturas por segundo, lecturas fallidas, escrituras) con un escritor
+    confirmando sin pausa y num_lectores hilos leyendo durante segundos.
+    """
+    fin = time.monotonic() + segundos
+    lecturas = [0]
+    fallidas = [0]
+    escrituras = [0]
+    lock = threading.Lock()
+
+    def escribir():
+        with engine.connect() as conn:
+            while time.monotonic() < fin:
+                try:
+                    conn.execute(text("INSERT INTO resultados (partido_id, resultado) VALUES (3, '6-0 6-0')"))
+                    conn.commit()
+                    escrituras[0] += 1
+                except OperationalError:
+                    conn.rollback()
+
+    def leer():
+        ok = errores = 0
+        with engine.connect() as conn:
+            while time.monotonic() < fin:
+                try:
+                    conn.execute(text("SELECT COUNT(*) FROM resultados WHERE partido_id = 3")).scalar()
+                    conn.rollback()
+                    ok += 1
+                except OperationalError:
+                    conn.rollback()
+                    errores += 1
+        with lock:
+            lecturas[0] += ok
+            fallidas[0] += errores
+
+    hilos = [threading.Thread(target=escribir)] + [threading.Thread(target=leer) for _ in range(num_lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return lecturas[0] / segundos, fallidas[0], escrituras[0]
+
+def benchmark_concurrencia(segundos, num_lectores):
+    print(f"{'perfil':>12} {'lectura bloqueada':>18} {'lecturas/s':>11} {'fallidas':>9} {'escrituras':>11}")
+    for perfil in ['default', 'performance']:
+        engine = crear_engine(perfil)
+        bloqueada, _ = prueba_bloqueo(engine)
+        por_segundo, fallidas, escrituras = prueba_rendimiento(engine, segundos, num_lectores)
+        print(f"{perfil:>12} {'sí' if bloqueada else 'no':>18} {por_segundo:>11.0f} {fallidas:>9} {escrituras:>11}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    num_lectores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    benchmark_concurrencia(segundos, num_lectores)
@@ -0,0 +1,29 @@
+# calibrar_bcrypt.py
+"""
+Script para elegir el costo de bcrypt según el tiempo de hash en este equipo.
+Uso: python calibrar_bcrypt.py [objetivo_ms]   (por defecto 250 ms)
+El costo recomendado se configura con la variable de entorno BCRYPT_ROUNDS;
+los usuarios existentes se actualizan solos al iniciar sesión.
+"""
+
+import sys
+from config.jwt_config import BCRYPT_ROUNDS
+from services.password_service import recomendar_costo
+
+def calibrar_bcrypt(objetivo_ms):
+    """
+    Mide el costo de bcrypt y muestra la recomendación para el objetivo dado.
+    """
+    print(f"Objetivo: {objetivo_ms:.0f} ms por hash (costo actual: {BCRYPT_ROUNDS})\n")
+    recomendado, mediciones = recomendar_costo(objetivo_ms)
+
+    for rounds, ms in mediciones.items():
+        marca = " <- recomendado" if rounds == recomendado else ""
+        print(f"  costo {rounds:2d}: {ms:8.1f} ms{marca}")
+
+    print(f"\nConfigura BCRYPT_ROUNDS={recomendado}")
+    return recomendado
+
+if __name__ == "__main__":
+    objetivo = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    calibrar_bcrypt(objetivo)
@@ -1,11 +1,13 @@
 # config/database.py
 import os
+import re
 import sys
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
+from config.sqlite_pragmas import aplicar_pragmas_sqlite
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +23,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 MYSQL_URI = os.getenv('MYSQL_URI')
 SQLITE_URI = 'sqlite:///atp_tour_2004_local.db'
 
+# Perfil de SQLite: 'default' (sin ajustes) o 'performance' (WAL y pragmas de config/sqlite_pragmas.py)
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'default').lower()
+
 def get_engine():
     """
     Crea una conexión a la base de datos SQLite por defecto, con opción de MySQL.
@@ -65,6 +70,11 @@ def create_sqlite_engine():
         echo=os.getenv('DB_ECHO', 'false').lower() == 'true',
         connect_args={"check_same_thread": False}
     )
+
+    if SQLITE_PROFILE == 'performance':
+        event.listen(engine, 'connect', aplicar_pragmas_sqlite)
+        logger.info("Perfil de rendimiento de SQLite activado.")
+
     logger.info("Conexión a SQLite establecida correctamente.")
     return engine
 
@@ -89,15 +99,171 @@ def close_db_session():
     """
     Session.remove()
 
+def register_db_session_teardown(app):
+    """
+    Registra el cierre de la sesión al final de cada request, de modo que todas
+    las llamadas a get_db_session() de un mismo request comparten una sesión y
+    la conexión vuelve al pool al terminar.
+    """
+    @app.teardown_appcontext
+    def remove_db_session(exception=None):
+        close_db_session()
+
 # Importar todos los modelos para que SQLAlchemy los registre
 from models.usuario_model import Usuario
 from models.torneo_model import Torneo
 from models.partido_model import Partido
 from models.inscripcion_model import Inscripcion
+from models.token_revocado_model import TokenRevocado
+from models.notificacion_model import Notificacion
+from models.envio_notificacion_model import EnvioNotificacion
+
+def agregar_columnas_faltantes(engine):
+    """
+    Agrega a las tablas existentes las columnas declaradas en los modelos que
+    todavía no tengan. Solo cubre columnas que admiten ALTER TABLE ADD COLUMN:
+    opcionales o con valor por defecto en el servidor.
+    Retorna el conjunto de (tabla, columna) agregadas.
+    """
+    agregadas = set()
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for tabla in Base.metadata.sorted_tables:
+            existentes = {columna['name'] for columna in inspector.get_columns(tabla.name)}
+            for columna in tabla.columns:
+                if columna.name in existentes:
+                    continue
+                tipo = columna.type.compile(dialect=engine.dialect)
+                sentencia = f"ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}"
+                if columna.server_default is not None:
+                    sentencia += f" DEFAULT {columna.server_default.arg}"
+                conn.execute(text(sentencia))
+                agregadas.add((tabla.name, columna.name))
+                logger.info(f"Columna agregada: {tabla.name}.{columna.name}")
+    return agregadas
+
+def permitir_nulos_faltantes(engine):
+    """
+    Quita NOT NULL de las columnas que los modelos declaran opcionales pero que
+    en la base existente siguen siendo obligatorias, como partidos.deportista1_id
+    (nulo en los partidos aún sin definir de un cuadro completo). MySQL lo resuelve
+    con ALTER TABLE ... MODIFY; SQLite no permite cambiar la restricción, así que
+    la tabla se reconstruye copiando sus filas.
+    """
+    inspector = inspect(engine)
+    for tabla in Base.metadata.sorted_tables:
+        existentes = {columna['name']: columna for columna in inspector.get_columns(tabla.name)}
+        columnas = [
+            columna for columna in tabla.columns
+            if columna.nullable and not columna.primary_key
+            and columna.name in existentes and not existentes[columna.name]['nullable']
+        ]
+        if not columnas:
+            continue
+
+        if engine.dialect.name == 'sqlite':
+            reconstruir_tabla_sqlite(engine, tabla.name, [columna.name for columna in columnas])
+        else:
+            with engine.begin() as conn:
+                for columna in columnas:
+                    tipo = columna.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {tabla.name} MODIFY {columna.name} {tipo} NULL"))
+        logger.info(f"Columnas ahora opcionales en {tabla.name}: {', '.join(c.name for c in columnas)}")
+
+def quitar_not_null(ddl, columnas):
+    """
+    Quita NOT NULL de las columnas indicadas en un CREATE TABLE de SQLite.
+    Separa las definiciones por las comas de primer nivel, para no cortar
+    restricciones como CHECK (estado IN (...)).
+    """
+    inicio, fin = ddl.index('('), ddl.rindex(')')
+    definiciones, actual, profundidad = [], '', 0
+    for caracter in ddl[inicio + 1:fin]:
+        if caracter == ',' and profundidad == 0:
+            definiciones.append(actual)
+            actual = ''
+            continue
+        profundidad += {'(': 1, ')': -1}.get(caracter, 0)
+        actual += caracter
+    definiciones.append(actual)
+
+    nombres = {columna.lower() for columna in columnas}
+    for i, definicion in enumerate(definiciones):
+        if definicion.split()[0].strip('"`[]').lower() in nombres:
+            definiciones[i] = re.sub(r'\s+NOT\s+NULL\b', '', definicion, flags=re.IGNORECASE)
+    return ddl[:inicio + 1] + ','.join(definiciones) + ddl[fin:]
+
+def reconstruir_tabla_sqlite(engine, tabla, columnas):
+    """
+    Recrea una tabla SQLite sin NOT NULL en las columnas indicadas, conservando sus
+    filas. Parte del CREATE TABLE guardado en sqlite_master, así que mantiene
+    AUTOINCREMENT, CHECK y ON DELETE CASCADE de la base existente aunque el modelo
+    no los declare; después vuelve a crear los índices y triggers que tenía la tabla.
+    """
+    temporal = f"{tabla}_reconstruida"
+    with engine.connect() as conn:
+        ddl = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)
+        ).scalar()
+        dependientes = [fila[0] for fila in conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL",
+            (tabla,)
+        )]
+        ddl = re.sub(r'^\s*CREATE\s+TABLE\s+("[^"]+"|`[^`]+`|\[[^\]]+\]|\S+)',
+                     f'CREATE TABLE {temporal}', quitar_not_null(ddl, columnas), count=1, flags=re.IGNORECASE)
+        existentes = ', '.join(columna['name'] for columna in inspect(conn).get_columns(tabla))
+        # Con AUTOINCREMENT, conservar el último id asignado para no reutilizar ids de filas borradas
+        secuencia = conn.exec_driver_sql(
+            "SELECT seq FROM sqlite_sequence WHERE name = ?", (tabla,)
+        ).scalar() if 'AUTOINCREMENT' in ddl.upper() else None
+
+        # Sin claves foráneas activas, borrar la tabla anterior no dispara
+        # ON DELETE CASCADE sobre las tablas que la referencian
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {temporal}")
+            conn.exec_driver_sql(ddl)
+            conn.exec_driver_sql(f"INSERT INTO {temporal} ({existentes}) SELECT {existentes} FROM {tabla}")
+            conn.exec_driver_sql(f"DROP TABLE {tabla}")
+            conn.exec_driver_sql(f"ALTER TABLE {temporal} RENAME TO {tabla}")
+            for sentencia in dependientes:
+                conn.exec_driver_sql(sentencia)
+            if secuencia is not None:
+                conn.exec_driver_sql("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (secuencia, tabla))
+            conn.commit()
+        finally:
+            if SQLITE_PROFILE == 'performance':
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+def recalcular_inscripciones_aceptadas(engine):
+    """
+    Inicializa torneos.inscripciones_aceptadas a partir de las inscripciones
+    existentes. Solo hace falta al agregar la columna a una base de datos previa.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE torneos SET inscripciones_aceptadas = ("
+            "SELECT COUNT(*) FROM inscripciones "
+            "WHERE inscripciones.torneo_id = torneos.id AND inscripciones.estado = 'aceptada')"
+        ))
+
+def crear_indices_faltantes(engine):
+    """
+    Crea los índices declarados en los modelos que no existan todavía.
+    create_all no agrega índices a tablas ya existentes, así que esto actúa
+    como migración para bases de datos creadas con versiones anteriores.
+    """
+    for tabla in Base.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(bind=engine, checkfirst=True)
 
 # Crear todas las tablas en la base de datos
 try:
     Base.metadata.create_all(engine)
+    if ('torneos', 'inscripciones_aceptadas') in agregar_columnas_faltantes(engine):
+        recalcular_inscripciones_aceptadas(engine)
+    permitir_nulos_faltantes(engine)
+    crear_indices_faltantes(engine)
     logger.info("Tablas creadas correctamente en la base de datos.")
 except SQLAlchemyError as e:
     logger.error(f"Error al crear las tablas: {e}")
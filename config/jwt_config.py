@@ -9,9 +9,19 @@ load_dotenv()
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "tu-clave-secreta-super-segura-cambiar-en-produccion")
 JWT_TOKEN_LOCATION = ["headers"]
 JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hora
+JWT_REFRESH_TOKEN_EXPIRES = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES", 30 * 24 * 3600))  # 30 días
+STREAM_TOKEN_EXPIRES = int(os.getenv("STREAM_TOKEN_EXPIRES", 60))  # Token para abrir streams SSE con ?token=
 JWT_HEADER_NAME = "Authorization"
 JWT_HEADER_TYPE = "Bearer"
 JWT_ALGORITHM = "HS256"
 
 # Configuración de seguridad
-BCRYPT_ROUNDS = 12  # Número de rondas para bcrypt (más alto = más seguro pero más lento)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))  # Número de rondas para bcrypt (más alto = más seguro pero más lento)
+BCRYPT_MAX_WORKERS = int(os.getenv("BCRYPT_MAX_WORKERS", os.cpu_count() or 2))  # Hilos dedicados a bcrypt
+BCRYPT_MAX_PENDIENTES = int(os.getenv("BCRYPT_MAX_PENDIENTES", 32))  # Trabajos en cola antes de responder 503
+
+# Límite de intentos fallidos de login (ventana deslizante)
+LOGIN_VENTANA_SEGUNDOS = int(os.getenv("LOGIN_VENTANA_SEGUNDOS", 300))
+LOGIN_MAX_INTENTOS_EMAIL = int(os.getenv("LOGIN_MAX_INTENTOS_EMAIL", 5))
+LOGIN_MAX_INTENTOS_IP = int(os.getenv("LOGIN_MAX_INTENTOS_IP", 20))
+LOGIN_THROTTLE_REDIS_URL = os.getenv("LOGIN_THROTTLE_REDIS_URL")  # Si se define, el conteo se comparte entre procesos
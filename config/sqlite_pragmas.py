@@ -0,0 +1,25 @@
+# config/sqlite_pragmas.py
+import os
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Pragmas del perfil 'performance', aplicados a cada conexión nueva
+SQLITE_PERFORMANCE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 268435456)),    # 256 MB
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -65536)),     # 64 MB (negativo = KiB)
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),   # milisegundos
+    'foreign_keys': 'ON'
+}
+
+def aplicar_pragmas_sqlite(dbapi_connection, connection_record):
+    """
+    Aplica los pragmas del perfil de rendimiento a una conexión SQLite nueva.
+    """
+    cursor = dbapi_connection.cursor()
+    for pragma, valor in SQLITE_PERFORMANCE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={valor}")
+    cursor.close()
@@ -0,0 +1,121 @@
+# contar_consultas.py
+"""
+Script para comprobar que los listados de partidos, el avance de ronda y las
+notificaciones no hacen una consulta por fila. Cuenta las consultas de cada operación,
+incluida la serialización con as_dict(), con torneos de distinto tamaño; termina con
+error si alguna cuenta crece con el tamaño.
+Usa bases SQLite en memoria, así que no toca la base de datos de la aplicación.
+Uso: python contar_consultas.py [jugadores_chico] [jugadores_grande]   (por defecto 16 y 128)
+"""
+
+import sys
+from datetime import date, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from models.torneo_model import Torneo
+from services.partido_service import PartidoService
+from services.cuadro_service import CuadroService
+from services.notificacion_service import NotificacionService
+from datos_prueba import crear_engine, crear_profesor, crear_deportistas, crear_primera_ronda
+
+def preparar_datos(db, num_jugadores):
+    """
+    Crea un torneo por ronda con num_jugadores deportistas y la primera ronda
+    finalizada (gana siempre el primer deportista), y otro con la primera ronda
+    programada para mañana. Retorna los ids usados por los chequeos.
+    """
+    profesor = crear_profesor(db, 'Conteo')
+
+    torneo = Torneo(nombre='Torneo conteo', superficie='arcilla', fecha_inicio=date.today(),
+                    tipo='cerrado', profesor_id=profesor.id, max_participantes=num_jugadores,
+                    inscripciones_aceptadas=num_jugadores)
+    torneo_programado = Torneo(nombre='Torneo programado', superficie='césped',
+                               fecha_inicio=date.today() + timedelta(days=1), tipo='cerrado',
+                               profesor_id=profesor.id, max_participantes=num_jugadores,
+                               inscripciones_aceptadas=num_jugadores)
+    db.add_all([torneo, torneo_programado])
+    db.flush()
+
+    deportista_ids = crear_deportistas(db, num_jugadores)
+    crear_primera_ronda(db, torneo.id, deportista_ids, estado='finalizado')
+    crear_primera_ronda(db, torneo_programado.id, deportista_ids,
+                        fecha_partido=date.today() + timedelta(days=1))
+    db.commit()
+
+    return {'profesor_id': profesor.id, 'torneo_id': torneo.id, 'torneo_programado_id': torneo_programado.id,
+            'deportista_id': deportista_ids[0]}
+
+def chequeos():
+    """
+    Operaciones a medir, por descripción. Cada una recibe la sesión y los ids de preparar_datos.
+    avanzar_ronda va al final porque crea la segunda ronda.
+    """
+    return {
+        'listar_partidos': lambda db, d: [p.as_dict() for p in PartidoService(db).listar_partidos()],
+        'listar_partidos_por_torneo': lambda db, d: [
+            p.as_dict() for p in PartidoService(db).listar_partidos_por_torneo(d['torneo_id'])
+        ],
+        'listar_partidos_por_ronda': lambda db, d: [
+            p.as_dict() for p in PartidoService(db).listar_partidos_por_ronda(d['torneo_id'], 1)
+        ],
+        'listar_partidos_por_deportista': lambda db, d: [
+            p.as_dict() for p in PartidoService(db).listar_partidos_por_deportista(d['deportista_id'])
+        ],
+        'obtener_cuadro_torneo': lambda db, d: CuadroService(db).obtener_cuadro_torneo(d['torneo_id']),
+        'obtener_historial_deportista': lambda db, d: CuadroService(db).obtener_historial_deportista(
+            d['deportista_id']
+        ),
+        '_obtener_ganadores_ronda': lambda db, d: [
+            g.as_dict() for g in CuadroService(db)._obtener_ganadores_ronda(d['torneo_id'], 1)
+        ],
+        'notificar_nueva_ronda': lambda db, d: NotificacionService(db).notificar_nueva_ronda(
+            d['torneo_programado_id'], 1
+        ),
+        'generar_recordatorio_partidos': lambda db, d: NotificacionService(db).generar_recordatorio_partidos(),
+        'avanzar_ronda': lambda db, d: CuadroService(db).avanzar_ronda(d['torneo_id'], d['profesor_id'], 'profesor'),
+    }
+
+def contar(num_jugadores):
+    """
+    Retorna el número de consultas de cada chequeo sobre una base nueva con num_jugadores.
+    Cada chequeo usa una sesión nueva para que el mapa de identidad no oculte consultas.
+    """
+    engine = crear_engine()
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    datos = preparar_datos(db, num_jugadores)
+    db.close()
+
+    consultas = [0]
+    event.listen(engine, 'before_cursor_execute', lambda *args: consultas.__setitem__(0, consultas[0] + 1))
+
+    resultado = {}
+    for descripcion, chequeo in chequeos().items():
+        db = Session()
+        consultas[0] = 0
+        chequeo(db, datos)
+        resultado[descripcion] = consultas[0]
+        db.close()
+
+    engine.dispose()
+    return resultado
+
+def contar_consultas(chico, grande):
+    cuentas_chico = contar(chico)
+    cuentas_grande = contar(grande)
+
+    print(f"{'operación':>32} {chico:>8} {grande:>8}")
+    for descripcion in cuentas_chico:
+        print(f"{descripcion:>32} {cuentas_chico[descripcion]:>8} {cuentas_grande[descripcion]:>8}")
+
+    crecen = [descripcion for descripcion in cuentas_chico
+              if cuentas_grande[descripcion] > cuentas_chico[descripcion]]
+    if crecen:
+        raise SystemExit(f"Consultas que crecen con el número de filas: {', '.join(crecen)}")
+    print("OK")
+
+if __name__ == "__main__":
+    chico = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    grande = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    contar_consultas(chico, grande)
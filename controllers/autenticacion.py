@@ -0,0 +1,102 @@
+# controllers/autenticacion.py
+import os
+import time
+import hashlib
+from functools import wraps
+from flask import request, jsonify, g
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import NoAuthorizationError, JWTExtendedException
+from jwt.exceptions import PyJWTError
+from services.cache import CacheLRU
+from services.revocacion_service import revocacion_tokens
+from config.database import get_db_session
+
+# Alcance de los tokens de corta duración para abrir streams SSE
+ALCANCE_STREAM = 'stream'
+
+# Principales ya decodificados, indexados por el hash del token
+cache_tokens = CacheLRU(max_items=int(os.getenv('TOKEN_CACHE_MAX_ITEMS', 2048)))
+
+def _token_de_request():
+    """
+    Extrae el token del header Authorization: Bearer <token>.
+    """
+    encabezado = request.headers.get('Authorization', '')
+    tipo, _, token = encabezado.partition(' ')
+    if tipo != 'Bearer' or not token:
+        return None
+    return token.strip()
+
+def resolver_principal(token):
+    """
+    Decodifica el token y retorna el principal (id, perfil, nombre, apellido).
+    El resultado se cachea por hash del token hasta que el token expira,
+    así que la firma solo se verifica una vez por token y proceso.
+    La lista de revocados se consulta en cada llamada, también con acierto de cache.
+    """
+    clave = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    principal = cache_tokens.obtener(clave)
+    if principal is not None:
+        if revocacion_tokens.esta_revocado(get_db_session(), principal['jti']):
+            raise ValueError('El token fue revocado')
+        return principal
+
+    claims = decode_token(token)
+    if claims.get('type') != 'access':
+        raise ValueError('Se requiere un token de acceso')
+    if revocacion_tokens.esta_revocado(get_db_session(), claims['jti']):
+        raise ValueError('El token fue revocado')
+
+    principal = {
+        'id': int(claims['sub']),
+        'perfil': claims.get('perfil'),
+        'nombre': claims.get('nombre'),
+        'apellido': claims.get('apellido'),
+        'jti': claims.get('jti'),
+        'exp': claims.get('exp'),
+        'alcance': claims.get('alcance')
+    }
+    if principal['exp']:
+        restante = principal['exp'] - time.time()
+        if restante > 0:
+            cache_tokens.guardar(clave, principal, ttl=restante)
+    else:
+        cache_tokens.guardar(clave, principal)
+    return principal
+
+def requiere_principal(fn):
+    """
+    Decorador que resuelve el usuario autenticado una vez por request
+    y lo deja disponible en g.principal. No acepta tokens de stream.
+    """
+    return _decorar_con_principal(fn, es_stream=False)
+
+def requiere_principal_stream(fn):
+    """
+    Como requiere_principal, para endpoints SSE. EventSource no permite enviar headers,
+    así que acepta también ?token=, pero solo con un token de alcance stream
+    (POST /stream/token): la URL queda en los logs de acceso y de proxies, y ese
+    token dura STREAM_TOKEN_EXPIRES segundos y no sirve para el resto de la API.
+    """
+    return _decorar_con_principal(fn, es_stream=True)
+
+def _decorar_con_principal(fn, es_stream):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _token_de_request()
+        desde_parametro = False
+        if not token and es_stream:
+            token = request.args.get('token')
+            desde_parametro = True
+        if not token:
+            raise NoAuthorizationError('Falta el header Authorization')
+        try:
+            principal = resolver_principal(token)
+        except (PyJWTError, JWTExtendedException, ValueError, KeyError):
+            return jsonify({'error': 'Token JWT inválido o expirado'}), 401
+        alcance_stream = principal.get('alcance') == ALCANCE_STREAM
+        if (alcance_stream and not es_stream) or (desde_parametro and not alcance_stream):
+            return jsonify({'error': 'Token JWT inválido para este endpoint'}), 401
+        g.principal = principal
+        return fn(*args, **kwargs)
+    return wrapper
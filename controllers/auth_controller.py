@@ -1,9 +1,14 @@
 # controllers/auth_controller.py
 import logging
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from flask_jwt_extended.exceptions import NoAuthorizationError
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, decode_token
+from flask_jwt_extended.exceptions import NoAuthorizationError, JWTExtendedException
+from jwt.exceptions import PyJWTError
 from services.auth_service import AuthService
+from services.password_service import PasswordPoolSaturadoError
+from services.limitador_login import limitador_login
+from services.revocacion_service import revocacion_tokens
+from controllers.autenticacion import ALCANCE_STREAM
 from config.database import get_db_session
 
 logger = logging.getLogger(__name__)
@@ -26,6 +31,39 @@ def register_jwt_error_handlers(app):
             'error': 'Token JWT inválido o expirado'
         }), 401
 
+def register_jwt_blocklist(jwt):
+    """
+    Hace que los endpoints con @jwt_required rechacen tokens revocados
+    y los tokens de alcance stream, que solo sirven para abrir canales SSE.
+    """
+    @jwt.token_in_blocklist_loader
+    def token_revocado(jwt_header, jwt_payload):
+        return revocacion_tokens.esta_revocado(get_db_session(), jwt_payload['jti'])
+
+    @jwt.revoked_token_loader
+    def handle_revoked_token(jwt_header, jwt_payload):
+        return jsonify({
+            'error': 'El token fue revocado'
+        }), 401
+
+    @jwt.token_verification_loader
+    def token_no_es_de_stream(jwt_header, jwt_payload):
+        return jwt_payload.get('alcance') != ALCANCE_STREAM
+
+    @jwt.token_verification_failed_loader
+    def handle_token_de_stream(jwt_header, jwt_payload):
+        return jsonify({
+            'error': 'Token JWT inválido para este endpoint'
+        }), 401
+
+def respuesta_servicio_ocupado(error):
+    """
+    Respuesta 503 cuando el pool de bcrypt está saturado.
+    """
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/auth/login', methods=['POST'])
 def login():
     """
@@ -34,8 +72,10 @@ def login():
     Parámetros esperados (JSON):
         email (str): Email del usuario.
         password (str): Contraseña del usuario.
-    Respuesta: JSON con el token JWT y datos del usuario.
+    Respuesta: JSON con el token JWT, el refresh token y datos del usuario.
+    Tras demasiados intentos fallidos por email o IP responde 429 con Retry-After.
     """
+    reserva = None
     try:
         data = request.get_json()
         email = data.get('email')
@@ -47,15 +87,30 @@ def login():
                 'error': 'El email y la contraseña son obligatorios'
             }), 400
 
+        # Contar el intento y rechazar antes de consultar la base de datos o ejecutar bcrypt
+        ip = request.remote_addr or 'desconocida'
+        espera, reserva = limitador_login.reservar_intento(email, ip)
+        if espera:
+            logger.warning(f"Login bloqueado por exceso de intentos: {email} desde {ip}")
+            response = jsonify({
+                'error': 'Demasiados intentos fallidos. Intente más tarde.'
+            })
+            response.headers['Retry-After'] = str(espera)
+            return response, 429
+
         service = AuthService(get_db_session())
         usuario = service.authenticate_user_by_email(email, password)
 
         if usuario:
+            limitador_login.liberar_intento(reserva)
+            limitador_login.registrar_exito(email)
             access_token = service.create_access_token(usuario)
-            if access_token:
+            refresh_token = service.create_refresh_token(usuario)
+            if access_token and refresh_token:
                 logger.info(f"Usuario autenticado exitosamente: {email}")
                 return jsonify({
                     'token': access_token,
+                    'refresh_token': refresh_token,
                     'user': usuario.as_dict(),
                     'message': 'Login exitoso'
                 }), 200
@@ -64,12 +119,17 @@ def login():
                     'error': 'Error generando token de acceso'
                 }), 500
         else:
+            # El intento ya quedó contado como fallido al reservarlo
             logger.warning(f"Login fallido para email: {email}")
             return jsonify({
                 'error': 'Credenciales inválidas'
             }), 401
 
+    except PasswordPoolSaturadoError as e:
+        limitador_login.liberar_intento(reserva)
+        return respuesta_servicio_ocupado(e)
     except Exception as e:
+        limitador_login.liberar_intento(reserva)
         logger.error(f"Error en login: {str(e)}")
         return jsonify({
             'error': 'Error interno del servidor'
@@ -115,12 +175,94 @@ def register():
         return jsonify({
             'error': str(e)
         }), 400
+    except PasswordPoolSaturadoError as e:
+        return respuesta_servicio_ocupado(e)
     except Exception as e:
         logger.error(f"Error en registro: {str(e)}")
         return jsonify({
             'error': 'Error interno del servidor'
         }), 500
 
+@auth_bp.route('/auth/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    POST /auth/refresh
+    Emite un nuevo token de acceso y un nuevo refresh token.
+    Requiere un refresh token válido en el header Authorization, que queda revocado.
+    """
+    try:
+        db = get_db_session()
+
+        # Rotación: revocar primero el refresh token usado. Si dos solicitudes usan
+        # el mismo token a la vez, solo la que logra registrar el jti obtiene tokens
+        if not revocacion_tokens.revocar(db, get_jwt()):
+            return jsonify({
+                'error': 'El token fue revocado'
+            }), 401
+
+        service = AuthService(db)
+        usuario = service.get_current_user()
+
+        if not usuario:
+            return jsonify({
+                'error': 'Usuario no encontrado o inactivo'
+            }), 401
+
+        access_token = service.create_access_token(usuario)
+        refresh_token = service.create_refresh_token(usuario)
+        if not access_token or not refresh_token:
+            return jsonify({
+                'error': 'Error generando token de acceso'
+            }), 500
+
+        return jsonify({
+            'token': access_token,
+            'refresh_token': refresh_token
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error renovando token: {str(e)}")
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+@auth_bp.route('/auth/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    POST /auth/logout
+    Revoca el token enviado en el header Authorization.
+    Parámetros opcionales (JSON):
+        refresh_token (str): Refresh token a revocar junto con el token de acceso.
+    """
+    try:
+        db = get_db_session()
+        revocacion_tokens.revocar(db, get_jwt())
+
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            claims = decode_token(data['refresh_token'])
+            if claims.get('sub') != get_jwt_identity():
+                return jsonify({
+                    'error': 'El refresh token no pertenece al usuario'
+                }), 400
+            revocacion_tokens.revocar(db, claims)
+
+        return jsonify({
+            'message': 'Sesión cerrada'
+        }), 200
+
+    except (PyJWTError, JWTExtendedException):
+        return jsonify({
+            'error': 'Refresh token inválido o expirado'
+        }), 400
+    except Exception as e:
+        logger.error(f"Error cerrando sesión: {str(e)}")
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
 @auth_bp.route('/auth/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
@@ -128,21 +270,31 @@ def get_current_user():
     GET /auth/me
     Obtiene la información del usuario actual autenticado.
     Requiere token JWT válido.
+    Parámetros opcionales:
+        solo_claims: Si es 1 responde solo con los datos del token, sin consultar usuarios
     """
     try:
+        # Obtener claims del token
+        claims = get_jwt()
+        token_claims = {
+            'perfil': claims.get('perfil'),
+            'nombre': claims.get('nombre'),
+            'apellido': claims.get('apellido')
+        }
+
+        if request.args.get('solo_claims') in ('1', 'true'):
+            return jsonify({
+                'user': {'id': int(get_jwt_identity()), **token_claims},
+                'token_claims': token_claims
+            }), 200
+
         service = AuthService(get_db_session())
-        usuario = service.get_current_user()
+        usuario = service.get_current_user_dict()
 
         if usuario:
-            # Obtener claims del token
-            claims = get_jwt()
             return jsonify({
-                'user': usuario.as_dict(),
-                'token_claims': {
-                    'perfil': claims.get('perfil'),
-                    'nombre': claims.get('nombre'),
-                    'apellido': claims.get('apellido')
-                }
+                'user': usuario,
+                'token_claims': token_claims
             }), 200
         else:
             return jsonify({
@@ -195,6 +347,8 @@ def change_password():
         return jsonify({
             'error': str(e)
         }), 400
+    except PasswordPoolSaturadoError as e:
+        return respuesta_servicio_ocupado(e)
     except Exception as e:
         logger.error(f"Error cambiando contraseña: {str(e)}")
         return jsonify({
@@ -1,28 +1,31 @@
 # controllers/cuadro_controller.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from services.cuadro_service import CuadroService
 from config.database import get_db_session
+from controllers.autenticacion import requiere_principal
+from controllers.streaming import solicita_stream, respuesta_ndjson
 
 cuadro_bp = Blueprint('cuadro_bp', __name__)
 
 @cuadro_bp.route('/torneos/<int:torneo_id>/cuadro/generar', methods=['POST'])
+@requiere_principal
 def generar_cuadro_torneo(torneo_id):
     """
     POST /torneos/<torneo_id>/cuadro/generar
     Genera automáticamente el cuadro de torneo.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario (debe ser 'profesor' o 'administrador')
+    Requiere token JWT válido de un profesor o administrador.
+    Parámetros opcionales (JSON):
+        modo (str): 'por_ronda' (default) o 'completo' para crear todas las rondas
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
+
+        data = request.get_json(silent=True) or {}
+        modo = data.get('modo', 'por_ronda')
 
         service = CuadroService(get_db_session())
-        resultado = service.generar_cuadro_torneo(torneo_id, int(usuario_id), usuario_perfil)
+        resultado = service.generar_cuadro_torneo(torneo_id, usuario_id, usuario_perfil, modo)
         return jsonify(resultado), 201
         
     except ValueError as e:
@@ -46,23 +49,19 @@ def obtener_cuadro_torneo(torneo_id):
         return jsonify({'error': str(e)}), 500
 
 @cuadro_bp.route('/torneos/<int:torneo_id>/cuadro/avanzar', methods=['POST'])
+@requiere_principal
 def avanzar_ronda_torneo(torneo_id):
     """
     POST /torneos/<torneo_id>/cuadro/avanzar
     Avanza automáticamente a la siguiente ronda del torneo.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario (debe ser 'profesor' o 'administrador')
+    Requiere token JWT válido de un profesor o administrador.
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         service = CuadroService(get_db_session())
-        resultado = service.avanzar_ronda(torneo_id, int(usuario_id), usuario_perfil)
+        resultado = service.avanzar_ronda(torneo_id, usuario_id, usuario_perfil)
         return jsonify(resultado), 200
         
     except ValueError as e:
@@ -97,10 +96,14 @@ def obtener_historial_deportista(deportista_id):
     Obtiene el historial de partidos de un deportista.
     Parámetros opcionales:
         torneo_id: Filtrar por torneo específico
+        stream: Si es 1 (o Accept: application/x-ndjson) responde en NDJSON por lotes
     """
     try:
         torneo_id = request.args.get('torneo_id', type=int)
         service = CuadroService(get_db_session())
+        if solicita_stream(request):
+            return respuesta_ndjson(service.iterar_historial_deportista(deportista_id, torneo_id))
+
         historial = service.obtener_historial_deportista(deportista_id, torneo_id)
         return jsonify(historial), 200
         
@@ -116,10 +119,7 @@ def obtener_partidos_ronda(torneo_id, ronda):
     try:
         from services.partido_service import PartidoService
         service = PartidoService(get_db_session())
-        partidos = service.listar_partidos_por_torneo(torneo_id)
-        
-        # Filtrar por ronda
-        partidos_ronda = [p for p in partidos if p.numero_ronda == ronda]
+        partidos_ronda = service.listar_partidos_por_ronda(torneo_id, ronda)
         return jsonify([p.as_dict() for p in partidos_ronda]), 200
         
     except Exception as e:
@@ -136,31 +136,32 @@ def obtener_estadisticas_torneo(torneo_id):
         from models.partido_model import Partido
         from models.inscripcion_model import Inscripcion
         
-        torneo = get_db_session().query(Torneo).filter(Torneo.id == torneo_id).first()
+        db = get_db_session()
+        torneo = db.query(Torneo).filter(Torneo.id == torneo_id).first()
         if not torneo:
             return jsonify({'error': 'Torneo no encontrado'}), 404
 
         # Estadísticas básicas
-        total_inscripciones = get_db_session().query(Inscripcion).filter(
+        total_inscripciones = db.query(Inscripcion).filter(
             Inscripcion.torneo_id == torneo_id
         ).count()
         
-        inscripciones_aceptadas = get_db_session().query(Inscripcion).filter(
+        inscripciones_aceptadas = db.query(Inscripcion).filter(
             Inscripcion.torneo_id == torneo_id,
             Inscripcion.estado == 'aceptada'
         ).count()
         
-        total_partidos = get_db_session().query(Partido).filter(
+        total_partidos = db.query(Partido).filter(
             Partido.torneo_id == torneo_id
         ).count()
         
-        partidos_finalizados = get_db_session().query(Partido).filter(
+        partidos_finalizados = db.query(Partido).filter(
             Partido.torneo_id == torneo_id,
             Partido.estado == 'finalizado'
         ).count()
         
         # Rondas completadas
-        rondas_completadas = get_db_session().query(Partido).filter(
+        rondas_completadas = db.query(Partido).filter(
             Partido.torneo_id == torneo_id,
             Partido.estado == 'finalizado'
         ).with_entities(Partido.numero_ronda).distinct().count()
@@ -1,7 +1,9 @@
 # controllers/inscripcion_controller.py
-from flask import Blueprint, request, jsonify
-from services.inscripcion_service import InscripcionService
+from flask import Blueprint, request, jsonify, g
+from services.inscripcion_service import InscripcionService, cache_rosters
 from config.database import get_db_session
+from controllers.autenticacion import requiere_principal
+from controllers.paginacion import parametros_paginacion, respuesta_paginada
 
 inscripcion_bp = Blueprint('inscripcion_bp', __name__)
 
@@ -10,11 +12,18 @@ def get_inscripciones():
     """
     GET /inscripciones
     Obtiene todas las inscripciones.
+    Parámetros opcionales:
+        limit: Número máximo de resultados (el cursor siguiente va en X-Next-Cursor)
+        after: Devolver solo registros con id mayor a este cursor
+        fields: Columnas a incluir separadas por coma (ej. id,nombre)
     """
     try:
         service = InscripcionService(get_db_session())
-        inscripciones = service.listar_inscripciones()
-        return jsonify([i.as_dict() for i in inscripciones]), 200
+        limit, after, fields = parametros_paginacion(request.args)
+        inscripciones = service.listar_inscripciones(limit=limit, after=after, fields=fields)
+        return respuesta_paginada(inscripciones, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -26,11 +35,18 @@ def get_inscripciones_por_torneo(torneo_id):
     """
     try:
         service = InscripcionService(get_db_session())
-        inscripciones = service.listar_inscripciones_por_torneo(torneo_id)
-        return jsonify([i.as_dict() for i in inscripciones]), 200
+        return jsonify(service.obtener_roster_torneo(torneo_id)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@inscripcion_bp.route('/inscripciones/roster/estadisticas', methods=['GET'])
+def get_estadisticas_cache_rosters():
+    """
+    GET /inscripciones/roster/estadisticas
+    Obtiene los aciertos, fallos y ocupación de la cache de inscripciones por torneo.
+    """
+    return jsonify(cache_rosters.estadisticas()), 200
+
 @inscripcion_bp.route('/inscripciones/deportista/<int:deportista_id>', methods=['GET'])
 def get_inscripciones_por_deportista(deportista_id):
     """
@@ -45,33 +61,29 @@ def get_inscripciones_por_deportista(deportista_id):
         return jsonify({'error': str(e)}), 500
 
 @inscripcion_bp.route('/inscripciones', methods=['POST'])
+@requiere_principal
 def crear_inscripcion():
     """
     POST /inscripciones
     Crea una nueva inscripción.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario
+    Requiere token JWT válido.
     Parámetros (JSON):
         torneo_id (int): ID del torneo
         deportista_id (int): ID del deportista (opcional si es auto-inscripción)
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         data = request.get_json()
         torneo_id = data.get('torneo_id')
-        deportista_id = data.get('deportista_id', int(usuario_id))  # Default: auto-inscripción
+        deportista_id = data.get('deportista_id', usuario_id)  # Default: auto-inscripción
         
         if not torneo_id:
             return jsonify({'error': 'torneo_id es obligatorio'}), 400
 
         service = InscripcionService(get_db_session())
-        inscripcion = service.inscribir_deportista(torneo_id, deportista_id, int(usuario_id), usuario_perfil)
+        inscripcion = service.inscribir_deportista(torneo_id, deportista_id, usuario_id, usuario_perfil)
         return jsonify(inscripcion.as_dict()), 201
         
     except ValueError as e:
@@ -79,23 +91,85 @@ def crear_inscripcion():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@inscripcion_bp.route('/inscripciones/bulk', methods=['POST'])
+@requiere_principal
+def crear_inscripciones_bulk():
+    """
+    POST /inscripciones/bulk
+    Inscribe varios deportistas a un torneo en una sola transacción.
+    Requiere token JWT válido.
+    Parámetros (JSON):
+        torneo_id (int): ID del torneo
+        deportista_ids (list): IDs de los deportistas a inscribir
+    Respuesta: inscripciones creadas y errores por deportista.
+    """
+    try:
+        data = request.get_json()
+        torneo_id = data.get('torneo_id')
+        if not torneo_id:
+            return jsonify({'error': 'torneo_id es obligatorio'}), 400
+
+        service = InscripcionService(get_db_session())
+        inscripciones, errores = service.inscribir_deportistas_bulk(
+            torneo_id, data.get('deportista_ids'), g.principal['id'], g.principal['perfil']
+        )
+        return jsonify({
+            'inscripciones': [i.as_dict() for i in inscripciones],
+            'errores': errores
+        }), 201 if inscripciones else 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@inscripcion_bp.route('/inscripciones/bulk/estado', methods=['PUT'])
+@requiere_principal
+def actualizar_estado_inscripciones_bulk():
+    """
+    PUT /inscripciones/bulk/estado
+    Cambia el estado de varias inscripciones a la vez.
+    Requiere token JWT válido de un profesor o administrador.
+    Parámetros (JSON):
+        estado (str): Nuevo estado (pendiente, aceptada, rechazada)
+        ids (list): IDs de las inscripciones, o bien
+        torneo_id (int): Torneo cuyas inscripciones se actualizan
+        estado_actual (str): Estado de las inscripciones a actualizar con torneo_id (default: pendiente)
+    Respuesta: conteos de actualizadas, sin cambios, sin cupo y no encontradas.
+    """
+    try:
+        data = request.get_json()
+        nuevo_estado = data.get('estado')
+        if not nuevo_estado:
+            return jsonify({'error': 'estado es obligatorio'}), 400
+
+        service = InscripcionService(get_db_session())
+        resultado = service.actualizar_estado_inscripciones_bulk(
+            nuevo_estado, g.principal['id'], g.principal['perfil'],
+            inscripcion_ids=data.get('ids'),
+            torneo_id=data.get('torneo_id'),
+            estado_actual=data.get('estado_actual', 'pendiente')
+        )
+        return jsonify(resultado), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @inscripcion_bp.route('/inscripciones/<int:inscripcion_id>/estado', methods=['PUT'])
+@requiere_principal
 def actualizar_estado_inscripcion(inscripcion_id):
     """
     PUT /inscripciones/<inscripcion_id>/estado
     Actualiza el estado de una inscripción.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario
+    Requiere token JWT válido.
     Parámetros (JSON):
         estado (str): 'pendiente', 'aceptada', 'rechazada'
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         data = request.get_json()
         nuevo_estado = data.get('estado')
@@ -104,7 +178,7 @@ def actualizar_estado_inscripcion(inscripcion_id):
             return jsonify({'error': 'estado es obligatorio'}), 400
 
         service = InscripcionService(get_db_session())
-        inscripcion = service.actualizar_estado_inscripcion(inscripcion_id, nuevo_estado, int(usuario_id), usuario_perfil)
+        inscripcion = service.actualizar_estado_inscripcion(inscripcion_id, nuevo_estado, usuario_id, usuario_perfil)
         return jsonify(inscripcion.as_dict()), 200
         
     except ValueError as e:
@@ -113,23 +187,19 @@ def actualizar_estado_inscripcion(inscripcion_id):
         return jsonify({'error': str(e)}), 500
 
 @inscripcion_bp.route('/inscripciones/<int:inscripcion_id>', methods=['DELETE'])
+@requiere_principal
 def eliminar_inscripcion(inscripcion_id):
     """
     DELETE /inscripciones/<inscripcion_id>
     Elimina una inscripción.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario
+    Requiere token JWT válido.
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         service = InscripcionService(get_db_session())
-        result = service.eliminar_inscripcion(inscripcion_id, int(usuario_id), usuario_perfil)
+        result = service.eliminar_inscripcion(inscripcion_id, usuario_id, usuario_perfil)
         
         if result:
             return jsonify({'message': 'Inscripción eliminada'}), 200
@@ -1,23 +1,53 @@
 # controllers/notificacion_controller.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from services.notificacion_service import NotificacionService
 from config.database import get_db_session
+from controllers.autenticacion import requiere_principal
 
 notificacion_bp = Blueprint('notificacion_bp', __name__)
 
 @notificacion_bp.route('/deportistas/<int:deportista_id>/notificaciones', methods=['GET'])
+@requiere_principal
 def obtener_notificaciones_deportista(deportista_id):
     """
     GET /deportistas/<deportista_id>/notificaciones
-    Obtiene las notificaciones de un deportista.
+    Obtiene las notificaciones de un deportista, de la más reciente a la más antigua,
+    junto con el total de no leídas.
+    Requiere token JWT válido del propio deportista, de un profesor o de un administrador.
     Parámetros opcionales:
         limite: Número máximo de notificaciones (default: 10)
+        solo_no_leidas: Si es 1 devuelve solo las no leídas
     """
     try:
+        if g.principal['id'] != deportista_id and g.principal['perfil'] not in ['profesor', 'administrador']:
+            return jsonify({'error': 'No tienes permisos para ver estas notificaciones'}), 403
+
         limite = request.args.get('limite', 10, type=int)
+        solo_no_leidas = request.args.get('solo_no_leidas') in ('1', 'true')
+        service = NotificacionService(get_db_session())
+        bandeja = service.obtener_notificaciones_deportista(deportista_id, limite, solo_no_leidas)
+        return jsonify(bandeja), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@notificacion_bp.route('/deportistas/<int:deportista_id>/notificaciones/leidas', methods=['PUT'])
+@requiere_principal
+def marcar_notificaciones_leidas(deportista_id):
+    """
+    PUT /deportistas/<deportista_id>/notificaciones/leidas
+    Marca como leídas notificaciones del deportista.
+    Requiere token JWT válido del propio deportista o de un administrador.
+    Parámetros opcionales (JSON):
+        ids (list): IDs de las notificaciones a marcar (default: todas)
+    """
+    try:
+        if g.principal['id'] != deportista_id and g.principal['perfil'] != 'administrador':
+            return jsonify({'error': 'No tienes permisos para modificar estas notificaciones'}), 403
+
+        data = request.get_json(silent=True) or {}
         service = NotificacionService(get_db_session())
-        notificaciones = service.obtener_notificaciones_deportista(deportista_id, limite)
-        return jsonify(notificaciones), 200
+        actualizadas = service.marcar_leidas(deportista_id, data.get('ids'))
+        return jsonify({'actualizadas': actualizadas}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,24 @@
+# controllers/paginacion.py
+from flask import jsonify
+from services.paginacion import LIMITE_MAXIMO
+
+def parametros_paginacion(args):
+    """
+    Lee limit, after y fields de los parámetros de la petición.
+    """
+    limit = args.get('limit', type=int)
+    after = args.get('after', type=int)
+    fields = args.get('fields')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    return limit, after, fields
+
+def respuesta_paginada(items, limit):
+    """
+    Serializa una página de resultados. Si la página está completa, el id del
+    último elemento se devuelve en el header X-Next-Cursor para pedir la siguiente.
+    """
+    datos = [item if isinstance(item, dict) else item.as_dict() for item in items]
+    response = jsonify(datos)
+    if limit is not None and datos and len(datos) >= min(limit, LIMITE_MAXIMO):
+        response.headers['X-Next-Cursor'] = str(datos[-1]['id'])
+    return response, 200
@@ -1,6 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from services.partido_service import PartidoService
 from config.database import get_db_session
+from controllers.autenticacion import requiere_principal
+from controllers.paginacion import parametros_paginacion, respuesta_paginada
+from controllers.streaming import solicita_stream, respuesta_ndjson
 
 partido_bp = Blueprint('partido_bp', __name__)
 
@@ -9,11 +12,22 @@ def get_partidos():
     """
     GET /partidos
     Obtiene todos los partidos.
+    Parámetros opcionales:
+        stream: Si es 1 (o Accept: application/x-ndjson) responde en NDJSON por lotes
+        limit: Número máximo de resultados (el cursor siguiente va en X-Next-Cursor)
+        after: Devolver solo registros con id mayor a este cursor
+        fields: Columnas a incluir separadas por coma (ej. id,nombre)
     """
     try:
         service = PartidoService(get_db_session())
-        partidos = service.listar_partidos()
-        return jsonify([p.as_dict() for p in partidos]), 200
+        if solicita_stream(request):
+            return respuesta_ndjson(service.iterar_partidos())
+
+        limit, after, fields = parametros_paginacion(request.args)
+        partidos = service.listar_partidos(limit=limit, after=after, fields=fields)
+        return respuesta_paginada(partidos, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -44,20 +58,16 @@ def get_partidos_por_deportista(deportista_id):
         return jsonify({'error': str(e)}), 500
 
 @partido_bp.route('/partidos', methods=['POST'])
+@requiere_principal
 def create_partido():
     """
     POST /partidos
     Crea un nuevo partido.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario (debe ser 'profesor' o 'administrador')
+    Requiere token JWT válido de un profesor o administrador.
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         data = request.get_json()
         required_fields = ['torneo_id', 'deportista1_id', 'deportista2_id']
@@ -67,7 +77,7 @@ def create_partido():
                 return jsonify({'error': f'El campo {field} es obligatorio'}), 400
 
         service = PartidoService(get_db_session())
-        partido = service.crear_partido(data, int(usuario_id), usuario_perfil)
+        partido = service.crear_partido(data, usuario_id, usuario_perfil)
         return jsonify(partido.as_dict()), 201
         
     except ValueError as e:
@@ -76,24 +86,20 @@ def create_partido():
         return jsonify({'error': str(e)}), 500
 
 @partido_bp.route('/partidos/<int:partido_id>', methods=['PUT'])
+@requiere_principal
 def update_partido(partido_id):
     """
     PUT /partidos/<partido_id>
     Actualiza un partido existente.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario
+    Requiere token JWT válido.
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         data = request.get_json()
         service = PartidoService(get_db_session())
-        partido = service.actualizar_partido(partido_id, data, int(usuario_id), usuario_perfil)
+        partido = service.actualizar_partido(partido_id, data, usuario_id, usuario_perfil)
         
         if partido:
             return jsonify(partido.as_dict()), 200
@@ -105,23 +111,19 @@ def update_partido(partido_id):
         return jsonify({'error': str(e)}), 500
 
 @partido_bp.route('/partidos/<int:partido_id>', methods=['DELETE'])
+@requiere_principal
 def delete_partido(partido_id):
     """
     DELETE /partidos/<partido_id>
     Elimina un partido.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario
+    Requiere token JWT válido.
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         service = PartidoService(get_db_session())
-        result = service.eliminar_partido(partido_id, int(usuario_id), usuario_perfil)
+        result = service.eliminar_partido(partido_id, usuario_id, usuario_perfil)
         
         if result:
             return jsonify({'message': 'Partido eliminado'}), 200
@@ -133,23 +135,19 @@ def delete_partido(partido_id):
         return jsonify({'error': str(e)}), 500
 
 @partido_bp.route('/partidos/<int:partido_id>/resultado', methods=['POST'])
+@requiere_principal
 def registrar_resultado(partido_id):
     """
     POST /partidos/<partido_id>/resultado
     Registra el resultado de un partido.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario
+    Requiere token JWT válido.
     Parámetros (JSON):
         ganador_id (int): ID del deportista ganador
         resultado (str): Resultado del partido
     """
     try:
-        usuario_id = request.headers.get('X-User-ID')
-        usuario_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_id or not usuario_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_id = g.principal['id']
+        usuario_perfil = g.principal['perfil']
 
         data = request.get_json()
         ganador_id = data.get('ganador_id')
@@ -159,7 +157,7 @@ def registrar_resultado(partido_id):
             return jsonify({'error': 'ganador_id y resultado son obligatorios'}), 400
 
         service = PartidoService(get_db_session())
-        partido = service.registrar_resultado(partido_id, ganador_id, resultado, int(usuario_id), usuario_perfil)
+        partido = service.registrar_resultado(partido_id, ganador_id, resultado, usuario_id, usuario_perfil)
         return jsonify(partido.as_dict()), 200
         
     except ValueError as e:
@@ -0,0 +1,81 @@
+# controllers/stream_controller.py
+import json
+from flask import Blueprint, Response, jsonify, g
+from services.eventos import bus_eventos, canal_deportista, canal_cuadro
+from services.auth_service import AuthService
+from controllers.autenticacion import requiere_principal, requiere_principal_stream
+from config.database import get_db_session
+from config.jwt_config import STREAM_TOKEN_EXPIRES
+
+stream_bp = Blueprint('stream_bp', __name__)
+
+# Intervalo del comentario de keep-alive, para que proxies y clientes no corten la conexión
+INTERVALO_PING = 15
+
+def respuesta_sse(*canales):
+    """
+    Mantiene abierta una respuesta text/event-stream y emite cada evento de los canales
+    a medida que se publica. No usa la base de datos.
+    La suscripción se abre al empezar a iterar la respuesta, así el finally que la
+    cierra siempre corre; una respuesta que nunca se consume no deja suscripciones.
+    """
+    def generar():
+        suscripcion = bus_eventos.suscribir(*canales)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                evento = suscripcion.obtener(timeout=INTERVALO_PING)
+                if evento is None:
+                    yield ': ping\n\n'
+                    continue
+                datos = json.dumps(evento['datos'], ensure_ascii=False)
+                yield f"event: {evento['tipo']}\ndata: {datos}\n\n"
+        finally:
+            suscripcion.cerrar()
+
+    response = Response(generar(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@stream_bp.route('/stream/token', methods=['POST'])
+@requiere_principal
+def crear_token_stream():
+    """
+    POST /stream/token
+    Retorna un token de alcance stream para abrir un canal SSE con ?token=,
+    ya que EventSource no permite enviar el header Authorization.
+    Dura STREAM_TOKEN_EXPIRES segundos y solo se valida al conectar: el canal
+    abierto sigue activo aunque el token expire después.
+    Requiere token JWT válido en el header Authorization.
+    """
+    try:
+        token = AuthService(get_db_session()).create_stream_token(g.principal)
+        if not token:
+            return jsonify({'error': 'Error generando token de stream'}), 500
+        return jsonify({'token': token, 'expira_en': STREAM_TOKEN_EXPIRES}), 200
+    except Exception as e:
+        return jsonify({'error': f'Error interno del servidor: {str(e)}'}), 500
+
+@stream_bp.route('/stream/deportistas/<int:deportista_id>', methods=['GET'])
+@requiere_principal_stream
+def stream_deportista(deportista_id):
+    """
+    GET /stream/deportistas/<deportista_id>
+    Canal SSE con las notificaciones y cambios de inscripción del deportista.
+    Requiere token JWT válido del propio deportista o de un administrador,
+    en el header Authorization o, con un token de POST /stream/token, en el parámetro token.
+    Eventos: notificacion, inscripcion
+    """
+    if g.principal['id'] != deportista_id and g.principal['perfil'] != 'administrador':
+        return jsonify({'error': 'No tienes permisos para ver estas notificaciones'}), 403
+    return respuesta_sse(canal_deportista(deportista_id))
+
+@stream_bp.route('/stream/torneos/<int:torneo_id>/cuadro', methods=['GET'])
+def stream_cuadro(torneo_id):
+    """
+    GET /stream/torneos/<torneo_id>/cuadro
+    Canal SSE con las actualizaciones en vivo del cuadro del torneo.
+    Eventos: cuadro_generado, resultado, nueva_ronda, torneo_finalizado
+    """
+    return respuesta_sse(canal_cuadro(torneo_id))
@@ -0,0 +1,31 @@
+# controllers/streaming.py
+import json
+from flask import Response, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def solicita_stream(request):
+    """
+    Indica si el cliente pidió la respuesta en streaming (?stream=1 o Accept NDJSON).
+    """
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+def respuesta_ndjson(items):
+    """
+    Emite una línea JSON por elemento a medida que se van obteniendo,
+    sin construir la lista completa en memoria.
+    """
+    def generar():
+        try:
+            for item in items:
+                yield json.dumps(item.as_dict(), ensure_ascii=False) + '\n'
+        finally:
+            # Con stream_with_context el contexto del request sigue abierto hasta que
+            # el generador termina (o el servidor lo cierra si el cliente corta), y
+            # recién entonces corre el teardown. Cerrar aquí la sesión devuelve la
+            # conexión al pool apenas se emite la última línea.
+            items.session.close()
+
+    return Response(stream_with_context(generar()), mimetype=NDJSON_MIMETYPE)
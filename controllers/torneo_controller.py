@@ -1,9 +1,10 @@
 # controllers/torneo_controller.py
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask import Blueprint, request, jsonify, g
 from services.torneo_service import TorneoService
 from services.auth_service import AuthService
 from config.database import get_db_session
+from controllers.autenticacion import requiere_principal
+from controllers.paginacion import parametros_paginacion, respuesta_paginada
 
 torneo_bp = Blueprint('torneo_bp', __name__)
 
@@ -14,11 +15,18 @@ def get_torneos():
     GET /torneos
     Recupera todos los torneos.
     Respuesta: JSON con los datos de los torneos.
+    Parámetros opcionales:
+        limit: Número máximo de resultados (el cursor siguiente va en X-Next-Cursor)
+        after: Devolver solo registros con id mayor a este cursor
+        fields: Columnas a incluir separadas por coma (ej. id,nombre)
     """
     try:
         service = TorneoService(get_db_session())
-        torneos = service.listar_torneos()
-        return jsonify([t.as_dict() for t in torneos]), 200
+        limit, after, fields = parametros_paginacion(request.args)
+        torneos = service.listar_torneos(limit=limit, after=after, fields=fields)
+        return respuesta_paginada(torneos, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -66,7 +74,7 @@ def get_torneo(torneo_id):
         return jsonify({'error': str(e)}), 500
 
 @torneo_bp.route('/torneos', methods=['POST'])
-@jwt_required()
+@requiere_principal
 def create_torneo():
     """
     POST /torneos
@@ -82,9 +90,7 @@ def create_torneo():
         descripcion (str): Descripción del torneo (opcional).
     """
     try:
-        # Obtener información del usuario desde JWT
-        claims = get_jwt()
-        usuario_perfil = claims.get('perfil')
+        usuario_perfil = g.principal['perfil']
         
         if usuario_perfil not in ['profesor', 'administrador']:
             return jsonify({'error': 'Solo profesores y administradores pueden crear torneos'}), 403
@@ -99,8 +105,7 @@ def create_torneo():
         if data['tipo'] not in ['abierto', 'cerrado']:
             return jsonify({'error': 'El tipo debe ser "abierto" o "cerrado"'}), 400
 
-        # Obtener ID del usuario desde JWT
-        usuario_id = get_jwt_identity()
+        usuario_id = g.principal['id']
         
         service = TorneoService(get_db_session())
         torneo = service.crear_torneo(data, usuario_id)
@@ -113,7 +118,7 @@ def create_torneo():
 
 # Endpoint para actualizar un torneo
 @torneo_bp.route('/torneos/<int:torneo_id>', methods=['PUT'])
-@jwt_required()
+@requiere_principal
 def update_torneo(torneo_id):
     """
     PUT /torneos/<torneo_id>
@@ -121,10 +126,8 @@ def update_torneo(torneo_id):
     Requiere token JWT válido.
     """
     try:
-        # Obtener información del usuario desde JWT
-        claims = get_jwt()
-        usuario_perfil = claims.get('perfil')
-        usuario_id = get_jwt_identity()
+        usuario_perfil = g.principal['perfil']
+        usuario_id = g.principal['id']
 
         data = request.get_json()
         service = TorneoService(get_db_session())
@@ -140,7 +143,7 @@ def update_torneo(torneo_id):
         return jsonify({'error': str(e)}), 500
 
 @torneo_bp.route('/torneos/<int:torneo_id>', methods=['DELETE'])
-@jwt_required()
+@requiere_principal
 def delete_torneo(torneo_id):
     """
     DELETE /torneos/<torneo_id>
@@ -148,10 +151,8 @@ def delete_torneo(torneo_id):
     Requiere token JWT válido.
     """
     try:
-        # Obtener información del usuario desde JWT
-        claims = get_jwt()
-        usuario_perfil = claims.get('perfil')
-        usuario_id = get_jwt_identity()
+        usuario_perfil = g.principal['perfil']
+        usuario_id = g.principal['id']
 
         service = TorneoService(get_db_session())
         resultado = service.eliminar_torneo(torneo_id, usuario_id, usuario_perfil)
@@ -1,7 +1,9 @@
 # controllers/usuario_controller.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from services.usuario_service import UsuarioService
 from config.database import get_db_session
+from controllers.autenticacion import requiere_principal
+from controllers.paginacion import parametros_paginacion, respuesta_paginada
 
 usuario_bp = Blueprint('usuario_bp', __name__)
 
@@ -10,11 +12,18 @@ def get_usuarios():
     """
     GET /usuarios
     Obtiene todos los usuarios.
+    Parámetros opcionales:
+        limit: Número máximo de resultados (el cursor siguiente va en X-Next-Cursor)
+        after: Devolver solo registros con id mayor a este cursor
+        fields: Columnas a incluir separadas por coma (ej. id,nombre)
     """
     try:
         service = UsuarioService(get_db_session())
-        usuarios = service.listar_usuarios()
-        return jsonify([u.as_dict() for u in usuarios]), 200
+        limit, after, fields = parametros_paginacion(request.args)
+        usuarios = service.listar_usuarios(limit=limit, after=after, fields=fields)
+        return respuesta_paginada(usuarios, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -60,13 +69,12 @@ def get_usuario(usuario_id):
         return jsonify({'error': str(e)}), 500
 
 @usuario_bp.route('/usuarios', methods=['POST'])
+@requiere_principal
 def crear_usuario():
     """
     POST /usuarios
     Crea un nuevo usuario.
-    Headers requeridos:
-        X-User-ID: ID del usuario que crea
-        X-User-Perfil: Perfil del usuario (debe ser 'administrador')
+    Requiere token JWT válido de un administrador.
     Parámetros (JSON):
         nombre (str): Nombre del usuario
         apellido (str): Apellido del usuario
@@ -75,11 +83,8 @@ def crear_usuario():
         perfil (str): 'deportista', 'profesor', 'administrador'
     """
     try:
-        usuario_creador_id = request.headers.get('X-User-ID')
-        usuario_creador_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_creador_id or not usuario_creador_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_creador_id = g.principal['id']
+        usuario_creador_perfil = g.principal['perfil']
 
         data = request.get_json()
         required_fields = ['nombre', 'apellido', 'email', 'perfil']
@@ -92,7 +97,7 @@ def crear_usuario():
             return jsonify({'error': 'El perfil debe ser deportista, profesor o administrador'}), 400
 
         service = UsuarioService(get_db_session())
-        usuario = service.crear_usuario(data, int(usuario_creador_id), usuario_creador_perfil)
+        usuario = service.crear_usuario(data, usuario_creador_id, usuario_creador_perfil)
         return jsonify(usuario.as_dict()), 201
         
     except ValueError as e:
@@ -101,24 +106,20 @@ def crear_usuario():
         return jsonify({'error': str(e)}), 500
 
 @usuario_bp.route('/usuarios/<int:usuario_id>', methods=['PUT'])
+@requiere_principal
 def actualizar_usuario(usuario_id):
     """
     PUT /usuarios/<usuario_id>
     Actualiza un usuario existente.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario
+    Requiere token JWT válido.
     """
     try:
-        usuario_actualizador_id = request.headers.get('X-User-ID')
-        usuario_actualizador_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_actualizador_id or not usuario_actualizador_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_actualizador_id = g.principal['id']
+        usuario_actualizador_perfil = g.principal['perfil']
 
         data = request.get_json()
         service = UsuarioService(get_db_session())
-        usuario = service.actualizar_usuario(usuario_id, data, int(usuario_actualizador_id), usuario_actualizador_perfil)
+        usuario = service.actualizar_usuario(usuario_id, data, usuario_actualizador_id, usuario_actualizador_perfil)
         
         if usuario:
             return jsonify(usuario.as_dict()), 200
@@ -130,23 +131,19 @@ def actualizar_usuario(usuario_id):
         return jsonify({'error': str(e)}), 500
 
 @usuario_bp.route('/usuarios/<int:usuario_id>', methods=['DELETE'])
+@requiere_principal
 def eliminar_usuario(usuario_id):
     """
     DELETE /usuarios/<usuario_id>
     Elimina (desactiva) un usuario.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario (debe ser 'administrador')
+    Requiere token JWT válido de un administrador.
     """
     try:
-        usuario_eliminador_id = request.headers.get('X-User-ID')
-        usuario_eliminador_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_eliminador_id or not usuario_eliminador_perfil:
-            return jsonify({'error': 'Headers X-User-ID y X-User-Perfil son requeridos'}), 400
+        usuario_eliminador_id = g.principal['id']
+        usuario_eliminador_perfil = g.principal['perfil']
 
         service = UsuarioService(get_db_session())
-        result = service.eliminar_usuario(usuario_id, int(usuario_eliminador_id), usuario_eliminador_perfil)
+        result = service.eliminar_usuario(usuario_id, usuario_eliminador_id, usuario_eliminador_perfil)
         
         if result:
             return jsonify({'message': 'Usuario eliminado'}), 200
@@ -158,19 +155,15 @@ def eliminar_usuario(usuario_id):
         return jsonify({'error': str(e)}), 500
 
 @usuario_bp.route('/usuarios/<int:usuario_id>/activar', methods=['POST'])
+@requiere_principal
 def activar_usuario(usuario_id):
     """
     POST /usuarios/<usuario_id>/activar
     Activa un usuario.
-    Headers requeridos:
-        X-User-ID: ID del usuario
-        X-User-Perfil: Perfil del usuario (debe ser 'administrador')
+    Requiere token JWT válido de un administrador.
     """
     try:
-        usuario_activador_perfil = request.headers.get('X-User-Perfil')
-        
-        if not usuario_activador_perfil:
-            return jsonify({'error': 'Header X-User-Perfil es requerido'}), 400
+        usuario_activador_perfil = g.principal['perfil']
 
         service = UsuarioService(get_db_session())
         usuario = service.activar_usuario(usuario_id, usuario_activador_perfil)
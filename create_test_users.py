@@ -4,9 +4,9 @@ Script para crear usuarios de prueba con contraseñas hasheadas.
 Ejecutar después de crear las tablas en la base de datos.
 """
 
-import bcrypt
 from config.database import get_db_session
 from models.usuario_model import Usuario
+from services.password_service import password_service
 
 def create_test_users():
     """
@@ -24,7 +24,7 @@ def create_test_users():
             username="admin",
             perfil="administrador"
         )
-        admin.set_password("admin123")
+        admin.password_hash = password_service.hash_password("admin123")
         
         # Usuario profesor
         profesor = Usuario(
@@ -35,7 +35,7 @@ def create_test_users():
             username="carlos_prof",
             perfil="profesor"
         )
-        profesor.set_password("prof123")
+        profesor.password_hash = password_service.hash_password("prof123")
         
         # Usuarios deportistas
         deportista1 = Usuario(
@@ -46,7 +46,7 @@ def create_test_users():
             username="juan_perez",
             perfil="deportista"
         )
-        deportista1.set_password("deportista123")
+        deportista1.password_hash = password_service.hash_password("deportista123")
         
         deportista2 = Usuario(
             nombre="María",
@@ -56,7 +56,7 @@ def create_test_users():
             username="maria_gonz",
             perfil="deportista"
         )
-        deportista2.set_password("deportista123")
+        deportista2.password_hash = password_service.hash_password("deportista123")
         
         deportista3 = Usuario(
             nombre="Pedro",
@@ -66,7 +66,7 @@ def create_test_users():
             username="pedro_rod",
             perfil="deportista"
         )
-        deportista3.set_password("deportista123")
+        deportista3.password_hash = password_service.hash_password("deportista123")
         
         deportista4 = Usuario(
             nombre="Ana",
@@ -76,7 +76,7 @@ def create_test_users():
             username="ana_mart",
             perfil="deportista"
         )
-        deportista4.set_password("deportista123")
+        deportista4.password_hash = password_service.hash_password("deportista123")
         
         # Agregar usuarios a la base de datos
         usuarios = [admin, profesor, deportista1, deportista2, deportista3, deportista4]
@@ -42,6 +42,8 @@ CREATE TABLE torneos (
     estado ENUM('planificado', 'en_curso', 'finalizado') DEFAULT 'planificado',
     profesor_id INT NOT NULL,
     max_participantes INT DEFAULT 32,
+    inscripciones_aceptadas INT NOT NULL DEFAULT 0,
+    modo_cuadro ENUM('por_ronda', 'completo') DEFAULT 'por_ronda',
     descripcion TEXT,
     fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (profesor_id) REFERENCES usuarios(id)
@@ -63,7 +65,7 @@ CREATE TABLE inscripciones (
 CREATE TABLE partidos (
     id INT AUTO_INCREMENT PRIMARY KEY,
     torneo_id INT NOT NULL,
-    deportista1_id INT NOT NULL,
+    deportista1_id INT,
     deportista2_id INT,
     ganador_id INT,
     perdedor_id INT,
@@ -78,4 +80,61 @@ CREATE TABLE partidos (
     FOREIGN KEY (deportista2_id) REFERENCES usuarios(id),
     FOREIGN KEY (ganador_id) REFERENCES usuarios(id),
     FOREIGN KEY (perdedor_id) REFERENCES usuarios(id)
-);
\ No newline at end of file
+);
+
+-- Crear índices compuestos para los filtros más frecuentes
+CREATE INDEX idx_torneos_tipo_estado ON torneos(tipo, estado);
+CREATE INDEX idx_inscripciones_torneo_estado ON inscripciones(torneo_id, estado);
+CREATE INDEX idx_partidos_torneo_ronda_estado ON partidos(torneo_id, numero_ronda, estado);
+CREATE INDEX idx_partidos_estado_fecha ON partidos(estado, fecha_partido);
+-- Crear la tabla de Tokens revocados (logout y rotación de refresh tokens)
+CREATE TABLE tokens_revocados (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    jti VARCHAR(36) UNIQUE NOT NULL,
+    tipo ENUM('access', 'refresh') NOT NULL,
+    usuario_id INT,
+    expira DATETIME NOT NULL,
+    fecha_revocacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
+);
+
+CREATE INDEX idx_tokens_revocados_expira ON tokens_revocados(expira);
+
+-- Crear la tabla de Notificaciones (se escriben al ocurrir cada evento)
+CREATE TABLE notificaciones (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    deportista_id INT NOT NULL,
+    tipo ENUM('victoria', 'derrota', 'nueva_ronda', 'inscripcion_aceptada', 'recordatorio') NOT NULL,
+    mensaje VARCHAR(255) NOT NULL,
+    detalles JSON,
+    torneo_id INT,
+    partido_id INT,
+    clave VARCHAR(100),
+    leida BOOLEAN DEFAULT FALSE,
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (deportista_id) REFERENCES usuarios(id),
+    FOREIGN KEY (torneo_id) REFERENCES torneos(id) ON DELETE CASCADE,
+    FOREIGN KEY (partido_id) REFERENCES partidos(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_notificaciones_deportista ON notificaciones(deportista_id, id);
+CREATE INDEX idx_notificaciones_deportista_leida ON notificaciones(deportista_id, leida);
+CREATE UNIQUE INDEX idx_notificaciones_clave ON notificaciones(clave);
+
+-- Crear la tabla de Envíos de notificaciones (bandeja de salida para entrega en segundo plano)
+CREATE TABLE envios_notificaciones (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    deportista_id INT NOT NULL,
+    contenido JSON NOT NULL,
+    estado ENUM('pendiente', 'procesando', 'enviado', 'fallido') DEFAULT 'pendiente',
+    intentos INT DEFAULT 0,
+    proximo_intento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    lote VARCHAR(32),
+    ultimo_error VARCHAR(255),
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_envio TIMESTAMP NULL,
+    FOREIGN KEY (deportista_id) REFERENCES usuarios(id)
+);
+
+CREATE INDEX idx_envios_estado_proximo ON envios_notificaciones(estado, proximo_intento);
+CREATE INDEX idx_envios_lote ON envios_notificaciones(lote);
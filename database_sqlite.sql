@@ -30,6 +30,8 @@ CREATE TABLE torneos (
     estado VARCHAR(20) DEFAULT 'planificado' CHECK (estado IN ('planificado', 'en_curso', 'finalizado')),
     profesor_id INTEGER NOT NULL,
     max_participantes INTEGER DEFAULT 32,
+    inscripciones_aceptadas INTEGER NOT NULL DEFAULT 0,
+    modo_cuadro VARCHAR(20) DEFAULT 'por_ronda' CHECK (modo_cuadro IN ('por_ronda', 'completo')),
     descripcion TEXT,
     fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (profesor_id) REFERENCES usuarios(id)
@@ -51,7 +53,7 @@ CREATE TABLE inscripciones (
 CREATE TABLE partidos (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     torneo_id INTEGER NOT NULL,
-    deportista1_id INTEGER NOT NULL,
+    deportista1_id INTEGER,
     deportista2_id INTEGER,
     ganador_id INTEGER,
     perdedor_id INTEGER,
@@ -73,8 +75,64 @@ CREATE INDEX idx_usuarios_email ON usuarios(email);
 CREATE INDEX idx_usuarios_username ON usuarios(username);
 CREATE INDEX idx_torneos_profesor ON torneos(profesor_id);
 CREATE INDEX idx_torneos_fecha ON torneos(fecha_inicio);
+CREATE INDEX idx_torneos_tipo_estado ON torneos(tipo, estado);
 CREATE INDEX idx_inscripciones_torneo ON inscripciones(torneo_id);
 CREATE INDEX idx_inscripciones_deportista ON inscripciones(deportista_id);
+CREATE INDEX idx_inscripciones_torneo_estado ON inscripciones(torneo_id, estado);
 CREATE INDEX idx_partidos_torneo ON partidos(torneo_id);
 CREATE INDEX idx_partidos_deportista1 ON partidos(deportista1_id);
 CREATE INDEX idx_partidos_deportista2 ON partidos(deportista2_id);
+CREATE INDEX idx_partidos_torneo_ronda_estado ON partidos(torneo_id, numero_ronda, estado);
+CREATE INDEX idx_partidos_estado_fecha ON partidos(estado, fecha_partido);
+
+-- Crear la tabla de Tokens revocados (logout y rotación de refresh tokens)
+CREATE TABLE tokens_revocados (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jti VARCHAR(36) UNIQUE NOT NULL,
+    tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('access', 'refresh')),
+    usuario_id INTEGER,
+    expira DATETIME NOT NULL,
+    fecha_revocacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
+);
+
+CREATE INDEX idx_tokens_revocados_expira ON tokens_revocados(expira);
+
+-- Crear la tabla de Notificaciones (se escriben al ocurrir cada evento)
+CREATE TABLE notificaciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    deportista_id INTEGER NOT NULL,
+    tipo VARCHAR(30) NOT NULL CHECK (tipo IN ('victoria', 'derrota', 'nueva_ronda', 'inscripcion_aceptada', 'recordatorio')),
+    mensaje VARCHAR(255) NOT NULL,
+    detalles JSON,
+    torneo_id INTEGER,
+    partido_id INTEGER,
+    clave VARCHAR(100),
+    leida BOOLEAN DEFAULT 0,
+    fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (deportista_id) REFERENCES usuarios(id),
+    FOREIGN KEY (torneo_id) REFERENCES torneos(id) ON DELETE CASCADE,
+    FOREIGN KEY (partido_id) REFERENCES partidos(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_notificaciones_deportista ON notificaciones(deportista_id, id);
+CREATE INDEX idx_notificaciones_deportista_leida ON notificaciones(deportista_id, leida);
+CREATE UNIQUE INDEX idx_notificaciones_clave ON notificaciones(clave);
+
+-- Crear la tabla de Envíos de notificaciones (bandeja de salida para entrega en segundo plano)
+CREATE TABLE envios_notificaciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    deportista_id INTEGER NOT NULL,
+    contenido JSON NOT NULL,
+    estado VARCHAR(20) DEFAULT 'pendiente' CHECK (estado IN ('pendiente', 'procesando', 'enviado', 'fallido')),
+    intentos INTEGER DEFAULT 0,
+    proximo_intento DATETIME DEFAULT CURRENT_TIMESTAMP,
+    lote VARCHAR(32),
+    ultimo_error VARCHAR(255),
+    fecha_creacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+    fecha_envio DATETIME,
+    FOREIGN KEY (deportista_id) REFERENCES usuarios(id)
+);
+
+CREATE INDEX idx_envios_estado_proximo ON envios_notificaciones(estado, proximo_intento);
+CREATE INDEX idx_envios_lote ON envios_notificaciones(lote);
@@ -0,0 +1,82 @@
+# datos_prueba.py
+"""
+Utilidades compartidas por los scripts de benchmark y de prueba: crean una base
+SQLite con todas las tablas de los modelos y cargan profesores, deportistas y
+partidos con inserts masivos. No tocan la base de datos de la aplicación.
+"""
+
+import os
+import tempfile
+from datetime import date
+from sqlalchemy import create_engine, insert
+from models.base import Base
+from models.usuario_model import Usuario
+from models.torneo_model import Torneo
+from models.partido_model import Partido
+from models.inscripcion_model import Inscripcion
+from models.notificacion_model import Notificacion
+from models.envio_notificacion_model import EnvioNotificacion
+from models.token_revocado_model import TokenRevocado
+
+def crear_engine(url='sqlite://', **kwargs):
+    """
+    Crea el engine (por defecto SQLite en memoria) y todas las tablas de los modelos.
+    """
+    engine = create_engine(url, **kwargs)
+    Base.metadata.create_all(engine)
+    return engine
+
+def crear_engine_temporal(nombre, **kwargs):
+    """
+    Igual que crear_engine, sobre un archivo SQLite en un directorio temporal;
+    necesario cuando varias conexiones deben ver los mismos datos.
+    """
+    ruta = os.path.join(tempfile.mkdtemp(), f'{nombre}.db')
+    return crear_engine(f'sqlite:///{ruta}', **kwargs)
+
+def crear_profesor(db, apellido='Prueba'):
+    """
+    Crea un profesor y hace flush para que tenga id.
+    """
+    profesor = Usuario(nombre='Profesor', apellido=apellido, email=f'profesor@{apellido.lower()}',
+                       username=f'profesor_{apellido.lower()}', password_hash='x', perfil='profesor')
+    db.add(profesor)
+    db.flush()
+    return profesor
+
+def crear_deportistas(db, cantidad, sufijo=''):
+    """
+    Crea cantidad deportistas con un único INSERT y retorna sus ids en orden.
+    El sufijo distingue email y username cuando se crean varios grupos en la misma base.
+    """
+    resultado = db.execute(insert(Usuario).returning(Usuario.id), [{
+        'nombre': f'Jugador{i}', 'apellido': f'Prueba{sufijo}', 'email': f'j{i}{sufijo}@prueba',
+        'username': f'j{i}{sufijo}', 'password_hash': 'x', 'perfil': 'deportista'
+    } for i in range(cantidad)])
+    return [fila.id for fila in resultado]
+
+def crear_inscripciones(db, torneo_id, deportista_ids, estado='aceptada'):
+    """
+    Inscribe a los deportistas en el torneo con un único INSERT.
+    """
+    db.execute(insert(Inscripcion), [{
+        'torneo_id': torneo_id, 'deportista_id': deportista_id, 'estado': estado
+    } for deportista_id in deportista_ids])
+
+def crear_primera_ronda(db, torneo_id, deportista_ids, estado='programado', fecha_partido=None):
+    """
+    Crea los partidos de la primera ronda emparejando los deportistas en orden.
+    Si estado es 'finalizado', gana siempre el primero de cada pareja.
+    """
+    fecha_partido = fecha_partido or date.today()
+    filas = []
+    for i in range(0, len(deportista_ids) - 1, 2):
+        fila = {
+            'torneo_id': torneo_id, 'deportista1_id': deportista_ids[i], 'deportista2_id': deportista_ids[i + 1],
+            'ronda': 'Ronda 1', 'numero_ronda': 1, 'posicion_cuadro': i // 2 + 1,
+            'fecha_partido': fecha_partido, 'estado': estado
+        }
+        if estado == 'finalizado':
+            fila.update(ganador_id=deportista_ids[i], perdedor_id=deportista_ids[i + 1], resultado='6-4 6-4')
+        filas.append(fila)
+    db.execute(insert(Partido), filas)
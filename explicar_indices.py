@@ -0,0 +1,82 @@
+# explicar_indices.py
+"""
+Script para comprobar que los filtros más frecuentes usan los índices declarados
+en los modelos. Muestra el EXPLAIN QUERY PLAN de cada consulta sin los índices
+(como en una base creada antes de declararlos) y después de crearlos; termina
+con error si alguna sigue recorriendo la tabla completa.
+Usa una base SQLite en memoria, así que no toca la base de datos de la aplicación.
+Uso: python explicar_indices.py
+"""
+
+from datetime import date, timedelta
+from sqlalchemy import create_engine, select, func
+from models.base import Base
+from models.usuario_model import Usuario
+from models.torneo_model import Torneo
+from models.partido_model import Partido
+from models.inscripcion_model import Inscripcion
+
+def consultas_frecuentes():
+    """
+    Consultas con los mismos filtros que los servicios, por descripción.
+    """
+    hoy = date.today()
+    return {
+        'Ganadores de una ronda (_obtener_ganadores_ronda)': select(Partido.ganador_id).where(
+            Partido.torneo_id == 1, Partido.numero_ronda == 1, Partido.estado == 'finalizado'
+        ).order_by(Partido.posicion_cuadro),
+        'Partidos a recordar (recordatorios)': select(Partido.id).where(
+            Partido.estado == 'programado', Partido.fecha_partido >= hoy,
+            Partido.fecha_partido <= hoy + timedelta(days=1)
+        ),
+        'Historial de un deportista': select(Partido.id).where(
+            (Partido.deportista1_id == 3) | (Partido.deportista2_id == 3)
+        ),
+        'Inscripciones aceptadas de un torneo': select(func.count(Inscripcion.id)).where(
+            Inscripcion.torneo_id == 1, Inscripcion.estado == 'aceptada'
+        ),
+        'Inscripciones de un deportista': select(Inscripcion.id).where(Inscripcion.deportista_id == 3),
+        'Torneos abiertos': select(Torneo.id).where(Torneo.tipo == 'abierto', Torneo.estado == 'planificado'),
+        'Torneos de un profesor': select(Torneo.id).where(Torneo.profesor_id == 1),
+    }
+
+def planes(conn):
+    """
+    Retorna el plan de cada consulta frecuente como texto.
+    """
+    resultado = {}
+    for descripcion, consulta in consultas_frecuentes().items():
+        compilada = consulta.compile(dialect=conn.dialect)
+        parametros = tuple(compilada.params[nombre] for nombre in compilada.positiontup)
+        filas = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compilada}", parametros).fetchall()
+        resultado[descripcion] = '; '.join(fila[-1] for fila in filas)
+    return resultado
+
+def indices_declarados():
+    return [indice for tabla in Base.metadata.sorted_tables for indice in tabla.indexes
+            if tabla.name in ('partidos', 'inscripciones', 'torneos')]
+
+def explicar_indices():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        for indice in indices_declarados():
+            indice.drop(bind=conn)
+        sin_indices = planes(conn)
+
+        for indice in indices_declarados():
+            indice.create(bind=conn, checkfirst=True)
+        con_indices = planes(conn)
+
+    for descripcion in sin_indices:
+        print(descripcion)
+        print(f"  sin índices: {sin_indices[descripcion]}")
+        print(f"  con índices: {con_indices[descripcion]}")
+
+    recorridos = [descripcion for descripcion, plan in con_indices.items() if 'SCAN ' in plan]
+    if recorridos:
+        raise SystemExit(f"Consultas que siguen recorriendo la tabla: {', '.join(recorridos)}")
+
+if __name__ == "__main__":
+    explicar_indices()
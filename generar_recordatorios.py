@@ -0,0 +1,16 @@
+# generar_recordatorios.py
+"""
+Script para generar los recordatorios de partidos próximos en la bandeja de notificaciones.
+Uso: python generar_recordatorios.py [dias_antes] [tamano_lote]   (por defecto 1 y 500)
+Se puede ejecutar desde cron; volver a ejecutarlo el mismo día no duplica recordatorios.
+Para programarlo dentro de la aplicación, configura RECORDATORIOS_HORA (ej. 08:00).
+"""
+
+import sys
+from services.recordatorios_job import ejecutar_recordatorios
+
+if __name__ == "__main__":
+    dias_antes = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    tamano_lote = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    guardados = ejecutar_recordatorios(dias_antes, tamano_lote)
+    print(f"Recordatorios nuevos guardados: {guardados}")
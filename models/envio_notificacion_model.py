@@ -0,0 +1,32 @@
+# models/envio_notificacion_model.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, JSON, Index
+from sqlalchemy.sql import func
+from models.base import Base
+
+class EnvioNotificacion(Base):
+    """
+    Bandeja de salida (outbox): cada fila es una notificación pendiente de entregar
+    por los canales externos. Se escribe en la misma transacción que la notificación.
+    """
+    __tablename__ = 'envios_notificaciones'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    deportista_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
+    contenido = Column(JSON, nullable=False)
+    estado = Column(Enum('pendiente', 'procesando', 'enviado', 'fallido', name='estado_envio_enum'), default='pendiente')
+    intentos = Column(Integer, default=0)
+    proximo_intento = Column(DateTime, default=datetime.now)
+    lote = Column(String(32))  # Trabajador que tomó la fila
+    ultimo_error = Column(String(255))
+    fecha_creacion = Column(DateTime, default=func.current_timestamp())
+    fecha_envio = Column(DateTime)
+
+    # Los trabajadores buscan por estado y vencimiento
+    __table_args__ = (
+        Index('idx_envios_estado_proximo', 'estado', 'proximo_intento'),
+        Index('idx_envios_lote', 'lote'),
+    )
+
+    def __repr__(self):
+        return f"<EnvioNotificacion(id={self.id}, deportista_id={self.deportista_id}, estado='{self.estado}', intentos={self.intentos})>"
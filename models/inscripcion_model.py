@@ -1,5 +1,5 @@
 # models/inscripcion_model.py
-from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from models.base import Base
@@ -17,9 +17,11 @@ class Inscripcion(Base):
     torneo = relationship("Torneo", back_populates="inscripciones")
     deportista = relationship("Usuario", foreign_keys=[deportista_id])
 
-    # Constraint único para evitar inscripciones duplicadas
+    # Constraint único para evitar inscripciones duplicadas e índices de consulta
     __table_args__ = (
         UniqueConstraint('torneo_id', 'deportista_id', name='unique_inscripcion'),
+        Index('idx_inscripciones_torneo_estado', 'torneo_id', 'estado'),
+        Index('idx_inscripciones_deportista', 'deportista_id'),
     )
 
     def as_dict(self):
@@ -0,0 +1,41 @@
+# models/notificacion_model.py
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, ForeignKey, JSON, Index
+from sqlalchemy.sql import func
+from models.base import Base
+
+class Notificacion(Base):
+    __tablename__ = 'notificaciones'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    deportista_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
+    tipo = Column(Enum('victoria', 'derrota', 'nueva_ronda', 'inscripcion_aceptada', 'recordatorio', name='tipo_notificacion_enum'), nullable=False)
+    mensaje = Column(String(255), nullable=False)
+    detalles = Column(JSON)
+    torneo_id = Column(Integer, ForeignKey('torneos.id', ondelete='CASCADE'))
+    partido_id = Column(Integer, ForeignKey('partidos.id', ondelete='CASCADE'))
+    clave = Column(String(100))  # Evita duplicar notificaciones generadas por procesos periódicos
+    leida = Column(Boolean, default=False)
+    fecha_creacion = Column(DateTime, default=func.current_timestamp())
+
+    # Bandeja por deportista ordenada por id (orden de creación) y conteo de no leídas
+    __table_args__ = (
+        Index('idx_notificaciones_deportista', 'deportista_id', 'id'),
+        Index('idx_notificaciones_deportista_leida', 'deportista_id', 'leida'),
+        Index('idx_notificaciones_clave', 'clave', unique=True),
+    )
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'deportista_id': self.deportista_id,
+            'tipo': self.tipo,
+            'mensaje': self.mensaje,
+            'detalles': self.detalles,
+            'torneo_id': self.torneo_id,
+            'partido_id': self.partido_id,
+            'leida': bool(self.leida),
+            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None
+        }
+
+    def __repr__(self):
+        return f"<Notificacion(id={self.id}, deportista_id={self.deportista_id}, tipo='{self.tipo}', leida={self.leida})>"
@@ -1,6 +1,6 @@
 # models/partido_model.py
-from sqlalchemy import Column, Integer, String, Date, Enum, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Date, Enum, ForeignKey, Index
+from sqlalchemy.orm import relationship, joinedload
 from models.base import Base
 
 class Partido(Base):
@@ -8,8 +8,8 @@ class Partido(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     torneo_id = Column(Integer, ForeignKey('torneos.id'), nullable=False)
-    deportista1_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
-    deportista2_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
+    deportista1_id = Column(Integer, ForeignKey('usuarios.id'))  # Nulo en partidos aún sin definir
+    deportista2_id = Column(Integer, ForeignKey('usuarios.id'))  # Nulo en partidos con bye
     ganador_id = Column(Integer, ForeignKey('usuarios.id'))
     perdedor_id = Column(Integer, ForeignKey('usuarios.id'))
     resultado = Column(String(50))
@@ -26,6 +26,27 @@ class Partido(Base):
     ganador = relationship("Usuario", foreign_keys=[ganador_id])
     perdedor = relationship("Usuario", foreign_keys=[perdedor_id])
 
+    # Índices para los filtros más frecuentes (ganadores por ronda, recordatorios, historial)
+    __table_args__ = (
+        Index('idx_partidos_torneo_ronda_estado', 'torneo_id', 'numero_ronda', 'estado'),
+        Index('idx_partidos_estado_fecha', 'estado', 'fecha_partido'),
+        Index('idx_partidos_deportista1', 'deportista1_id'),
+        Index('idx_partidos_deportista2', 'deportista2_id'),
+    )
+
+    @classmethod
+    def opciones_carga_usuarios(cls):
+        """
+        Opciones de carga para traer los usuarios referenciados en la misma consulta,
+        evitando un SELECT adicional por relación y fila al llamar a as_dict().
+        """
+        return (
+            joinedload(cls.deportista1),
+            joinedload(cls.deportista2),
+            joinedload(cls.ganador),
+            joinedload(cls.perdedor)
+        )
+
     def as_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,24 @@
+# models/token_revocado_model.py
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index
+from sqlalchemy.sql import func
+from models.base import Base
+
+class TokenRevocado(Base):
+    __tablename__ = 'tokens_revocados'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(36), unique=True, nullable=False)
+    tipo = Column(Enum('access', 'refresh', name='tipo_token_enum'), nullable=False)
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'))
+    expira = Column(DateTime, nullable=False)
+    fecha_revocacion = Column(DateTime, default=func.current_timestamp())
+
+    # El índice por expiración permite purgar los tokens vencidos sin recorrer la tabla,
+    # y el de fecha_revocacion traer solo las revocaciones recientes al sincronizar
+    __table_args__ = (
+        Index('idx_tokens_revocados_expira', 'expira'),
+        Index('idx_tokens_revocados_fecha', 'fecha_revocacion'),
+    )
+
+    def __repr__(self):
+        return f"<TokenRevocado(jti='{self.jti}', tipo='{self.tipo}', usuario_id={self.usuario_id})>"
@@ -1,5 +1,5 @@
 # models/torneo_model.py
-from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Enum, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from models.base import Base
@@ -16,6 +16,10 @@ class Torneo(Base):
     estado = Column(Enum('planificado', 'en_curso', 'finalizado', name='estado_torneo_enum'), default='planificado')
     profesor_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
     max_participantes = Column(Integer, default=32)
+    # Contador de inscripciones aceptadas; se modifica con UPDATE condicionales
+    # para que inscripciones concurrentes no superen max_participantes
+    inscripciones_aceptadas = Column(Integer, nullable=False, default=0, server_default='0')
+    modo_cuadro = Column(Enum('por_ronda', 'completo', name='modo_cuadro_enum'), default='por_ronda')
     descripcion = Column(Text)
     fecha_creacion = Column(DateTime, default=func.current_timestamp())
 
@@ -24,6 +28,13 @@ class Torneo(Base):
     inscripciones = relationship("Inscripcion", back_populates="torneo", cascade="all, delete-orphan")
     partidos = relationship("Partido", back_populates="torneo", cascade="all, delete-orphan")
 
+    # Índices para torneos abiertos, torneos por profesor y orden por fecha
+    __table_args__ = (
+        Index('idx_torneos_tipo_estado', 'tipo', 'estado'),
+        Index('idx_torneos_profesor', 'profesor_id'),
+        Index('idx_torneos_fecha', 'fecha_inicio'),
+    )
+
     def as_dict(self):
         return {
             'id': self.id,
@@ -36,6 +47,8 @@ class Torneo(Base):
             'profesor_id': self.profesor_id,
             'profesor_nombre': f"{self.profesor.nombre} {self.profesor.apellido}" if self.profesor else None,
             'max_participantes': self.max_participantes,
+            'inscripciones_aceptadas': self.inscripciones_aceptadas,
+            'modo_cuadro': self.modo_cuadro or 'por_ronda',
             'descripcion': self.descripcion,
             'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None
         }
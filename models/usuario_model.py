@@ -1,5 +1,4 @@
 # models/usuario_model.py
-import bcrypt
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
 from sqlalchemy.sql import func
 from models.base import Base
@@ -18,19 +17,6 @@ class Usuario(Base):
     activo = Column(Boolean, default=True)
     fecha_registro = Column(DateTime, default=func.current_timestamp())
 
-    def set_password(self, password):
-        """
-        Genera y almacena el hash de la contraseña.
-        """
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
-
-    def check_password(self, password):
-        """
-        Verifica si la contraseña proporcionada coincide con el hash almacenado.
-        """
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
-
     def as_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,22 @@
+# procesar_entregas.py
+"""
+Script para entregar las notificaciones pendientes en un proceso aparte de la aplicación.
+Uso: python procesar_entregas.py [trabajadores]   (por defecto 2)
+Los canales se configuran con ENTREGAS_SINKS (log, archivo, smtp). Si se usa este
+script, conviene iniciar la aplicación con ENTREGAS_TRABAJADORES=0.
+"""
+
+import sys
+import time
+from services.entrega_notificaciones import PoolEntregas, ProcesadorEntregas, crear_sinks
+
+if __name__ == "__main__":
+    trabajadores = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    pool = PoolEntregas(ProcesadorEntregas(crear_sinks()), num_trabajadores=trabajadores)
+    pool.iniciar()
+    print(f"Entregando notificaciones con {trabajadores} trabajadores (Ctrl+C para salir)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.detener(timeout=5)
@@ -0,0 +1,74 @@
+# prueba_broker_eventos.py
+"""
+Script para verificar el reparto de eventos SSE entre procesos con BrokerRedis
+sobre ClientePubSubMemoria (sin servidor Redis). Dos buses comparten el cliente,
+como lo harían dos procesos de la aplicación.
+1. Un evento publicado en un bus llega a los suscriptores del otro.
+2. Tras simular una caída de la conexión, el hilo de escucha vuelve a suscribirse
+   con backoff y los eventos publicados después siguen llegando.
+3. Un mensaje con JSON inválido se descarta sin detener la escucha.
+Uso: python prueba_broker_eventos.py [caidas]   (por defecto 3)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.eventos import BusEventos, BrokerRedis, ClientePubSubMemoria, canal_deportista
+
+# Backoff corto para no esperar el configurado por defecto
+BACKOFF_BASE = 0.05
+BACKOFF_MAXIMO = 0.2
+TIMEOUT = 2
+
+def publicar_hasta_recibir(bus, suscripcion, datos):
+    """
+    Publica el evento hasta que el suscriptor lo recibe o vence el timeout; tras una
+    caída, lo publicado antes de que el broker vuelva a suscribirse se pierde.
+    Retorna el evento recibido o None.
+    """
+    limite = time.monotonic() + TIMEOUT
+    while time.monotonic() < limite:
+        bus.publicar(canal_deportista(1), 'notificacion', datos)
+        evento = suscripcion.obtener(timeout=BACKOFF_BASE)
+        if evento is not None:
+            return evento
+    return None
+
+def prueba_broker(caidas):
+    cliente = ClientePubSubMemoria()
+    brokers = [BrokerRedis(cliente, backoff_base=BACKOFF_BASE, backoff_maximo=BACKOFF_MAXIMO) for _ in range(2)]
+    publicador, receptor = BusEventos(brokers[0]), BusEventos(brokers[1])
+    suscripcion = receptor.suscribir(canal_deportista(1))
+
+    try:
+        evento = publicar_hasta_recibir(publicador, suscripcion, {'n': 0})
+        assert evento == {'tipo': 'notificacion', 'datos': {'n': 0}}, "El evento no llegó al otro bus"
+        print("entrega entre buses: OK")
+
+        for caida in range(1, caidas + 1):
+            cliente.desconectar()
+            inicio = time.monotonic()
+            evento = publicar_hasta_recibir(publicador, suscripcion, {'n': caida})
+            assert evento is not None, f"No se recibieron eventos tras la caída {caida}"
+            print(f"caída {caida}: reconectado en {time.monotonic() - inicio:.2f}s")
+            while suscripcion.obtener(timeout=0.01) is not None:
+                pass  # Descartar los duplicados de los reintentos de publicación
+
+        cliente.publish(brokers[0].prefijo + canal_deportista(1), '{no es json')
+        evento = publicar_hasta_recibir(publicador, suscripcion, {'n': 'final'})
+        assert evento and evento['datos'] == {'n': 'final'}, "Un mensaje inválido detuvo la escucha"
+        print("mensaje inválido descartado: OK")
+    finally:
+        suscripcion.cerrar()
+        for broker in brokers:
+            broker.detener(timeout=TIMEOUT)
+
+    assert not any(broker._hilo.is_alive() for broker in brokers), "El hilo de escucha no se detuvo"
+    print("OK")
+
+if __name__ == "__main__":
+    caidas = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    prueba_broker(caidas)
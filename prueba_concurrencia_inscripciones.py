@@ -0,0 +1,83 @@
+# prueba_concurrencia_inscripciones.py
+"""
+Script para verificar que inscripciones concurrentes no superan max_participantes.
+Lanza N hilos que se inscriben a la vez en un torneo abierto con cupo M y comprueba
+que quedan exactamente M aceptadas y que el contador inscripciones_aceptadas coincide.
+Usa una base SQLite temporal, así que no toca la base de datos de la aplicación.
+Uso: python prueba_concurrencia_inscripciones.py [hilos] [cupo]   (por defecto 300 y 50)
+"""
+
+import sys
+import threading
+from collections import Counter
+from datetime import date
+from sqlalchemy.orm import sessionmaker, scoped_session
+from models.torneo_model import Torneo
+from models.inscripcion_model import Inscripcion
+from services.inscripcion_service import InscripcionService
+from datos_prueba import crear_engine_temporal, crear_profesor, crear_deportistas
+
+def preparar_torneo(Session, num_deportistas, cupo):
+    """
+    Crea el profesor, num_deportistas deportistas y un torneo abierto con el cupo dado.
+    Retorna el id del torneo y los ids de los deportistas.
+    """
+    db = Session()
+    profesor = crear_profesor(db)
+    deportista_ids = crear_deportistas(db, num_deportistas)
+
+    torneo = Torneo(nombre='Torneo concurrente', superficie='arcilla', fecha_inicio=date.today(),
+                    tipo='abierto', profesor_id=profesor.id, max_participantes=cupo)
+    db.add(torneo)
+    db.commit()
+    torneo_id = torneo.id
+    Session.remove()
+    return torneo_id, deportista_ids
+
+def prueba_concurrencia(num_hilos, cupo):
+    engine = crear_engine_temporal('concurrencia', connect_args={'check_same_thread': False, 'timeout': 30})
+    Session = scoped_session(sessionmaker(bind=engine))
+
+    torneo_id, deportista_ids = preparar_torneo(Session, num_hilos, cupo)
+
+    resultados = Counter()
+    lock = threading.Lock()
+    barrera = threading.Barrier(num_hilos)
+
+    def inscribir(deportista_id):
+        barrera.wait()
+        try:
+            InscripcionService(Session()).inscribir_deportista(torneo_id, deportista_id, deportista_id, 'deportista')
+            resultado = 'aceptada'
+        except ValueError as e:
+            resultado = str(e)
+        finally:
+            Session.remove()
+        with lock:
+            resultados[resultado] += 1
+
+    hilos = [threading.Thread(target=inscribir, args=(deportista_id,)) for deportista_id in deportista_ids]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    db = Session()
+    aceptadas = db.query(Inscripcion).filter(
+        Inscripcion.torneo_id == torneo_id,
+        Inscripcion.estado == 'aceptada'
+    ).count()
+    contador = db.query(Torneo.inscripciones_aceptadas).filter(Torneo.id == torneo_id).scalar()
+    Session.remove()
+
+    for resultado, cantidad in resultados.most_common():
+        print(f"{cantidad:>6}  {resultado}")
+    print(f"cupo={cupo} aceptadas={aceptadas} inscripciones_aceptadas={contador}")
+
+    assert aceptadas == cupo == contador, "Las inscripciones concurrentes no respetaron el cupo"
+    print("OK")
+
+if __name__ == "__main__":
+    num_hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    cupo = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    prueba_concurrencia(num_hilos, cupo)
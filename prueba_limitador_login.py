@@ -0,0 +1,101 @@
+# prueba_limitador_login.py
+"""
+Script para verificar el límite de intentos de login con el backend compartido
+(BackendCompartido sobre ClienteSortedSetMemoria, sin servidor Redis).
+1. Lanza N logins fallidos simultáneos contra una cuenta: solo max_intentos_email
+   llegan a verificar la contraseña (401) y el resto recibe 429 con Retry-After.
+2. Hace más logins correctos seguidos que el máximo por IP: como los exitosos se
+   descuentan, ninguno se bloquea.
+3. Espera a que pase la ventana y comprueba que la cuenta bloqueada puede volver a entrar.
+Se ejecuta en un directorio temporal con SQLite, así que no toca la base de datos
+de la aplicación.
+Uso: python prueba_limitador_login.py [intentos]   (por defecto 30)
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from collections import Counter
+
+# La base SQLite de la aplicación se crea en el directorio actual al importar config.database
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp())
+os.environ['USE_MYSQL'] = 'false'
+os.environ.setdefault('ENTREGAS_TRABAJADORES', '0')
+
+from config.database import get_db_session, close_db_session
+from models.usuario_model import Usuario
+from services.password_service import password_service
+from services.limitador_login import limitador_login, BackendCompartido, ClienteSortedSetMemoria
+from datos_prueba import crear_deportistas
+from Main_tenis import app
+
+# Ventana corta para poder comprobar el desbloqueo sin esperar la configurada
+VENTANA_SEGUNDOS = 3
+PASSWORD = 'Clave123!'
+
+def preparar_usuarios():
+    """
+    Crea dos deportistas con contraseña real y retorna sus emails.
+    """
+    db = get_db_session()
+    ids = crear_deportistas(db, 2)
+    usuarios = db.query(Usuario).filter(Usuario.id.in_(ids)).order_by(Usuario.id).all()
+    for usuario in usuarios:
+        usuario.password_hash = password_service.hash_password(PASSWORD)
+    emails = [usuario.email for usuario in usuarios]
+    db.commit()
+    close_db_session()
+    return emails
+
+def login(email, password):
+    respuesta = app.test_client().post('/api/auth/login', json={'email': email, 'password': password})
+    return respuesta.status_code, respuesta.headers.get('Retry-After')
+
+def prueba_limitador(num_intentos):
+    limitador_login.backend = BackendCompartido(ClienteSortedSetMemoria())
+    limitador_login.ventana = VENTANA_SEGUNDOS
+    maximo = limitador_login.max_intentos_email
+    bloqueado, otro = preparar_usuarios()
+
+    codigos = Counter()
+    esperas = []
+    lock = threading.Lock()
+    barrera = threading.Barrier(num_intentos)
+
+    def intento():
+        barrera.wait()
+        codigo, espera = login(bloqueado, 'incorrecta')
+        with lock:
+            codigos[codigo] += 1
+            if codigo == 429:
+                esperas.append(espera)
+
+    hilos = [threading.Thread(target=intento) for _ in range(num_intentos)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    print(f"intentos simultáneos={num_intentos} max_intentos_email={maximo} respuestas={dict(codigos)}")
+    assert codigos[401] == maximo, "Más intentos de los permitidos llegaron a verificar la contraseña"
+    assert codigos[429] == num_intentos - maximo, "Los intentos sobrantes no se rechazaron con 429"
+    assert all(espera and int(espera) > 0 for espera in esperas), "Falta Retry-After en alguna respuesta 429"
+    assert login(bloqueado, PASSWORD)[0] == 429, "La cuenta bloqueada aceptó un login antes de la ventana"
+
+    exitosos = Counter(login(otro, PASSWORD)[0] for _ in range(limitador_login.max_intentos_ip + 5))
+    print(f"logins correctos seguidos={sum(exitosos.values())} max_intentos_ip={limitador_login.max_intentos_ip} "
+          f"respuestas={dict(exitosos)}")
+    assert set(exitosos) == {200}, "Los logins correctos se contaron contra el límite por IP"
+
+    time.sleep(VENTANA_SEGUNDOS + 0.5)
+    codigo, _ = login(bloqueado, PASSWORD)
+    print(f"tras la ventana: {codigo}")
+    assert codigo == 200, "La cuenta no se desbloqueó al pasar la ventana"
+    print("OK")
+
+if __name__ == "__main__":
+    num_intentos = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    prueba_limitador(num_intentos)
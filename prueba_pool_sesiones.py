@@ -0,0 +1,116 @@
+# prueba_pool_sesiones.py
+"""
+Script para verificar que las sesiones por request devuelven sus conexiones al pool.
+Lanza N hilos que hacen peticiones a la aplicación (listados normales y en streaming
+NDJSON) durante varias rondas, mientras un hilo muestrea el pool. Al terminar cada
+ronda comprueba que no quedan conexiones prestadas, y al final que el overflow nunca
+superó su límite y que ninguna petición falló.
+Se ejecuta en un directorio temporal con SQLite, así que no toca la base de datos
+de la aplicación.
+Uso: python prueba_pool_sesiones.py [hilos] [rondas]   (por defecto 50 y 5)
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from collections import Counter
+from datetime import date
+
+# La base SQLite de la aplicación se crea en el directorio actual al importar config.database
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp())
+os.environ['USE_MYSQL'] = 'false'
+os.environ.setdefault('ENTREGAS_TRABAJADORES', '0')
+
+from config.database import engine, get_db_session, close_db_session
+from models.torneo_model import Torneo
+from datos_prueba import crear_profesor, crear_deportistas, crear_primera_ronda
+from Main_tenis import app
+
+NUM_DEPORTISTAS = 64
+
+def preparar_datos():
+    """
+    Crea un torneo con la primera ronda finalizada. Retorna los ids de los deportistas.
+    """
+    db = get_db_session()
+    profesor = crear_profesor(db)
+    torneo = Torneo(nombre='Torneo pool', superficie='arcilla', fecha_inicio=date.today(),
+                    tipo='abierto', profesor_id=profesor.id)
+    db.add(torneo)
+    db.flush()
+    deportista_ids = crear_deportistas(db, NUM_DEPORTISTAS)
+    crear_primera_ronda(db, torneo.id, deportista_ids, estado='finalizado')
+    db.commit()
+    close_db_session()
+    return deportista_ids
+
+def rutas(deportista_ids):
+    """
+    Peticiones que se reparten los hilos: streaming NDJSON y listados normales.
+    """
+    return [
+        '/api/partidos?stream=1',
+        f'/api/deportistas/{deportista_ids[0]}/historial?stream=1',
+        '/api/partidos?limit=20',
+        f'/api/deportistas/{deportista_ids[1]}/historial',
+    ]
+
+def prueba_pool(num_hilos, rondas):
+    deportista_ids = preparar_datos()
+    lista_rutas = rutas(deportista_ids)
+    pool = engine.pool
+    max_overflow = pool._max_overflow
+
+    pico = {'prestadas': 0, 'overflow': 0}
+    muestrear = threading.Event()
+
+    def muestreador():
+        while not muestrear.is_set():
+            pico['prestadas'] = max(pico['prestadas'], pool.checkedout())
+            pico['overflow'] = max(pico['overflow'], pool.overflow())
+            time.sleep(0.001)
+
+    hilo_muestreo = threading.Thread(target=muestreador)
+    hilo_muestreo.start()
+
+    codigos = Counter()
+    lock = threading.Lock()
+
+    def peticion(indice):
+        cliente = app.test_client()
+        respuesta = cliente.get(lista_rutas[indice % len(lista_rutas)])
+        respuesta.get_data()  # Consumir el cuerpo completo, también en streaming
+        respuesta.close()
+        with lock:
+            codigos[respuesta.status_code] += 1
+
+    print(f"{'ronda':>6} {'prestadas al final':>19}")
+    try:
+        for ronda in range(1, rondas + 1):
+            hilos = [threading.Thread(target=peticion, args=(i,)) for i in range(num_hilos)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+            prestadas = pool.checkedout()
+            print(f"{ronda:>6} {prestadas:>19}")
+            assert prestadas == 0, f"Quedaron {prestadas} conexiones prestadas tras la ronda {ronda}"
+    finally:
+        muestrear.set()
+        hilo_muestreo.join()
+
+    print(f"peticiones={dict(codigos)} pool_size={pool.size()} max_overflow={max_overflow} "
+          f"pico_prestadas={pico['prestadas']} pico_overflow={max(pico['overflow'], 0)}")
+
+    assert set(codigos) == {200}, "Alguna petición no respondió 200"
+    assert pico['overflow'] <= max_overflow, "El overflow del pool superó su límite"
+    print("OK")
+
+if __name__ == "__main__":
+    num_hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rondas = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    prueba_pool(num_hilos, rondas)
@@ -1,7 +1,11 @@
 # services/auth_service.py
 import logging
-from flask_jwt_extended import create_access_token, get_jwt_identity
+from datetime import timedelta
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity
 from models.usuario_model import Usuario
+from services.password_service import PasswordPoolSaturadoError, password_service
+from services.usuario_service import cache_usuarios
+from config.jwt_config import STREAM_TOKEN_EXPIRES
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +23,15 @@ class AuthService:
                 Usuario.activo == True
             ).first()
 
-            if usuario and usuario.check_password(password):
+            if usuario and self._verificar_password(usuario, password):
                 logger.info(f"Usuario autenticado: {username}")
+                self._rehash_si_necesario(usuario, password)
                 return usuario
             else:
                 logger.warning(f"Intento de login fallido para usuario: {username}")
                 return None
+        except PasswordPoolSaturadoError:
+            raise
         except Exception as e:
             logger.error(f"Error en autenticación: {str(e)}")
             return None
@@ -39,16 +46,47 @@ class AuthService:
                 Usuario.activo == True
             ).first()
 
-            if usuario and usuario.check_password(password):
+            if usuario and self._verificar_password(usuario, password):
                 logger.info(f"Usuario autenticado por email: {email}")
+                self._rehash_si_necesario(usuario, password)
                 return usuario
             else:
                 logger.warning(f"Intento de login fallido para email: {email}")
                 return None
+        except PasswordPoolSaturadoError:
+            raise
         except Exception as e:
             logger.error(f"Error en autenticación por email: {str(e)}")
             return None
 
+    def _asignar_password(self, usuario, password):
+        """
+        Genera y almacena el hash de la contraseña (en el pool acotado de bcrypt).
+        """
+        usuario.password_hash = password_service.hash_password(password)
+
+    def _verificar_password(self, usuario, password):
+        """
+        Verifica la contraseña contra el hash almacenado (en el pool acotado de bcrypt).
+        """
+        return password_service.check_password(password, usuario.password_hash)
+
+    def _rehash_si_necesario(self, usuario, password):
+        """
+        Tras un login correcto, vuelve a generar el hash si su costo no coincide
+        con BCRYPT_ROUNDS. Permite reajustar el costo sin forzar cambios de contraseña.
+        Un fallo aquí no impide el login; se reintentará en el siguiente.
+        """
+        if not password_service.necesita_rehash(usuario.password_hash):
+            return
+        try:
+            self._asignar_password(usuario, password)
+            self.db.commit()
+            logger.info(f"Hash de contraseña actualizado al costo {password_service.rounds} para usuario ID: {usuario.id}")
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"No se pudo actualizar el hash del usuario ID {usuario.id}: {str(e)}")
+
     def create_access_token(self, usuario):
         """
         Crea un token JWT para el usuario.
@@ -70,6 +108,36 @@ class AuthService:
             logger.error(f"Error creando token JWT: {str(e)}")
             return None
 
+    def create_stream_token(self, principal):
+        """
+        Crea un token de corta duración con alcance 'stream', para abrir un canal SSE
+        con ?token=. Solo lo aceptan los endpoints de stream.
+        """
+        try:
+            return create_access_token(
+                identity=str(principal['id']),
+                additional_claims={
+                    "perfil": principal['perfil'],
+                    "nombre": principal['nombre'],
+                    "apellido": principal['apellido'],
+                    "alcance": "stream"
+                },
+                expires_delta=timedelta(seconds=STREAM_TOKEN_EXPIRES)
+            )
+        except Exception as e:
+            logger.error(f"Error creando token de stream: {str(e)}")
+            return None
+
+    def create_refresh_token(self, usuario):
+        """
+        Crea un refresh token para renovar el token de acceso sin volver a verificar la contraseña.
+        """
+        try:
+            return create_refresh_token(identity=str(usuario.id))
+        except Exception as e:
+            logger.error(f"Error creando refresh token: {str(e)}")
+            return None
+
     def get_current_user(self):
         """
         Obtiene el usuario actual basado en el token JWT.
@@ -89,6 +157,38 @@ class AuthService:
             logger.error(f"Error obteniendo usuario actual: {str(e)}")
             return None
 
+    def get_current_user_dict(self):
+        """
+        Obtiene el usuario actual serializado, usando la cache de usuarios.
+        Solo consulta la base de datos si el usuario no está en cache.
+        """
+        try:
+            user_id = get_jwt_identity()
+            if not user_id:
+                return None
+            user_id = int(user_id)
+
+            usuario_dict = cache_usuarios.obtener(user_id)
+            if usuario_dict is not None:
+                return usuario_dict
+
+            # La generación evita guardar un usuario leído antes de una invalidación
+            # concurrente, por ejemplo una desactivación
+            generacion = cache_usuarios.generacion(user_id)
+            usuario = self.db.query(Usuario).filter(
+                Usuario.id == user_id,
+                Usuario.activo == True
+            ).first()
+            if not usuario:
+                return None
+
+            usuario_dict = usuario.as_dict()
+            cache_usuarios.guardar(user_id, usuario_dict, generacion=generacion)
+            return usuario_dict
+        except Exception as e:
+            logger.error(f"Error obteniendo usuario actual: {str(e)}")
+            return None
+
     def register_user(self, data):
         """
         Registra un nuevo usuario.
@@ -117,7 +217,7 @@ class AuthService:
             )
 
             # Establecer contraseña con hash
-            usuario.set_password(data['password'])
+            self._asignar_password(usuario, data['password'])
 
             self.db.add(usuario)
             self.db.commit()
@@ -140,10 +240,10 @@ class AuthService:
             if not usuario:
                 raise ValueError("Usuario no encontrado")
 
-            if not usuario.check_password(current_password):
+            if not self._verificar_password(usuario, current_password):
                 raise ValueError("Contraseña actual incorrecta")
 
-            usuario.set_password(new_password)
+            self._asignar_password(usuario, new_password)
             self.db.commit()
 
             logger.info(f"Contraseña cambiada para usuario: {usuario.username}")
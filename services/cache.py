@@ -0,0 +1,97 @@
+# services/cache.py
+import time
+import threading
+from collections import OrderedDict
+
+class CacheLRU:
+    """
+    Cache en proceso con expulsión LRU y expiración opcional por entrada.
+    Lleva contadores de aciertos y fallos para monitoreo.
+    Cada clave tiene una generación que avanza al invalidarla: quien llena la cache
+    tras un fallo toma la generación antes de leer la base y la pasa a guardar, que
+    descarta el valor si hubo una invalidación entre la lectura y el guardado.
+    Las generaciones salen de un contador global y se guardan solo para max_items
+    claves; al descartar una (por expulsión o por el límite) su valor pasa al piso,
+    que es la generación de las claves sin entrada. Así la generación de una clave
+    nunca retrocede, y descartarla a lo sumo hace que un guardado en curso se omita.
+    """
+    def __init__(self, max_items=1024, ttl=None):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._generaciones = OrderedDict()
+        self._contador = 0
+        self._piso = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """
+        Retorna el valor cacheado o None si no existe o expiró.
+        """
+        with self._lock:
+            entrada = self._items.get(clave)
+            if entrada is None or (entrada[1] is not None and time.monotonic() >= entrada[1]):
+                if entrada is not None:
+                    del self._items[clave]
+                    self._descartar_generacion(clave)
+                self.misses += 1
+                return None
+            self._items.move_to_end(clave)
+            self.hits += 1
+            return entrada[0]
+
+    def generacion(self, clave):
+        """
+        Retorna la generación actual de la clave, a tomar antes de leer la base de datos.
+        """
+        with self._lock:
+            return self._generaciones.get(clave, self._piso)
+
+    def guardar(self, clave, valor, ttl=None, generacion=None):
+        """
+        Guarda un valor. ttl permite fijar una expiración distinta a la de la cache.
+        Con generacion, no guarda nada si la clave se invalidó después de tomarla.
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        with self._lock:
+            if generacion is not None and generacion != self._generaciones.get(clave, self._piso):
+                return
+            expira = time.monotonic() + ttl if ttl else None
+            self._items[clave] = (valor, expira)
+            self._items.move_to_end(clave)
+            while len(self._items) > self.max_items:
+                expulsada, _ = self._items.popitem(last=False)
+                self._descartar_generacion(expulsada)
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._items.pop(clave, None)
+            self._contador += 1
+            self._generaciones[clave] = self._contador
+            self._generaciones.move_to_end(clave)
+            while len(self._generaciones) > self.max_items:
+                _, generacion = self._generaciones.popitem(last=False)
+                self._piso = max(self._piso, generacion)
+
+    def _descartar_generacion(self, clave):
+        generacion = self._generaciones.pop(clave, None)
+        if generacion is not None:
+            self._piso = max(self._piso, generacion)
+
+    def limpiar(self):
+        with self._lock:
+            self._items.clear()
+            self._generaciones.clear()
+            self._contador += 1
+            self._piso = self._contador
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'items': len(self._items),
+                'max_items': self.max_items
+            }
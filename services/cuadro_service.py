@@ -1,19 +1,29 @@
 # services/cuadro_service.py
 import math
 from datetime import datetime, timedelta
+from sqlalchemy import insert
 from models.torneo_model import Torneo
 from models.partido_model import Partido
 from models.inscripcion_model import Inscripcion
 from models.usuario_model import Usuario
+from services.usuario_service import UsuarioService
+from services.notificacion_service import NotificacionService
+from services.eventos import bus_eventos, canal_cuadro
 
 class CuadroService:
     def __init__(self, db_session):
         self.db = db_session
 
-    def generar_cuadro_torneo(self, torneo_id, usuario_id, usuario_perfil):
+    def generar_cuadro_torneo(self, torneo_id, usuario_id, usuario_perfil, modo='por_ronda'):
         """
         Genera automáticamente el cuadro de torneo basado en las inscripciones aceptadas.
+        - modo 'por_ronda': crea la primera ronda; las siguientes se crean con avanzar_ronda
+        - modo 'completo': crea todas las rondas de una vez y los ganadores avanzan
+          al registrar cada resultado
         """
+        if modo not in ['por_ronda', 'completo']:
+            raise ValueError("El modo de cuadro debe ser 'por_ronda' o 'completo'")
+
         # Verificar permisos
         torneo = self.db.query(Torneo).filter(Torneo.id == torneo_id).first()
         if not torneo:
@@ -25,13 +35,15 @@ class CuadroService:
         if torneo.estado != 'planificado':
             raise ValueError("Solo se puede generar el cuadro en torneos planificados")
 
-        # Obtener inscripciones aceptadas
-        inscripciones = self.db.query(Inscripcion).filter(
+        # Obtener deportistas con inscripción aceptada en una sola consulta
+        deportistas = self.db.query(Usuario).join(
+            Inscripcion, Inscripcion.deportista_id == Usuario.id
+        ).filter(
             Inscripcion.torneo_id == torneo_id,
             Inscripcion.estado == 'aceptada'
         ).all()
 
-        if len(inscripciones) < 2:
+        if len(deportistas) < 2:
             raise ValueError("Se necesitan al menos 2 deportistas inscritos para generar el cuadro")
 
         # Verificar que no existe ya un cuadro
@@ -39,9 +51,6 @@ class CuadroService:
         if partidos_existentes > 0:
             raise ValueError("Ya existe un cuadro para este torneo")
 
-        # Obtener lista de deportistas
-        deportistas = [inscripcion.deportista for inscripcion in inscripciones]
-        
         # Calcular número de rondas necesarias
         num_participantes = len(deportistas)
         num_rondas = int(math.ceil(math.log2(num_participantes)))
@@ -53,19 +62,37 @@ class CuadroService:
         # Generar cuadro
         cuadro = self._generar_estructura_cuadro(deportistas, potencia_2, byes_necesarios)
         
-        # Crear partidos en la base de datos
-        partidos_creados = self._crear_partidos_cuadro(torneo_id, cuadro, torneo.fecha_inicio)
-        
-        # Actualizar estado del torneo
+        # Serializar antes del commit, que expira los deportistas ya cargados
+        cuadro_serializado = [self._serializar_partido_cuadro(partido) for partido in cuadro]
+
+        # Crear partidos, notificaciones y actualizar el estado del torneo en una sola transacción
+        rondas_a_crear = num_rondas if modo == 'completo' else 1
+        filas = self._crear_partidos_cuadro(torneo_id, cuadro, torneo.fecha_inicio, rondas_a_crear)
+        # Se notifican los partidos con ambos participantes: la primera ronda y,
+        # en modo completo, los de rondas siguientes definidos por dos byes
+        notificaciones = NotificacionService(self.db).guardar_nueva_ronda(
+            torneo,
+            [f for f in filas if f['estado'] == 'programado' and f['deportista1_id'] and f['deportista2_id']],
+            {d.id: d for d in deportistas}
+        )
         torneo.estado = 'en_curso'
+        torneo.modo_cuadro = modo
         self.db.commit()
 
+        bus_eventos.publicar(canal_cuadro(torneo_id), 'cuadro_generado', {
+            'modo_cuadro': modo,
+            'num_rondas': num_rondas,
+            'partidos_creados': len(filas)
+        })
+        bus_eventos.publicar_notificaciones(notificaciones)
+
         return {
             'torneo_id': torneo_id,
+            'modo_cuadro': modo,
             'num_participantes': num_participantes,
             'num_rondas': num_rondas,
-            'partidos_creados': len(partidos_creados),
-            'cuadro': cuadro
+            'partidos_creados': len(filas),
+            'cuadro': cuadro_serializado
         }
 
     def _generar_estructura_cuadro(self, deportistas, potencia_2, byes_necesarios):
@@ -78,66 +105,184 @@ class CuadroService:
         deportistas_mezclados = deportistas.copy()
         random.shuffle(deportistas_mezclados)
         
-        # Crear lista con byes
-        participantes = deportistas_mezclados + [None] * byes_necesarios
-        
         cuadro = []
-        posicion = 1
+        indice = 0
         
-        # Primera ronda
-        for i in range(0, len(participantes), 2):
+        # Primera ronda: los primeros partidos reciben un bye cada uno, de modo
+        # que nunca se enfrentan dos byes entre sí
+        for posicion in range(1, potencia_2 // 2 + 1):
+            es_bye = posicion <= byes_necesarios
             partido = {
                 'ronda': 1,
                 'posicion': posicion,
-                'deportista1': participantes[i],
-                'deportista2': participantes[i + 1] if i + 1 < len(participantes) else None,
-                'es_bye': participantes[i + 1] is None if i + 1 < len(participantes) else True
+                'deportista1': deportistas_mezclados[indice],
+                'deportista2': None if es_bye else deportistas_mezclados[indice + 1],
+                'es_bye': es_bye
             }
             cuadro.append(partido)
-            posicion += 1
+            indice += 1 if es_bye else 2
         
         return cuadro
 
-    def _crear_partidos_cuadro(self, torneo_id, cuadro, fecha_inicio):
+    def _serializar_partido_cuadro(self, partido_data):
         """
-        Crea los partidos del cuadro en la base de datos.
+        Convierte un partido de la estructura del cuadro a un diccionario serializable.
         """
-        partidos_creados = []
-        fecha_actual = fecha_inicio
+        return {
+            **partido_data,
+            'deportista1': partido_data['deportista1'].as_dict(),
+            'deportista2': partido_data['deportista2'].as_dict() if partido_data['deportista2'] else None
+        }
+
+    def _crear_partidos_cuadro(self, torneo_id, cuadro, fecha_inicio, num_rondas=1):
+        """
+        Crea los partidos del cuadro con un único INSERT masivo.
+        Con num_rondas > 1 crea también los partidos vacíos de las rondas siguientes.
+        No hace commit: la transacción la cierra generar_cuadro_torneo.
+        Retorna las filas insertadas.
+        """
+        filas = []
         
         for partido_data in cuadro:
             if not partido_data['es_bye']:
-                partido = Partido(
-                    torneo_id=torneo_id,
-                    deportista1_id=partido_data['deportista1'].id,
-                    deportista2_id=partido_data['deportista2'].id,
-                    ronda=f"Ronda {partido_data['ronda']}",
-                    numero_ronda=partido_data['ronda'],
-                    posicion_cuadro=partido_data['posicion'],
-                    fecha_partido=fecha_actual,
-                    estado='programado'
-                )
-                self.db.add(partido)
-                partidos_creados.append(partido)
+                filas.append({
+                    'torneo_id': torneo_id,
+                    'deportista1_id': partido_data['deportista1'].id,
+                    'deportista2_id': partido_data['deportista2'].id,
+                    'ganador_id': None,
+                    'resultado': None,
+                    'ronda': f"Ronda {partido_data['ronda']}",
+                    'numero_ronda': partido_data['ronda'],
+                    'posicion_cuadro': partido_data['posicion'],
+                    'fecha_partido': fecha_inicio,
+                    'estado': 'programado'
+                })
             else:
-                # Crear partido con bye (ganador automático)
-                partido = Partido(
-                    torneo_id=torneo_id,
-                    deportista1_id=partido_data['deportista1'].id,
-                    deportista2_id=None,  # Bye
-                    ganador_id=partido_data['deportista1'].id,
-                    ronda=f"Ronda {partido_data['ronda']} (Bye)",
-                    numero_ronda=partido_data['ronda'],
-                    posicion_cuadro=partido_data['posicion'],
-                    fecha_partido=fecha_actual,
-                    resultado="Bye",
-                    estado='finalizado'
-                )
-                self.db.add(partido)
-                partidos_creados.append(partido)
+                # Partido con bye (ganador automático)
+                filas.append({
+                    'torneo_id': torneo_id,
+                    'deportista1_id': partido_data['deportista1'].id,
+                    'deportista2_id': None,  # Bye
+                    'ganador_id': partido_data['deportista1'].id,
+                    'resultado': "Bye",
+                    'ronda': f"Ronda {partido_data['ronda']} (Bye)",
+                    'numero_ronda': partido_data['ronda'],
+                    'posicion_cuadro': partido_data['posicion'],
+                    'fecha_partido': fecha_inicio,
+                    'estado': 'finalizado'
+                })
         
-        self.db.commit()
-        return partidos_creados
+        if num_rondas > 1:
+            filas.extend(self._filas_rondas_siguientes(torneo_id, filas, num_rondas, fecha_inicio))
+
+        self._insertar_partidos(torneo_id, filas)
+        return filas
+
+    def _insertar_partidos(self, torneo_id, filas):
+        """
+        Inserta los partidos con un único INSERT masivo y asigna a cada fila su id,
+        necesario para las notificaciones. MySQL no admite RETURNING, así que los ids
+        se leen con una consulta por (ronda, posición), únicos dentro del cuadro.
+        """
+        if not filas:
+            return
+        self.db.execute(insert(Partido), filas)
+
+        ids = {(fila.numero_ronda, fila.posicion_cuadro): fila.id for fila in self.db.query(
+            Partido.id, Partido.numero_ronda, Partido.posicion_cuadro
+        ).filter(
+            Partido.torneo_id == torneo_id,
+            Partido.numero_ronda.in_({fila['numero_ronda'] for fila in filas})
+        )}
+        for fila in filas:
+            fila['id'] = ids.get((fila['numero_ronda'], fila['posicion_cuadro']))
+
+    def _filas_rondas_siguientes(self, torneo_id, primera_ronda, num_rondas, fecha_inicio):
+        """
+        Genera los partidos vacíos de las rondas 2..num_rondas de un cuadro completo.
+        El partido (ronda, posicion) alimenta al partido (ronda + 1, (posicion + 1) // 2).
+        """
+        filas = []
+        partidos_ronda = len(primera_ronda)
+
+        for ronda in range(2, num_rondas + 1):
+            partidos_ronda //= 2
+            fecha_ronda = fecha_inicio + timedelta(days=(ronda - 1) * 2)  # Cada ronda cada 2 días
+            for posicion in range(1, partidos_ronda + 1):
+                filas.append({
+                    'torneo_id': torneo_id,
+                    'deportista1_id': None,
+                    'deportista2_id': None,
+                    'ganador_id': None,
+                    'resultado': None,
+                    'ronda': f"Ronda {ronda}",
+                    'numero_ronda': ronda,
+                    'posicion_cuadro': posicion,
+                    'fecha_partido': fecha_ronda,
+                    'estado': 'programado'
+                })
+
+        # Los ganadores por bye pasan directamente a la segunda ronda
+        for partido in primera_ronda:
+            if partido['ganador_id']:
+                padre = filas[(partido['posicion_cuadro'] + 1) // 2 - 1]
+                padre[self._campo_en_padre(partido['posicion_cuadro'])] = partido['ganador_id']
+
+        return filas
+
+    @staticmethod
+    def _campo_en_padre(posicion_cuadro):
+        """
+        Lado del partido padre que ocupa el ganador de la posición dada.
+        """
+        return 'deportista1_id' if posicion_cuadro % 2 == 1 else 'deportista2_id'
+
+    def colocar_ganador_en_cuadro(self, partido):
+        """
+        En un cuadro completo, coloca al ganador del partido en su partido padre
+        con una búsqueda directa por (torneo, ronda, posición). Si es la final,
+        marca el torneo como finalizado. No hace commit.
+        """
+        torneo = partido.torneo
+        if torneo.modo_cuadro != 'completo':
+            return None
+
+        # Partidos creados a mano, fuera de la estructura del cuadro
+        if partido.numero_ronda is None or partido.posicion_cuadro is None:
+            return None
+
+        padre = self.db.query(Partido).filter(
+            Partido.torneo_id == partido.torneo_id,
+            Partido.numero_ronda == partido.numero_ronda + 1,
+            Partido.posicion_cuadro == (partido.posicion_cuadro + 1) // 2
+        ).first()
+
+        if not padre:
+            torneo.estado = 'finalizado'
+            return None
+
+        if padre.estado == 'finalizado':
+            raise ValueError("El partido de la siguiente ronda ya se jugó; no se puede cambiar este resultado")
+
+        setattr(padre, self._campo_en_padre(partido.posicion_cuadro), partido.ganador_id)
+        return padre
+
+    def guardar_partido_definido(self, partido):
+        """
+        Guarda las notificaciones de nueva ronda de un partido de cuadro completo
+        cuando queda con ambos participantes definidos. No hace commit.
+        """
+        if partido.deportista1_id is None or partido.deportista2_id is None:
+            return []
+
+        usuarios = UsuarioService(self.db).obtener_usuarios_por_ids([partido.deportista1_id, partido.deportista2_id])
+        return NotificacionService(self.db).guardar_nueva_ronda(partido.torneo, [{
+            'id': partido.id,
+            'deportista1_id': partido.deportista1_id,
+            'deportista2_id': partido.deportista2_id,
+            'ronda': partido.ronda,
+            'fecha_partido': partido.fecha_partido
+        }], usuarios)
 
     def obtener_cuadro_torneo(self, torneo_id):
         """
@@ -147,7 +292,9 @@ class CuadroService:
         if not torneo:
             raise ValueError("El torneo no existe")
 
-        partidos = self.db.query(Partido).filter(
+        partidos = self.db.query(Partido).options(
+            *Partido.opciones_carga_usuarios()
+        ).filter(
             Partido.torneo_id == torneo_id
         ).order_by(Partido.numero_ronda, Partido.posicion_cuadro).all()
 
@@ -177,6 +324,9 @@ class CuadroService:
         if usuario_perfil != 'administrador' and torneo.profesor_id != usuario_id:
             raise ValueError("No tienes permisos para avanzar rondas en este torneo")
 
+        if torneo.modo_cuadro == 'completo':
+            raise ValueError("El cuadro de este torneo es completo: los ganadores avanzan al registrar cada resultado")
+
         # Obtener partidos de la ronda actual
         partidos_actuales = self.db.query(Partido).filter(
             Partido.torneo_id == torneo_id,
@@ -191,70 +341,79 @@ class CuadroService:
 
         if len(ganadores_ronda) < 2:
             # Torneo terminado
+            campeon = ganadores_ronda[0].as_dict()
             torneo.estado = 'finalizado'
             self.db.commit()
-            return {'mensaje': 'Torneo finalizado', 'ganador': ganadores_ronda[0].as_dict()}
+            bus_eventos.publicar(canal_cuadro(torneo_id), 'torneo_finalizado', {'ganador_id': campeon['id']})
+            return {'mensaje': 'Torneo finalizado', 'ganador': campeon}
+
+        # Serializar antes del commit, que expira los ganadores ya cargados
+        ganadores_anterior = [g.as_dict() for g in ganadores_ronda]
 
         # Crear partidos de la siguiente ronda
         siguiente_ronda = ronda_actual + 1
         partidos_siguiente = self._crear_partidos_siguiente_ronda(
             torneo_id, ganadores_ronda, siguiente_ronda, torneo.fecha_inicio
         )
+        notificaciones = NotificacionService(self.db).guardar_nueva_ronda(
+            torneo, partidos_siguiente, {g.id: g for g in ganadores_ronda}
+        )
+        self.db.commit()
+
+        bus_eventos.publicar(canal_cuadro(torneo_id), 'nueva_ronda', {
+            'numero_ronda': siguiente_ronda,
+            'partidos': [{
+                'posicion_cuadro': p['posicion_cuadro'],
+                'deportista1_id': p['deportista1_id'],
+                'deportista2_id': p['deportista2_id'],
+                'fecha_partido': p['fecha_partido'].isoformat() if p['fecha_partido'] else None
+            } for p in partidos_siguiente]
+        })
+        bus_eventos.publicar_notificaciones(notificaciones)
 
         return {
             'mensaje': f'Ronda {siguiente_ronda} creada',
             'partidos_creados': len(partidos_siguiente),
-            'ganadores_anterior': [g.as_dict() for g in ganadores_ronda]
+            'ganadores_anterior': ganadores_anterior
         }
 
     def _obtener_ganadores_ronda(self, torneo_id, ronda):
         """
         Obtiene los ganadores de una ronda específica.
         """
-        partidos = self.db.query(Partido).filter(
+        ganador_ids = [fila.ganador_id for fila in self.db.query(Partido.ganador_id).filter(
             Partido.torneo_id == torneo_id,
             Partido.numero_ronda == ronda,
             Partido.estado == 'finalizado'
-        ).all()
-
-        ganadores = []
-        for partido in partidos:
-            if partido.ganador_id:
-                ganador = self.db.query(Usuario).filter(Usuario.id == partido.ganador_id).first()
-                if ganador:
-                    ganadores.append(ganador)
+        ).order_by(Partido.posicion_cuadro)]
 
-        return ganadores
+        usuarios = UsuarioService(self.db).obtener_usuarios_por_ids(ganador_ids)
+        return [usuarios[ganador_id] for ganador_id in ganador_ids if ganador_id in usuarios]
 
     def _crear_partidos_siguiente_ronda(self, torneo_id, ganadores, ronda, fecha_inicio):
         """
-        Crea los partidos de la siguiente ronda.
+        Crea los partidos de la siguiente ronda. No hace commit.
         """
         import random
         random.shuffle(ganadores)  # Mezclar para sorteo
 
-        partidos_creados = []
         fecha_actual = fecha_inicio + timedelta(days=(ronda - 1) * 2)  # Cada ronda cada 2 días
-        posicion = 1
-
-        for i in range(0, len(ganadores), 2):
-            if i + 1 < len(ganadores):
-                partido = Partido(
-                    torneo_id=torneo_id,
-                    deportista1_id=ganadores[i].id,
-                    deportista2_id=ganadores[i + 1].id,
-                    ronda=f"Ronda {ronda}",
-                    numero_ronda=ronda,
-                    posicion_cuadro=posicion,
-                    fecha_partido=fecha_actual,
-                    estado='programado'
-                )
-                self.db.add(partido)
-                partidos_creados.append(partido)
-                posicion += 1
-
-        self.db.commit()
-        return partidos_creados
+        filas = []
+
+        for posicion, i in enumerate(range(0, len(ganadores) - 1, 2), start=1):
+            filas.append({
+                'torneo_id': torneo_id,
+                'deportista1_id': ganadores[i].id,
+                'deportista2_id': ganadores[i + 1].id,
+                'ronda': f"Ronda {ronda}",
+                'numero_ronda': ronda,
+                'posicion_cuadro': posicion,
+                'fecha_partido': fecha_actual,
+                'estado': 'programado'
+            })
+
+        self._insertar_partidos(torneo_id, filas)
+        return filas
 
     def obtener_proximo_partido_deportista(self, deportista_id, torneo_id=None):
         """
@@ -274,16 +433,30 @@ class CuadroService:
             return partido.as_dict()
         return None
 
-    def obtener_historial_deportista(self, deportista_id, torneo_id=None):
+    def _query_historial(self, deportista_id, torneo_id=None):
         """
-        Obtiene el historial de partidos de un deportista.
+        Consulta de los partidos de un deportista, del más reciente al más antiguo.
         """
-        query = self.db.query(Partido).filter(
+        query = self.db.query(Partido).options(
+            *Partido.opciones_carga_usuarios()
+        ).filter(
             (Partido.deportista1_id == deportista_id) | (Partido.deportista2_id == deportista_id)
         )
 
         if torneo_id:
             query = query.filter(Partido.torneo_id == torneo_id)
 
-        partidos = query.order_by(Partido.fecha_partido.desc()).all()
+        return query.order_by(Partido.fecha_partido.desc(), Partido.id.desc())
+
+    def obtener_historial_deportista(self, deportista_id, torneo_id=None):
+        """
+        Obtiene el historial de partidos de un deportista.
+        """
+        partidos = self._query_historial(deportista_id, torneo_id).all()
         return [p.as_dict() for p in partidos]
+
+    def iterar_historial_deportista(self, deportista_id, torneo_id=None, tamano_lote=500):
+        """
+        Itera el historial de un deportista por lotes para exportaciones grandes.
+        """
+        return self._query_historial(deportista_id, torneo_id).yield_per(tamano_lote)
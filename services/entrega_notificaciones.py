@@ -0,0 +1,277 @@
+# services/entrega_notificaciones.py
+import os
+import json
+import uuid
+import smtplib
+import logging
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from config.database import get_db_session, close_db_session
+from models.envio_notificacion_model import EnvioNotificacion
+from services.usuario_service import UsuarioService
+
+logger = logging.getLogger(__name__)
+
+class Sink:
+    """
+    Canal de entrega. Las subclases implementan enviar(mensaje); enviar_lote
+    puede redefinirse para reutilizar una conexión en todo el lote.
+    """
+    nombre = 'sink'
+
+    def enviar(self, mensaje):
+        raise NotImplementedError
+
+    def enviar_lote(self, mensajes):
+        """
+        Entrega los mensajes y retorna un diccionario id -> error de los que fallaron.
+        """
+        errores = {}
+        for mensaje in mensajes:
+            try:
+                self.enviar(mensaje)
+            except Exception as e:
+                errores[mensaje['id']] = f'{self.nombre}: {e}'
+        return errores
+
+class SinkLog(Sink):
+    nombre = 'log'
+
+    def enviar(self, mensaje):
+        logger.info(f"Notificación para {mensaje['email']}: {mensaje['mensaje']}")
+
+class SinkArchivo(Sink):
+    """
+    Agrega cada mensaje como una línea JSON al archivo indicado.
+    """
+    nombre = 'archivo'
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+
+    def enviar_lote(self, mensajes):
+        try:
+            with self._lock, open(self.ruta, 'a', encoding='utf-8') as archivo:
+                for mensaje in mensajes:
+                    archivo.write(json.dumps(mensaje, ensure_ascii=False) + '\n')
+            return {}
+        except OSError as e:
+            return {mensaje['id']: f'{self.nombre}: {e}' for mensaje in mensajes}
+
+class SinkSMTP(Sink):
+    """
+    Envía cada mensaje por correo, usando una sola conexión SMTP por lote.
+    """
+    nombre = 'smtp'
+
+    def __init__(self, host, puerto=25, remitente='notificaciones@tenis.local', usuario=None, password=None, usar_tls=False):
+        self.host = host
+        self.puerto = puerto
+        self.remitente = remitente
+        self.usuario = usuario
+        self.password = password
+        self.usar_tls = usar_tls
+
+    def _correo(self, mensaje):
+        correo = EmailMessage()
+        correo['From'] = self.remitente
+        correo['To'] = mensaje['email']
+        correo['Subject'] = mensaje['mensaje']
+        correo.set_content('\n'.join(
+            [f"Hola {mensaje['nombre']},", '', mensaje['mensaje']] +
+            [f'{clave}: {valor}' for clave, valor in (mensaje['detalles'] or {}).items()]
+        ))
+        return correo
+
+    def enviar_lote(self, mensajes):
+        try:
+            conexion = smtplib.SMTP(self.host, self.puerto, timeout=10)
+        except OSError as e:
+            return {mensaje['id']: f'{self.nombre}: {e}' for mensaje in mensajes}
+
+        errores = {}
+        try:
+            if self.usar_tls:
+                conexion.starttls()
+            if self.usuario:
+                conexion.login(self.usuario, self.password)
+            for mensaje in mensajes:
+                try:
+                    conexion.send_message(self._correo(mensaje))
+                except smtplib.SMTPException as e:
+                    errores[mensaje['id']] = f'{self.nombre}: {e}'
+        except smtplib.SMTPException as e:
+            errores.update({mensaje['id']: f'{self.nombre}: {e}' for mensaje in mensajes if mensaje['id'] not in errores})
+        finally:
+            try:
+                conexion.quit()
+            except smtplib.SMTPException:
+                pass
+        return errores
+
+class ProcesadorEntregas:
+    """
+    Drena la bandeja de salida por lotes. Cada lote se toma con un UPDATE condicional
+    que lo asigna a este procesador por un tiempo (lease), así que varios hilos o procesos
+    pueden trabajar a la vez sin entregar dos veces la misma fila. Si un procesador muere,
+    sus filas vuelven a estar disponibles al vencer el lease.
+    Los fallos se reintentan con backoff exponencial hasta max_intentos.
+    """
+    def __init__(self, sinks, tamano_lote=100, max_intentos=5, backoff_base=30, backoff_maximo=3600, lease=300):
+        self.sinks = sinks
+        self.tamano_lote = tamano_lote
+        self.max_intentos = max_intentos
+        self.backoff_base = backoff_base
+        self.backoff_maximo = backoff_maximo
+        self.lease = lease
+
+    def _tomar_lote(self, db):
+        ahora = datetime.now()
+        ids = [fila.id for fila in db.query(EnvioNotificacion.id).filter(
+            EnvioNotificacion.estado.in_(['pendiente', 'procesando']),
+            EnvioNotificacion.proximo_intento <= ahora
+        ).order_by(EnvioNotificacion.id).limit(self.tamano_lote)]
+        if not ids:
+            return []
+
+        lote = uuid.uuid4().hex
+        db.query(EnvioNotificacion).filter(
+            EnvioNotificacion.id.in_(ids),
+            EnvioNotificacion.estado.in_(['pendiente', 'procesando']),
+            EnvioNotificacion.proximo_intento <= ahora
+        ).update({
+            EnvioNotificacion.estado: 'procesando',
+            EnvioNotificacion.lote: lote,
+            EnvioNotificacion.proximo_intento: ahora + timedelta(seconds=self.lease)
+        }, synchronize_session=False)
+        db.commit()
+
+        return db.query(EnvioNotificacion).filter(EnvioNotificacion.lote == lote).all()
+
+    def _backoff(self, intentos):
+        return min(self.backoff_base * 2 ** (intentos - 1), self.backoff_maximo)
+
+    def procesar_lote(self, db):
+        """
+        Entrega un lote y registra el resultado. Retorna cuántas filas se procesaron.
+        """
+        envios = self._tomar_lote(db)
+        if not envios:
+            return 0
+
+        usuarios = UsuarioService(db).obtener_usuarios_por_ids([e.deportista_id for e in envios])
+        mensajes = []
+        for envio in envios:
+            usuario = usuarios.get(envio.deportista_id)
+            mensajes.append({
+                'id': envio.id,
+                'deportista_id': envio.deportista_id,
+                'email': usuario.email if usuario else None,
+                'nombre': f'{usuario.nombre} {usuario.apellido}' if usuario else None,
+                **envio.contenido
+            })
+
+        errores = {}
+        for sink in self.sinks:
+            for envio_id, error in sink.enviar_lote(mensajes).items():
+                errores.setdefault(envio_id, error)
+
+        ahora = datetime.now()
+        enviados = [envio.id for envio in envios if envio.id not in errores]
+        if enviados:
+            db.query(EnvioNotificacion).filter(EnvioNotificacion.id.in_(enviados)).update({
+                EnvioNotificacion.estado: 'enviado',
+                EnvioNotificacion.fecha_envio: ahora,
+                EnvioNotificacion.intentos: EnvioNotificacion.intentos + 1
+            }, synchronize_session=False)
+
+        for envio in envios:
+            if envio.id in errores:
+                envio.intentos = (envio.intentos or 0) + 1
+                envio.ultimo_error = errores[envio.id][:255]
+                if envio.intentos >= self.max_intentos:
+                    envio.estado = 'fallido'
+                    logger.error(f"Envío {envio.id} descartado tras {envio.intentos} intentos: {envio.ultimo_error}")
+                else:
+                    envio.estado = 'pendiente'
+                    envio.proximo_intento = ahora + timedelta(seconds=self._backoff(envio.intentos))
+
+        db.commit()
+        return len(envios)
+
+class PoolEntregas:
+    """
+    Hilos de fondo que drenan la bandeja de salida. Cada hilo usa su propia sesión
+    y espera intervalo segundos cuando no encuentra nada pendiente.
+    """
+    def __init__(self, procesador, num_trabajadores=1, intervalo=2):
+        self.procesador = procesador
+        self.num_trabajadores = num_trabajadores
+        self.intervalo = intervalo
+        self._detener = threading.Event()
+        self._hilos = []
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            procesados = 0
+            try:
+                procesados = self.procesador.procesar_lote(get_db_session())
+            except Exception as e:
+                logger.error(f"Error procesando envíos de notificaciones: {str(e)}")
+            finally:
+                close_db_session()
+            if procesados < self.procesador.tamano_lote:
+                self._detener.wait(self.intervalo)
+
+    def iniciar(self):
+        for i in range(self.num_trabajadores):
+            hilo = threading.Thread(target=self._bucle, name=f'entregas-{i}', daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+        logger.info(f"Pool de entregas iniciado con {self.num_trabajadores} trabajadores")
+
+    def detener(self, timeout=None):
+        self._detener.set()
+        for hilo in self._hilos:
+            hilo.join(timeout)
+
+def crear_sinks():
+    """
+    Arma los canales configurados en ENTREGAS_SINKS (ej. log,archivo,smtp).
+    """
+    sinks = []
+    for nombre in os.getenv('ENTREGAS_SINKS', 'log').split(','):
+        nombre = nombre.strip()
+        if nombre == 'log':
+            sinks.append(SinkLog())
+        elif nombre == 'archivo':
+            sinks.append(SinkArchivo(os.getenv('ENTREGAS_ARCHIVO', 'notificaciones_enviadas.jsonl')))
+        elif nombre == 'smtp':
+            sinks.append(SinkSMTP(
+                host=os.getenv('ENTREGAS_SMTP_HOST', 'localhost'),
+                puerto=int(os.getenv('ENTREGAS_SMTP_PUERTO', 25)),
+                remitente=os.getenv('ENTREGAS_SMTP_REMITENTE', 'notificaciones@tenis.local'),
+                usuario=os.getenv('ENTREGAS_SMTP_USUARIO'),
+                password=os.getenv('ENTREGAS_SMTP_PASSWORD'),
+                usar_tls=os.getenv('ENTREGAS_SMTP_TLS', '0') == '1'
+            ))
+        elif nombre:
+            raise ValueError(f"Sink de entregas desconocido: {nombre}")
+    return sinks
+
+def iniciar_pool_entregas():
+    """
+    Inicia el pool con ENTREGAS_TRABAJADORES hilos (1 por defecto; 0 lo desactiva,
+    por ejemplo cuando las entregas corren en un proceso aparte).
+    """
+    num_trabajadores = int(os.getenv('ENTREGAS_TRABAJADORES', 1))
+    if num_trabajadores <= 0:
+        return None
+    pool = PoolEntregas(
+        ProcesadorEntregas(crear_sinks(), tamano_lote=int(os.getenv('ENTREGAS_TAMANO_LOTE', 100))),
+        num_trabajadores=num_trabajadores
+    )
+    pool.iniciar()
+    return pool
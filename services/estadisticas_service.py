@@ -0,0 +1,105 @@
+# services/estadisticas_service.py
+import os
+from sqlalchemy import event, func, case, select
+from sqlalchemy.orm import Session as OrmSession
+from models.usuario_model import Usuario
+from models.torneo_model import Torneo
+from models.partido_model import Partido
+from models.inscripcion_model import Inscripcion
+from services.cache import CacheLRU
+
+# Segundos que se reutilizan los contadores globales del dashboard
+DASHBOARD_STATS_TTL = float(os.getenv('DASHBOARD_STATS_TTL', 10))
+
+# Tablas cuya escritura invalida los contadores globales
+TABLAS_OBSERVADAS = {'usuarios', 'torneos', 'partidos', 'inscripciones'}
+
+# Marca en session.info de que la transacción escribió en alguna tabla observada
+CLAVE_ESCRITURA_PENDIENTE = 'estadisticas_invalidar'
+
+# Un único valor con expiración; la generación de la clave evita guardar contadores
+# calculados antes de una invalidación concurrente
+cache_estadisticas_globales = CacheLRU(max_items=1, ttl=DASHBOARD_STATS_TTL)
+CLAVE_GLOBALES = 'globales'
+
+# Los flush y las escrituras masivas solo marcan la sesión: invalidar antes del commit
+# dejaría que otra petición volviera a cachear los datos anteriores a la escritura.
+@event.listens_for(OrmSession, 'after_flush')
+def _marcar_tras_flush(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if getattr(obj, '__tablename__', None) in TABLAS_OBSERVADAS:
+            session.info[CLAVE_ESCRITURA_PENDIENTE] = True
+            return
+
+@event.listens_for(OrmSession, 'do_orm_execute')
+def _marcar_tras_escritura_masiva(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    tabla = getattr(orm_execute_state.statement, 'table', None)
+    if getattr(tabla, 'name', None) in TABLAS_OBSERVADAS:
+        orm_execute_state.session.info[CLAVE_ESCRITURA_PENDIENTE] = True
+
+@event.listens_for(OrmSession, 'after_commit')
+def _invalidar_tras_commit(session):
+    if session.info.pop(CLAVE_ESCRITURA_PENDIENTE, False):
+        cache_estadisticas_globales.invalidar(CLAVE_GLOBALES)
+
+@event.listens_for(OrmSession, 'after_rollback')
+def _descartar_tras_rollback(session):
+    session.info.pop(CLAVE_ESCRITURA_PENDIENTE, None)
+
+class EstadisticasService:
+    def __init__(self, db_session):
+        self.db = db_session
+
+    def obtener_estadisticas_globales(self):
+        """
+        Contadores globales en una sola consulta, reutilizados durante DASHBOARD_STATS_TTL.
+        """
+        estadisticas = cache_estadisticas_globales.obtener(CLAVE_GLOBALES)
+        if estadisticas is not None:
+            return estadisticas
+        generacion = cache_estadisticas_globales.generacion(CLAVE_GLOBALES)
+
+        usuarios = select(func.count(Usuario.id)).where(Usuario.activo == True).scalar_subquery()
+        torneos = select(func.count(Torneo.id)).scalar_subquery()
+        torneos_activos = select(
+            func.coalesce(func.sum(case((Torneo.estado == 'en_curso', 1), else_=0)), 0)
+        ).scalar_subquery()
+        partidos = select(func.count(Partido.id)).scalar_subquery()
+        inscripciones = select(func.count(Inscripcion.id)).scalar_subquery()
+        inscripciones_pendientes = select(
+            func.coalesce(func.sum(case((Inscripcion.estado == 'pendiente', 1), else_=0)), 0)
+        ).scalar_subquery()
+
+        fila = self.db.execute(select(
+            usuarios, torneos, torneos_activos, partidos, inscripciones, inscripciones_pendientes
+        )).one()
+
+        estadisticas = {
+            'total_usuarios': fila[0],
+            'total_torneos': fila[1],
+            'torneos_activos': fila[2],
+            'total_partidos': fila[3],
+            'total_inscripciones': fila[4],
+            'inscripciones_pendientes': fila[5]
+        }
+        cache_estadisticas_globales.guardar(CLAVE_GLOBALES, estadisticas, generacion=generacion)
+        return estadisticas
+
+    def obtener_estadisticas_usuario(self, usuario_id):
+        """
+        Contadores del usuario (inscripciones y partidos) en una sola consulta.
+        """
+        torneos = select(func.count(Inscripcion.id)).where(
+            Inscripcion.deportista_id == usuario_id
+        ).scalar_subquery()
+        partidos = select(func.count(Partido.id)).where(
+            (Partido.deportista1_id == usuario_id) | (Partido.deportista2_id == usuario_id)
+        ).scalar_subquery()
+
+        fila = self.db.execute(select(torneos, partidos)).one()
+        return {
+            'torneos': fila[0],
+            'partidos': fila[1]
+        }
@@ -0,0 +1,261 @@
+# services/eventos.py
+import os
+import json
+import queue
+import fnmatch
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def canal_deportista(deportista_id):
+    return f'deportista:{deportista_id}'
+
+def canal_cuadro(torneo_id):
+    return f'torneo:{torneo_id}:cuadro'
+
+class Suscripcion:
+    """
+    Cola de eventos de un suscriptor. Si el consumidor no alcanza a leer,
+    los eventos nuevos se descartan en lugar de bloquear al publicador.
+    """
+    def __init__(self, bus, canales, max_pendientes=100):
+        self.bus = bus
+        self.canales = canales
+        self._cola = queue.Queue(maxsize=max_pendientes)
+
+    def entregar(self, evento):
+        try:
+            self._cola.put_nowait(evento)
+        except queue.Full:
+            logger.warning(f"Suscriptor de {self.canales} saturado; se descarta un evento")
+
+    def obtener(self, timeout=None):
+        """
+        Retorna el siguiente evento o None si no llega ninguno en timeout segundos.
+        """
+        try:
+            return self._cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def cerrar(self):
+        self.bus.desuscribir(self)
+
+class BrokerLocal:
+    """
+    Entrega los eventos solo dentro del proceso.
+    """
+    def publicar(self, canal, evento):
+        self._entregar(canal, evento)
+
+    def escuchar(self, entregar):
+        self._entregar = entregar
+
+class BrokerRedis:
+    """
+    Reparte los eventos entre procesos con pub/sub. Sirve cualquier cliente con la
+    interfaz de redis-py (publish y pubsub), por ejemplo ClientePubSubMemoria para pruebas.
+    Un hilo por proceso escucha el patrón de canales y entrega a los suscriptores locales.
+    Si la conexión se corta, el hilo vuelve a suscribirse con backoff exponencial;
+    los eventos publicados mientras tanto se pierden.
+    """
+    def __init__(self, cliente, prefijo='tenis:', backoff_base=1, backoff_maximo=30):
+        self.cliente = cliente
+        self.prefijo = prefijo
+        self.backoff_base = backoff_base
+        self.backoff_maximo = backoff_maximo
+        self._detener = threading.Event()
+        self._pubsub = None
+        self._hilo = None
+
+    def publicar(self, canal, evento):
+        self.cliente.publish(self.prefijo + canal, json.dumps(evento, ensure_ascii=False))
+
+    def _backoff(self, intentos):
+        return min(self.backoff_base * 2 ** (intentos - 1), self.backoff_maximo)
+
+    def _procesar(self, mensaje, entregar):
+        if mensaje.get('type') != 'pmessage':
+            return
+        try:
+            canal = mensaje['channel']
+            if isinstance(canal, bytes):
+                canal = canal.decode('utf-8')
+            evento = json.loads(mensaje['data'])
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Mensaje de eventos inválido descartado: {str(e)}")
+            return
+        entregar(canal[len(self.prefijo):], evento)
+
+    def _cerrar_pubsub(self):
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    def escuchar(self, entregar):
+        def bucle():
+            intentos = 0
+            while not self._detener.is_set():
+                try:
+                    self._pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+                    self._pubsub.psubscribe(self.prefijo + '*')
+                    if intentos:
+                        logger.info(f"Broker de eventos reconectado tras {intentos} reintentos")
+                    intentos = 0
+                    for mensaje in self._pubsub.listen():
+                        self._procesar(mensaje, entregar)
+                    error = 'la conexión de pub/sub se cerró'
+                except Exception as e:
+                    error = str(e)
+                finally:
+                    self._cerrar_pubsub()
+                if self._detener.is_set():
+                    break
+                intentos += 1
+                espera = self._backoff(intentos)
+                logger.error(f"Error escuchando eventos del broker: {error}; reintento en {espera}s")
+                self._detener.wait(espera)
+
+        self._hilo = threading.Thread(target=bucle, name='broker-eventos', daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout=None):
+        """
+        Detiene el hilo de escucha; cerrar el pubsub desbloquea listen().
+        """
+        self._detener.set()
+        self._cerrar_pubsub()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+class ClientePubSubMemoria:
+    """
+    Cliente en memoria con la parte de la interfaz de redis-py que usa BrokerRedis
+    (publish y pubsub con psubscribe). Permite probar varios buses que comparten
+    broker dentro de un proceso; desconectar() simula una caída de la conexión.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pubsubs = set()
+
+    def publish(self, canal, datos):
+        with self._lock:
+            destinatarios = [p for p in self._pubsubs if p.coincide(canal)]
+        for pubsub in destinatarios:
+            pubsub.recibir(canal, datos)
+        return len(destinatarios)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return _PubSubMemoria(self)
+
+    def desconectar(self):
+        with self._lock:
+            pubsubs, self._pubsubs = self._pubsubs, set()
+        for pubsub in pubsubs:
+            pubsub.cortar()
+
+class _PubSubMemoria:
+    _FIN = object()
+
+    def __init__(self, cliente):
+        self._cliente = cliente
+        self._patrones = []
+        self._cola = queue.Queue()
+        self._error = None
+
+    def psubscribe(self, *patrones):
+        self._patrones.extend(patrones)
+        with self._cliente._lock:
+            self._cliente._pubsubs.add(self)
+
+    def coincide(self, canal):
+        return any(fnmatch.fnmatchcase(canal, patron) for patron in self._patrones)
+
+    def recibir(self, canal, datos):
+        patron = next(p for p in self._patrones if fnmatch.fnmatchcase(canal, p))
+        self._cola.put({'type': 'pmessage', 'pattern': patron, 'channel': canal, 'data': datos})
+
+    def listen(self):
+        while True:
+            mensaje = self._cola.get()
+            if mensaje is self._FIN:
+                if self._error:
+                    raise self._error
+                return
+            yield mensaje
+
+    def cortar(self):
+        self._error = ConnectionError('Conexión con el broker perdida')
+        self._cola.put(self._FIN)
+
+    def close(self):
+        with self._cliente._lock:
+            self._cliente._pubsubs.discard(self)
+        self._cola.put(self._FIN)
+
+class BusEventos:
+    """
+    Pub/sub de eventos para los canales SSE. Los servicios publican después del
+    commit y cada suscriptor recibe los eventos de sus canales en su propia cola.
+    """
+    def __init__(self, broker):
+        self.broker = broker
+        self._suscripciones = {}
+        self._lock = threading.Lock()
+        broker.escuchar(self._entregar)
+
+    def suscribir(self, *canales):
+        suscripcion = Suscripcion(self, canales)
+        with self._lock:
+            for canal in canales:
+                self._suscripciones.setdefault(canal, set()).add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        with self._lock:
+            for canal in suscripcion.canales:
+                suscriptores = self._suscripciones.get(canal)
+                if suscriptores:
+                    suscriptores.discard(suscripcion)
+                    if not suscriptores:
+                        del self._suscripciones[canal]
+
+    def publicar(self, canal, tipo, datos):
+        try:
+            self.broker.publicar(canal, {'tipo': tipo, 'datos': datos})
+        except Exception as e:
+            # Un fallo del broker no debe revertir una operación ya confirmada
+            logger.error(f"Error publicando evento {tipo} en {canal}: {str(e)}")
+
+    def publicar_notificaciones(self, notificaciones):
+        """
+        Publica cada notificación en el canal de su deportista.
+        """
+        for notificacion in notificaciones:
+            self.publicar(canal_deportista(notificacion['deportista_id']), 'notificacion', notificacion)
+
+    def _entregar(self, canal, evento):
+        with self._lock:
+            suscriptores = list(self._suscripciones.get(canal, ()))
+        for suscripcion in suscriptores:
+            suscripcion.entregar(evento)
+
+def crear_broker():
+    """
+    Usa el broker compartido si está configurado EVENTOS_REDIS_URL.
+    """
+    url = os.getenv('EVENTOS_REDIS_URL')
+    if url:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('EVENTOS_REDIS_URL requiere el paquete redis')
+        return BrokerRedis(redis.Redis.from_url(url))
+    return BrokerLocal()
+
+# Instancia compartida por la aplicación
+bus_eventos = BusEventos(crear_broker())
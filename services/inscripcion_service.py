@@ -1,21 +1,86 @@
 # services/inscripcion_service.py
+import os
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from models.inscripcion_model import Inscripcion
 from models.torneo_model import Torneo
 from models.usuario_model import Usuario
+from services.paginacion import paginar
+from services.notificacion_service import NotificacionService
+from services.eventos import bus_eventos, canal_deportista
+from services.cache import CacheLRU
+
+# Máximo de deportistas por solicitud de inscripción masiva
+MAX_INSCRIPCIONES_BULK = 512
+
+# Inscripciones serializadas (as_dict) por torneo. Se invalida en cada cambio de
+# inscripciones, pero solo en el proceso que lo hace: con varios workers, los demás
+# ven el cambio al vencer ROSTER_CACHE_TTL, igual que los cambios de nombre de los
+# deportistas. ROSTER_CACHE_MAX_ITEMS=0 desactiva la cache
+cache_rosters = CacheLRU(
+    max_items=int(os.getenv('ROSTER_CACHE_MAX_ITEMS', 256)),
+    ttl=float(os.getenv('ROSTER_CACHE_TTL', 300))
+)
 
 class InscripcionService:
     def __init__(self, db_session):
         self.db = db_session
 
-    def listar_inscripciones(self):
-        return self.db.query(Inscripcion).all()
+    def listar_inscripciones(self, limit=None, after=None, fields=None):
+        """
+        Lista inscripciones paginadas por id (keyset). Con fields retorna solo esas columnas.
+        """
+        return paginar(self.db.query(Inscripcion), Inscripcion, limit, after, fields)
 
     def listar_inscripciones_por_torneo(self, torneo_id):
-        return self.db.query(Inscripcion).filter(Inscripcion.torneo_id == torneo_id).all()
+        return self.db.query(Inscripcion).options(
+            joinedload(Inscripcion.deportista)
+        ).filter(Inscripcion.torneo_id == torneo_id).order_by(Inscripcion.id).all()
+
+    def obtener_roster_torneo(self, torneo_id):
+        """
+        Obtiene las inscripciones serializadas de un torneo, usando la cache de rosters.
+        Solo consulta la base de datos si el torneo no está en cache.
+        """
+        roster = cache_rosters.obtener(torneo_id)
+        if roster is not None:
+            return roster
+
+        generacion = cache_rosters.generacion(torneo_id)
+        roster = [inscripcion.as_dict() for inscripcion in self.listar_inscripciones_por_torneo(torneo_id)]
+        cache_rosters.guardar(torneo_id, roster, generacion=generacion)
+        return roster
 
     def listar_inscripciones_por_deportista(self, deportista_id):
         return self.db.query(Inscripcion).filter(Inscripcion.deportista_id == deportista_id).all()
 
+    def _reservar_cupo(self, torneo_id, cantidad=1):
+        """
+        Incrementa el contador de inscripciones aceptadas solo si no supera
+        max_participantes. El UPDATE condicional es atómico y bloquea la fila del
+        torneo hasta el commit, así que inscripciones concurrentes no pueden
+        exceder el cupo. Retorna False si no hay cupo suficiente.
+        """
+        actualizados = self.db.query(Torneo).filter(
+            Torneo.id == torneo_id,
+            Torneo.inscripciones_aceptadas + cantidad <= Torneo.max_participantes
+        ).update({
+            Torneo.inscripciones_aceptadas: Torneo.inscripciones_aceptadas + cantidad
+        }, synchronize_session=False)
+        return actualizados == 1
+
+    def _liberar_cupo(self, torneo_id, cantidad=1):
+        """
+        Decrementa el contador de inscripciones aceptadas del torneo.
+        """
+        self.db.query(Torneo).filter(
+            Torneo.id == torneo_id,
+            Torneo.inscripciones_aceptadas >= cantidad
+        ).update({
+            Torneo.inscripciones_aceptadas: Torneo.inscripciones_aceptadas - cantidad
+        }, synchronize_session=False)
+
     def inscribir_deportista(self, torneo_id, deportista_id, usuario_id, usuario_perfil):
         """
         Inscribir un deportista a un torneo.
@@ -60,18 +125,18 @@ class InscripcionService:
         if inscripcion_existente:
             raise ValueError("El deportista ya está inscrito en este torneo")
 
-        # Verificar límite de participantes
-        inscripciones_aceptadas = self.db.query(Inscripcion).filter(
-            Inscripcion.torneo_id == torneo_id,
-            Inscripcion.estado == 'aceptada'
-        ).count()
-
-        if inscripciones_aceptadas >= torneo.max_participantes:
-            raise ValueError("El torneo ha alcanzado el límite máximo de participantes")
-
         # Determinar el estado inicial de la inscripción
         estado_inicial = 'aceptada' if torneo.tipo == 'abierto' else 'pendiente'
 
+        # Verificar límite de participantes. Las inscripciones aceptadas reservan
+        # cupo de forma atómica; las pendientes solo requieren que no esté lleno
+        if estado_inicial == 'aceptada':
+            hay_cupo = self._reservar_cupo(torneo_id)
+        else:
+            hay_cupo = torneo.inscripciones_aceptadas < torneo.max_participantes
+        if not hay_cupo:
+            raise ValueError("El torneo ha alcanzado el límite máximo de participantes")
+
         inscripcion = Inscripcion(
             torneo_id=torneo_id,
             deportista_id=deportista_id,
@@ -79,10 +144,111 @@ class InscripcionService:
         )
 
         self.db.add(inscripcion)
-        self.db.commit()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Otra solicitud inscribió al mismo deportista; el rollback libera el cupo
+            self.db.rollback()
+            raise ValueError("El deportista ya está inscrito en este torneo")
+        cache_rosters.invalidar(torneo_id)
         self.db.refresh(inscripcion)
         return inscripcion
 
+    def inscribir_deportistas_bulk(self, torneo_id, deportista_ids, usuario_id, usuario_perfil):
+        """
+        Inscribir varios deportistas a un torneo en una sola transacción.
+        Aplica las mismas reglas que inscribir_deportista, pero valida todos los
+        deportistas, las inscripciones existentes y el cupo con una consulta cada una.
+        Retorna (inscripciones creadas, errores por deportista).
+        """
+        if not isinstance(deportista_ids, list) or not deportista_ids:
+            raise ValueError("deportista_ids debe ser una lista no vacía")
+        if len(deportista_ids) > MAX_INSCRIPCIONES_BULK:
+            raise ValueError(f"No se pueden inscribir más de {MAX_INSCRIPCIONES_BULK} deportistas por solicitud")
+
+        torneo = self.db.query(Torneo).filter(Torneo.id == torneo_id).first()
+        if not torneo:
+            raise ValueError("El torneo no existe")
+        if torneo.estado != 'planificado':
+            raise ValueError("No se pueden hacer inscripciones en torneos que ya comenzaron o finalizaron")
+        if (torneo.tipo == 'cerrado' and usuario_perfil != 'administrador'
+                and torneo.profesor_id != usuario_id):
+            raise ValueError("No tienes permisos para inscribir deportistas en este torneo cerrado")
+
+        errores = []
+        solicitados = []
+        vistos = set()
+        for deportista_id in deportista_ids:
+            if isinstance(deportista_id, bool) or not isinstance(deportista_id, int):
+                errores.append({'deportista_id': deportista_id, 'error': "ID de deportista inválido"})
+            elif deportista_id in vistos:
+                errores.append({'deportista_id': deportista_id, 'error': "Deportista repetido en la solicitud"})
+            else:
+                vistos.add(deportista_id)
+                solicitados.append(deportista_id)
+
+        activos = {fila.id for fila in self.db.query(Usuario.id).filter(
+            Usuario.id.in_(solicitados),
+            Usuario.perfil == 'deportista',
+            Usuario.activo == True
+        )} if solicitados else set()
+        inscritos = {fila.deportista_id for fila in self.db.query(Inscripcion.deportista_id).filter(
+            Inscripcion.torneo_id == torneo_id,
+            Inscripcion.deportista_id.in_(solicitados)
+        )} if solicitados else set()
+
+        # Lectura con bloqueo de la fila del torneo para partir del contador vigente
+        contador = self.db.query(Torneo.inscripciones_aceptadas, Torneo.max_participantes).filter(
+            Torneo.id == torneo_id
+        ).with_for_update().one()
+        cupo = contador.max_participantes - contador.inscripciones_aceptadas
+
+        # En torneos abiertos cada inscripción se acepta al crearse y consume cupo;
+        # en cerrados quedan pendientes y solo se exige que el torneo no esté lleno
+        estado_inicial = 'aceptada' if torneo.tipo == 'abierto' else 'pendiente'
+        nuevos = []
+        for deportista_id in solicitados:
+            if deportista_id not in activos:
+                error = "El deportista no existe o no está activo"
+            elif torneo.tipo == 'abierto' and deportista_id != usuario_id:
+                error = "Solo puedes inscribirte a ti mismo en torneos abiertos"
+            elif deportista_id in inscritos:
+                error = "El deportista ya está inscrito en este torneo"
+            elif cupo <= 0:
+                error = "El torneo ha alcanzado el límite máximo de participantes"
+            else:
+                nuevos.append(deportista_id)
+                if estado_inicial == 'aceptada':
+                    cupo -= 1
+                continue
+            errores.append({'deportista_id': deportista_id, 'error': error})
+
+        if not nuevos:
+            return [], errores
+
+        if estado_inicial == 'aceptada' and not self._reservar_cupo(torneo_id, len(nuevos)):
+            self.db.rollback()
+            raise ValueError("El cupo del torneo cambió durante la inscripción; intente de nuevo")
+
+        try:
+            self.db.execute(insert(Inscripcion), [
+                {'torneo_id': torneo_id, 'deportista_id': deportista_id, 'estado': estado_inicial}
+                for deportista_id in nuevos
+            ])
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError("Otra solicitud inscribió a alguno de los deportistas al mismo tiempo; intente de nuevo")
+        cache_rosters.invalidar(torneo_id)
+
+        inscripciones = self.db.query(Inscripcion).options(
+            joinedload(Inscripcion.deportista)
+        ).filter(
+            Inscripcion.torneo_id == torneo_id,
+            Inscripcion.deportista_id.in_(nuevos)
+        ).order_by(Inscripcion.id).all()
+        return inscripciones, errores
+
     def actualizar_estado_inscripcion(self, inscripcion_id, nuevo_estado, usuario_id, usuario_perfil):
         """
         Actualizar el estado de una inscripción.
@@ -103,10 +269,130 @@ class InscripcionService:
         if nuevo_estado not in ['pendiente', 'aceptada', 'rechazada']:
             raise ValueError("Estado de inscripción inválido")
 
+        notificaciones = []
+        if nuevo_estado == 'aceptada' and inscripcion.estado != 'aceptada':
+            if not self._reservar_cupo(torneo.id):
+                raise ValueError("El torneo ha alcanzado el límite máximo de participantes")
+            notificaciones = NotificacionService(self.db).guardar_inscripcion_aceptada(inscripcion)
+        elif nuevo_estado != 'aceptada' and inscripcion.estado == 'aceptada':
+            self._liberar_cupo(torneo.id)
+
         inscripcion.estado = nuevo_estado
+        evento = {
+            'inscripcion_id': inscripcion.id,
+            'torneo_id': inscripcion.torneo_id,
+            'estado': nuevo_estado
+        }
+        deportista_id = inscripcion.deportista_id
         self.db.commit()
+        cache_rosters.invalidar(evento['torneo_id'])
+
+        bus_eventos.publicar(canal_deportista(deportista_id), 'inscripcion', evento)
+        bus_eventos.publicar_notificaciones(notificaciones)
         return inscripcion
 
+    def actualizar_estado_inscripciones_bulk(self, nuevo_estado, usuario_id, usuario_perfil,
+                                             inscripcion_ids=None, torneo_id=None, estado_actual='pendiente'):
+        """
+        Cambia el estado de varias inscripciones con un único UPDATE.
+        Recibe una lista de IDs o un filtro (torneo_id y estado_actual). Verifica los
+        permisos una vez por torneo y, al aceptar, reserva cupo por torneo; las que no
+        entran en el cupo se dejan como estaban. Retorna los conteos del resultado.
+        """
+        if usuario_perfil not in ['profesor', 'administrador']:
+            raise ValueError("No tienes permisos para actualizar inscripciones")
+        if nuevo_estado not in ['pendiente', 'aceptada', 'rechazada']:
+            raise ValueError("Estado de inscripción inválido")
+
+        query = self.db.query(Inscripcion)
+        if inscripcion_ids is not None:
+            if (not isinstance(inscripcion_ids, list) or not inscripcion_ids
+                    or not all(isinstance(i, int) and not isinstance(i, bool) for i in inscripcion_ids)):
+                raise ValueError("ids debe ser una lista no vacía de IDs de inscripción")
+            if len(inscripcion_ids) > MAX_INSCRIPCIONES_BULK:
+                raise ValueError(f"No se pueden actualizar más de {MAX_INSCRIPCIONES_BULK} inscripciones por solicitud")
+            query = query.filter(Inscripcion.id.in_(inscripcion_ids))
+        elif torneo_id:
+            if estado_actual not in ['pendiente', 'aceptada', 'rechazada']:
+                raise ValueError("Estado de inscripción inválido")
+            query = query.filter(Inscripcion.torneo_id == torneo_id, Inscripcion.estado == estado_actual)
+        else:
+            raise ValueError("Debe indicar ids o torneo_id")
+
+        inscripciones = query.order_by(Inscripcion.id).with_for_update().all()
+        solicitadas = len(set(inscripcion_ids)) if inscripcion_ids is not None else len(inscripciones)
+        resultado = {
+            'actualizadas': 0,
+            'sin_cambios': 0,
+            'sin_cupo': 0,
+            'no_encontradas': solicitadas - len(inscripciones)
+        }
+        if not inscripciones:
+            return resultado
+
+        # Cargar los torneos afectados una vez; inscripcion.torneo se resuelve desde la sesión
+        torneos = {torneo.id: torneo for torneo in self.db.query(Torneo).filter(
+            Torneo.id.in_({i.torneo_id for i in inscripciones})
+        ).with_for_update()}
+        for torneo in torneos.values():
+            if torneo.tipo == 'cerrado' and usuario_perfil != 'administrador' and torneo.profesor_id != usuario_id:
+                raise ValueError("No tienes permisos para actualizar inscripciones de este torneo")
+
+        cambiadas = []
+        cupo = {torneo.id: torneo.max_participantes - torneo.inscripciones_aceptadas for torneo in torneos.values()}
+        reservas = {}
+        liberaciones = {}
+        for inscripcion in inscripciones:
+            if inscripcion.estado == nuevo_estado:
+                resultado['sin_cambios'] += 1
+            elif nuevo_estado == 'aceptada':
+                if cupo[inscripcion.torneo_id] <= 0:
+                    resultado['sin_cupo'] += 1
+                    continue
+                cupo[inscripcion.torneo_id] -= 1
+                reservas[inscripcion.torneo_id] = reservas.get(inscripcion.torneo_id, 0) + 1
+                cambiadas.append(inscripcion)
+            else:
+                if inscripcion.estado == 'aceptada':
+                    liberaciones[inscripcion.torneo_id] = liberaciones.get(inscripcion.torneo_id, 0) + 1
+                cambiadas.append(inscripcion)
+
+        if not cambiadas:
+            return resultado
+
+        for reserva_torneo_id, cantidad in reservas.items():
+            if not self._reservar_cupo(reserva_torneo_id, cantidad):
+                self.db.rollback()
+                raise ValueError("El cupo del torneo cambió durante la actualización; intente de nuevo")
+        for liberacion_torneo_id, cantidad in liberaciones.items():
+            self._liberar_cupo(liberacion_torneo_id, cantidad)
+
+        notificaciones = []
+        if nuevo_estado == 'aceptada':
+            notificacion_service = NotificacionService(self.db)
+            notificaciones = notificacion_service.guardar_notificaciones([
+                notificacion_service._notificacion_inscripcion_aceptada(inscripcion)
+                for inscripcion in cambiadas
+            ])
+        eventos = [(inscripcion.deportista_id, {
+            'inscripcion_id': inscripcion.id,
+            'torneo_id': inscripcion.torneo_id,
+            'estado': nuevo_estado
+        }) for inscripcion in cambiadas]
+
+        self.db.query(Inscripcion).filter(
+            Inscripcion.id.in_([inscripcion.id for inscripcion in cambiadas])
+        ).update({Inscripcion.estado: nuevo_estado}, synchronize_session=False)
+        self.db.commit()
+        for cambiado_torneo_id in torneos:
+            cache_rosters.invalidar(cambiado_torneo_id)
+
+        for deportista_id, evento in eventos:
+            bus_eventos.publicar(canal_deportista(deportista_id), 'inscripcion', evento)
+        bus_eventos.publicar_notificaciones(notificaciones)
+        resultado['actualizadas'] = len(cambiadas)
+        return resultado
+
     def eliminar_inscripcion(self, inscripcion_id, usuario_id, usuario_perfil):
         """
         Eliminar una inscripción.
@@ -131,8 +417,12 @@ class InscripcionService:
             inscripcion.deportista_id != usuario_id):
             raise ValueError("No tienes permisos para eliminar inscripciones de este torneo")
 
+        if inscripcion.estado == 'aceptada':
+            self._liberar_cupo(torneo.id)
+        torneo_id = torneo.id
         self.db.delete(inscripcion)
         self.db.commit()
+        cache_rosters.invalidar(torneo_id)
         return True
 
     def obtener_inscripcion(self, torneo_id, deportista_id):
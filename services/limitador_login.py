@@ -0,0 +1,287 @@
+# services/limitador_login.py
+import time
+import uuid
+import threading
+from collections import defaultdict, deque
+from config.jwt_config import (
+    LOGIN_VENTANA_SEGUNDOS, LOGIN_MAX_INTENTOS_EMAIL,
+    LOGIN_MAX_INTENTOS_IP, LOGIN_THROTTLE_REDIS_URL
+)
+
+class BackendMemoria:
+    """
+    Guarda los intentos fallidos en memoria del proceso, como (instante, miembro).
+    Cada cierto número de registros purga las claves sin intentos recientes.
+    """
+    PURGAR_CADA = 1000
+
+    def __init__(self):
+        self._intentos = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._registros = 0
+
+    def registrar(self, clave, ahora, ventana):
+        """
+        Registra un intento y retorna (miembro, posición): la posición cuenta los
+        intentos de la ventana hasta este inclusive, calculada en la misma operación.
+        """
+        miembro = uuid.uuid4().hex
+        with self._lock:
+            intentos = self._intentos[clave]
+            intentos.append((ahora, miembro))
+            self._descartar_viejos(intentos, ahora - ventana)
+            posicion = len(intentos)
+            self._registros += 1
+            if self._registros % self.PURGAR_CADA == 0:
+                self._purgar(ahora - ventana)
+        return miembro, posicion
+
+    def quitar(self, clave, miembro):
+        with self._lock:
+            intentos = self._intentos.get(clave)
+            if not intentos:
+                return
+            for intento in intentos:
+                if intento[1] == miembro:
+                    intentos.remove(intento)
+                    break
+            if not intentos:
+                del self._intentos[clave]
+
+    def _purgar(self, desde):
+        for clave in [c for c, intentos in self._intentos.items() if not intentos or intentos[-1][0] <= desde]:
+            del self._intentos[clave]
+
+    def intentos(self, clave, desde):
+        """
+        Retorna los instantes de los intentos posteriores a 'desde', del más viejo al más nuevo.
+        """
+        with self._lock:
+            intentos = self._intentos.get(clave)
+            if not intentos:
+                return []
+            self._descartar_viejos(intentos, desde)
+            if not intentos:
+                del self._intentos[clave]
+                return []
+            return [instante for instante, _ in intentos]
+
+    def limpiar(self, clave):
+        with self._lock:
+            self._intentos.pop(clave, None)
+
+    @staticmethod
+    def _descartar_viejos(intentos, desde):
+        while intentos and intentos[0][0] <= desde:
+            intentos.popleft()
+
+class BackendCompartido:
+    """
+    Guarda los intentos en un sorted set por clave, con la interfaz de un cliente
+    Redis (pipeline, zadd, zrem, zcard, zremrangebyscore, zrangebyscore, expire, delete).
+    Sirve cualquier cliente compatible, por ejemplo ClienteSortedSetMemoria para pruebas.
+    """
+    def __init__(self, cliente, prefijo='login_fallido:'):
+        self.cliente = cliente
+        self.prefijo = prefijo
+
+    def registrar(self, clave, ahora, ventana):
+        """
+        Registra un intento y retorna (miembro, posición). Descartar los viejos, agregar
+        y contar van en una transacción (MULTI/EXEC), así que entre procesos concurrentes
+        cada uno obtiene una posición distinta, en el orden en que llegaron.
+        """
+        clave = self.prefijo + clave
+        miembro = f'{ahora}:{uuid.uuid4().hex}'
+        pipe = self.cliente.pipeline(transaction=True)
+        pipe.zremrangebyscore(clave, '-inf', ahora - ventana)
+        pipe.zadd(clave, {miembro: ahora})
+        pipe.zcard(clave)
+        pipe.expire(clave, int(ventana) + 1)
+        _, _, posicion, _ = pipe.execute()
+        return miembro, posicion
+
+    def quitar(self, clave, miembro):
+        self.cliente.zrem(self.prefijo + clave, miembro)
+
+    def intentos(self, clave, desde):
+        clave = self.prefijo + clave
+        return [score for _, score in self.cliente.zrangebyscore(clave, f'({desde}', '+inf', withscores=True)]
+
+    def limpiar(self, clave):
+        self.cliente.delete(self.prefijo + clave)
+
+class ClienteSortedSetMemoria:
+    """
+    Cliente en memoria con los comandos de sorted sets de Redis que usa
+    BackendCompartido, para probarlo sin un servidor. Las operaciones de un
+    pipeline se ejecutan juntas bajo el lock, como MULTI/EXEC.
+    """
+    def __init__(self):
+        self._sets = {}
+        self._expira = {}
+        self._lock = threading.RLock()
+
+    def _miembros(self, clave):
+        expira = self._expira.get(clave)
+        if expira is not None and time.time() >= expira:
+            self._sets.pop(clave, None)
+            self._expira.pop(clave, None)
+        return self._sets.get(clave, {})
+
+    @staticmethod
+    def _en_rango(score, minimo, maximo):
+        def limite(valor):
+            valor = str(valor)
+            return (float(valor[1:]), True) if valor.startswith('(') else (float(valor), False)
+        (desde, excluye_desde), (hasta, excluye_hasta) = limite(minimo), limite(maximo)
+        return ((score > desde if excluye_desde else score >= desde)
+                and (score < hasta if excluye_hasta else score <= hasta))
+
+    def zadd(self, clave, miembros):
+        with self._lock:
+            self._miembros(clave)
+            conjunto = self._sets.setdefault(clave, {})
+            nuevos = len(set(miembros) - set(conjunto))
+            conjunto.update(miembros)
+            return nuevos
+
+    def zrem(self, clave, *miembros):
+        with self._lock:
+            conjunto = self._miembros(clave)
+            return sum(conjunto.pop(miembro, None) is not None for miembro in miembros)
+
+    def zcard(self, clave):
+        with self._lock:
+            return len(self._miembros(clave))
+
+    def zremrangebyscore(self, clave, minimo, maximo):
+        with self._lock:
+            conjunto = self._miembros(clave)
+            borrar = [m for m, score in conjunto.items() if self._en_rango(score, minimo, maximo)]
+            for miembro in borrar:
+                del conjunto[miembro]
+            return len(borrar)
+
+    def zrangebyscore(self, clave, minimo, maximo, withscores=False):
+        with self._lock:
+            filas = sorted(
+                ((m, score) for m, score in self._miembros(clave).items() if self._en_rango(score, minimo, maximo)),
+                key=lambda fila: (fila[1], fila[0])
+            )
+            return filas if withscores else [m for m, _ in filas]
+
+    def expire(self, clave, segundos):
+        with self._lock:
+            self._miembros(clave)
+            if clave not in self._sets:
+                return False
+            self._expira[clave] = time.time() + segundos
+            return True
+
+    def delete(self, *claves):
+        with self._lock:
+            return sum(self._sets.pop(clave, None) is not None for clave in claves)
+
+    def pipeline(self, transaction=True):
+        return _PipelineMemoria(self)
+
+class _PipelineMemoria:
+    """
+    Encola los comandos y los ejecuta en bloque en execute(), retornando sus resultados.
+    """
+    def __init__(self, cliente):
+        self._cliente = cliente
+        self._comandos = []
+
+    def __getattr__(self, nombre):
+        metodo = getattr(self._cliente, nombre)
+        def encolar(*args, **kwargs):
+            self._comandos.append((metodo, args, kwargs))
+            return self
+        return encolar
+
+    def execute(self):
+        with self._cliente._lock:
+            resultados = [metodo(*args, **kwargs) for metodo, args, kwargs in self._comandos]
+        self._comandos = []
+        return resultados
+
+class LimitadorLogin:
+    """
+    Limita los intentos fallidos de login por email y por IP en una ventana deslizante.
+    La verificación no toca la base de datos ni bcrypt, así que un cliente bloqueado
+    se rechaza con costo mínimo. Cada intento se cuenta antes de verificar la contraseña
+    y se descuenta si resulta exitoso, para que las peticiones en paralelo no superen el máximo.
+    """
+    def __init__(self, backend, ventana=LOGIN_VENTANA_SEGUNDOS,
+                 max_intentos_email=LOGIN_MAX_INTENTOS_EMAIL, max_intentos_ip=LOGIN_MAX_INTENTOS_IP):
+        self.backend = backend
+        self.ventana = ventana
+        self.max_intentos_email = max_intentos_email
+        self.max_intentos_ip = max_intentos_ip
+
+    def _claves(self, email, ip):
+        return [
+            (f'email:{email.strip().lower()}', self.max_intentos_email),
+            (f'ip:{ip}', self.max_intentos_ip)
+        ]
+
+    def segundos_bloqueo(self, email, ip):
+        """
+        Retorna cuántos segundos faltan para poder intentar de nuevo, o 0 si no hay bloqueo.
+        """
+        ahora = time.time()
+        espera = 0
+        for clave, maximo in self._claves(email, ip):
+            intentos = self.backend.intentos(clave, ahora - self.ventana)
+            if len(intentos) >= maximo:
+                # Se libera un cupo cuando sale de la ventana el intento que completó el máximo
+                libera = intentos[-maximo] + self.ventana - ahora
+                espera = max(espera, libera)
+        return int(espera) + 1 if espera > 0 else 0
+
+    def reservar_intento(self, email, ip):
+        """
+        Cuenta el intento como fallido antes de verificar la contraseña.
+        Retorna (segundos de espera, reserva): con espera el intento se rechaza y no
+        queda contado; sin espera queda contado hasta que se llame a liberar_intento.
+        """
+        ahora = time.time()
+        reserva = []
+        for clave, maximo in self._claves(email, ip):
+            miembro, posicion = self.backend.registrar(clave, ahora, self.ventana)
+            reserva.append((clave, miembro))
+            if posicion > maximo:
+                self.liberar_intento(reserva)
+                return max(self.segundos_bloqueo(email, ip), 1), None
+        return 0, reserva
+
+    def liberar_intento(self, reserva):
+        """
+        Descuenta un intento reservado que no fue un fallo de credenciales.
+        """
+        for clave, miembro in reserva or []:
+            self.backend.quitar(clave, miembro)
+
+    def registrar_exito(self, email):
+        """
+        Reinicia el conteo del email. El de la IP se mantiene para no permitir
+        que un login válido habilite más intentos contra otras cuentas.
+        """
+        self.backend.limpiar(f'email:{email.strip().lower()}')
+
+def crear_backend():
+    """
+    Usa el backend compartido si está configurado LOGIN_THROTTLE_REDIS_URL.
+    """
+    if LOGIN_THROTTLE_REDIS_URL:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('LOGIN_THROTTLE_REDIS_URL requiere el paquete redis')
+        return BackendCompartido(redis.Redis.from_url(LOGIN_THROTTLE_REDIS_URL))
+    return BackendMemoria()
+
+# Instancia compartida por la aplicación
+limitador_login = LimitadorLogin(crear_backend())
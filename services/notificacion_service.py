@@ -3,6 +3,23 @@ from datetime import datetime, timedelta
 from models.usuario_model import Usuario
 from models.partido_model import Partido
 from models.torneo_model import Torneo
+from models.notificacion_model import Notificacion
+from models.envio_notificacion_model import EnvioNotificacion
+from sqlalchemy import insert, select, func, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, aliased
+from services.usuario_service import UsuarioService
+
+# Plantillas por tipo de evento. El mensaje depende solo del torneo, así que en los
+# eventos con varias notificaciones se arma una vez y se comparte entre todas.
+PLANTILLAS_MENSAJE = {
+    'partido_programado': 'Tienes un partido programado en {torneo}'.format,
+    'victoria': '¡Felicidades! Ganaste tu partido en {torneo}'.format,
+    'derrota': 'Tu partido en {torneo} ha terminado'.format,
+    'nueva_ronda': 'Nueva ronda en {torneo}'.format,
+    'inscripcion_aceptada': 'Tu inscripción a {torneo} ha sido aceptada'.format,
+    'recordatorio': 'Recordatorio: Tienes un partido mañana en {torneo}'.format,
+}
 
 class NotificacionService:
     def __init__(self, db_session):
@@ -40,7 +57,7 @@ class NotificacionService:
 
         return {
             'tipo': 'partido_programado',
-            'mensaje': f'Tienes un partido programado en {torneo.nombre}',
+            'mensaje': PLANTILLAS_MENSAJE['partido_programado'](torneo=torneo.nombre),
             'detalles': {
                 'torneo': torneo.nombre,
                 'ronda': partido.ronda,
@@ -61,18 +78,23 @@ class NotificacionService:
         if not partido or partido.estado != 'finalizado':
             return None
 
-        torneo = partido.torneo
-        ganador = partido.ganador
-        perdedor = partido.perdedor
+        return self._notificaciones_resultado(partido, partido.ganador, partido.perdedor)
 
+    def _notificaciones_resultado(self, partido, ganador, perdedor):
+        """
+        Arma las notificaciones de resultado para el ganador y el perdedor.
+        """
+        torneo = partido.torneo
         notificaciones = []
 
         # Notificación para el ganador
         if ganador:
             notificaciones.append({
                 'deportista_id': ganador.id,
+                'torneo_id': torneo.id,
+                'partido_id': partido.id,
                 'tipo': 'victoria',
-                'mensaje': f'¡Felicidades! Ganaste tu partido en {torneo.nombre}',
+                'mensaje': PLANTILLAS_MENSAJE['victoria'](torneo=torneo.nombre),
                 'detalles': {
                     'torneo': torneo.nombre,
                     'ronda': partido.ronda,
@@ -86,8 +108,10 @@ class NotificacionService:
         if perdedor:
             notificaciones.append({
                 'deportista_id': perdedor.id,
+                'torneo_id': torneo.id,
+                'partido_id': partido.id,
                 'tipo': 'derrota',
-                'mensaje': f'Tu partido en {torneo.nombre} ha terminado',
+                'mensaje': PLANTILLAS_MENSAJE['derrota'](torneo=torneo.nombre),
                 'detalles': {
                     'torneo': torneo.nombre,
                     'ronda': partido.ronda,
@@ -103,41 +127,72 @@ class NotificacionService:
         """
         Notifica a los deportistas sobre una nueva ronda.
         """
-        torneo = self.db.query(Torneo).filter(Torneo.id == torneo_id).first()
-        if not torneo:
-            return None
-
-        # Obtener partidos de la nueva ronda
-        partidos = self.db.query(Partido).filter(
-            Partido.torneo_id == torneo_id,
+        # Torneo, partidos de la ronda y ambos participantes en una sola consulta
+        deportista1 = aliased(Usuario)
+        deportista2 = aliased(Usuario)
+        filas = self.db.query(
+            Torneo.id.label('torneo_id'), Torneo.nombre.label('torneo_nombre'), Torneo.superficie,
+            Partido.id, Partido.deportista1_id, Partido.deportista2_id, Partido.ronda, Partido.fecha_partido,
+            deportista1.nombre.label('nombre1'), deportista1.apellido.label('apellido1'),
+            deportista2.nombre.label('nombre2'), deportista2.apellido.label('apellido2')
+        ).outerjoin(Partido, and_(
+            Partido.torneo_id == Torneo.id,
             Partido.numero_ronda == ronda,
             Partido.estado == 'programado'
-        ).all()
+        )).outerjoin(
+            deportista1, deportista1.id == Partido.deportista1_id
+        ).outerjoin(
+            deportista2, deportista2.id == Partido.deportista2_id
+        ).filter(Torneo.id == torneo_id).order_by(Partido.posicion_cuadro).all()
+
+        if not filas:
+            return None
+
+        torneo = filas[0]
+        nombres = {}
+        partidos = []
+        for fila in filas:
+            if fila.id is None:  # Torneo sin partidos en esa ronda
+                continue
+            if fila.nombre1 is not None:
+                nombres[fila.deportista1_id] = f"{fila.nombre1} {fila.apellido1}"
+            if fila.nombre2 is not None:
+                nombres[fila.deportista2_id] = f"{fila.nombre2} {fila.apellido2}"
+            partidos.append(fila._mapping)
+
+        return self._notificaciones_nueva_ronda(
+            torneo.torneo_id, torneo.torneo_nombre, torneo.superficie, partidos, nombres
+        )
+
+    def _notificaciones_nueva_ronda(self, torneo_id, torneo_nombre, superficie, partidos, nombres):
+        """
+        Arma las notificaciones de nueva ronda a partir de filas de partido
+        (con id opcional, deportista1_id, deportista2_id, ronda y fecha_partido)
+        y un diccionario id -> nombre completo de los participantes.
+        El mensaje se arma una sola vez para todo el evento.
+        """
+        mensaje = PLANTILLAS_MENSAJE['nueva_ronda'](torneo=torneo_nombre)
 
         notificaciones = []
         for partido in partidos:
-            for deportista_id in [partido.deportista1_id, partido.deportista2_id]:
-                if deportista_id:  # No incluir byes
-                    deportista = self.db.query(Usuario).filter(Usuario.id == deportista_id).first()
-                    if deportista:
-                        # Determinar oponente
-                        if partido.deportista1_id == deportista_id:
-                            oponente = partido.deportista2
-                        else:
-                            oponente = partido.deportista1
-
-                        notificaciones.append({
-                            'deportista_id': deportista_id,
-                            'tipo': 'nueva_ronda',
-                            'mensaje': f'Nueva ronda en {torneo.nombre}',
-                            'detalles': {
-                                'torneo': torneo.nombre,
-                                'ronda': partido.ronda,
-                                'oponente': f"{oponente.nombre} {oponente.apellido}" if oponente else "Bye",
-                                'fecha': partido.fecha_partido.isoformat() if partido.fecha_partido else None,
-                                'superficie': torneo.superficie
-                            }
-                        })
+            id1, id2 = partido['deportista1_id'], partido['deportista2_id']
+            fecha = partido['fecha_partido'].isoformat() if partido['fecha_partido'] else None
+            for deportista_id, oponente_id in ((id1, id2), (id2, id1)):
+                if deportista_id in nombres:  # No incluir byes
+                    notificaciones.append({
+                        'deportista_id': deportista_id,
+                        'torneo_id': torneo_id,
+                        'partido_id': partido.get('id'),
+                        'tipo': 'nueva_ronda',
+                        'mensaje': mensaje,
+                        'detalles': {
+                            'torneo': torneo_nombre,
+                            'ronda': partido['ronda'],
+                            'oponente': nombres.get(oponente_id, "Bye"),
+                            'fecha': fecha,
+                            'superficie': superficie
+                        }
+                    })
 
         return notificaciones
 
@@ -151,13 +206,20 @@ class NotificacionService:
         if not inscripcion or inscripcion.estado != 'aceptada':
             return None
 
-        deportista = inscripcion.deportista
+        return self._notificacion_inscripcion_aceptada(inscripcion)
+
+    def _notificacion_inscripcion_aceptada(self, inscripcion):
+        """
+        Arma la notificación de inscripción aceptada.
+        """
         torneo = inscripcion.torneo
 
         return {
-            'deportista_id': deportista.id,
+            'deportista_id': inscripcion.deportista_id,
+            'torneo_id': torneo.id,
+            'partido_id': None,
             'tipo': 'inscripcion_aceptada',
-            'mensaje': f'Tu inscripción a {torneo.nombre} ha sido aceptada',
+            'mensaje': PLANTILLAS_MENSAJE['inscripcion_aceptada'](torneo=torneo.nombre),
             'detalles': {
                 'torneo': torneo.nombre,
                 'superficie': torneo.superficie,
@@ -167,61 +229,196 @@ class NotificacionService:
             }
         }
 
-    def obtener_notificaciones_deportista(self, deportista_id, limite=10):
+    def guardar_notificaciones(self, notificaciones):
         """
-        Obtiene las notificaciones recientes de un deportista.
+        Persiste notificaciones en la bandeja con un único INSERT masivo y las encola
+        en la bandeja de salida (envios_notificaciones) para su entrega en segundo plano.
+        No hace commit: se guardan en la misma transacción que el evento que las origina.
+        Retorna las notificaciones guardadas, para publicarlas después del commit.
         """
-        notificaciones = []
+        filas = [{
+            'deportista_id': n['deportista_id'],
+            'tipo': n['tipo'],
+            'mensaje': n['mensaje'],
+            'detalles': n.get('detalles'),
+            'torneo_id': n.get('torneo_id'),
+            'partido_id': n.get('partido_id'),
+            'clave': n.get('clave'),
+            'leida': False
+        } for n in notificaciones]
 
-        # Próximo partido
-        proximo_partido = self.notificar_proximo_partido(deportista_id)
-        if proximo_partido:
-            notificaciones.append(proximo_partido)
+        if filas:
+            self.db.execute(insert(Notificacion), filas)
+            self.db.execute(insert(EnvioNotificacion), [{
+                'deportista_id': fila['deportista_id'],
+                'contenido': {
+                    'tipo': fila['tipo'],
+                    'mensaje': fila['mensaje'],
+                    'detalles': fila['detalles'],
+                    'torneo_id': fila['torneo_id'],
+                    'partido_id': fila['partido_id']
+                },
+                'estado': 'pendiente',
+                'intentos': 0,
+                'proximo_intento': datetime.now()
+            } for fila in filas])
+        return notificaciones
 
-        # Partidos recientes finalizados
-        partidos_recientes = self.db.query(Partido).filter(
-            (Partido.deportista1_id == deportista_id) | (Partido.deportista2_id == deportista_id),
-            Partido.estado == 'finalizado'
-        ).order_by(Partido.fecha_partido.desc()).limit(5).all()
+    def guardar_resultado_partido(self, partido):
+        """
+        Guarda las notificaciones de victoria y derrota de un partido finalizado.
+        """
+        usuarios = UsuarioService(self.db).obtener_usuarios_por_ids([partido.ganador_id, partido.perdedor_id])
+        return self.guardar_notificaciones(self._notificaciones_resultado(
+            partido, usuarios.get(partido.ganador_id), usuarios.get(partido.perdedor_id)
+        ))
 
-        for partido in partidos_recientes:
-            resultado_notif = self.notificar_resultado_partido(partido.id)
-            if resultado_notif:
-                # Filtrar solo la notificación del deportista actual
-                for notif in resultado_notif:
-                    if notif['deportista_id'] == deportista_id:
-                        notificaciones.append(notif)
-                        break
+    def guardar_nueva_ronda(self, torneo, partidos, usuarios):
+        """
+        Guarda las notificaciones de una ronda recién creada. usuarios es un
+        diccionario id -> Usuario con los participantes ya cargados.
+        """
+        nombres = {usuario_id: f"{u.nombre} {u.apellido}" for usuario_id, u in usuarios.items()}
+        return self.guardar_notificaciones(self._notificaciones_nueva_ronda(
+            torneo.id, torneo.nombre, torneo.superficie, partidos, nombres
+        ))
 
-        return notificaciones[:limite]
+    def guardar_inscripcion_aceptada(self, inscripcion):
+        """
+        Guarda la notificación de una inscripción aceptada.
+        """
+        return self.guardar_notificaciones([self._notificacion_inscripcion_aceptada(inscripcion)])
 
-    def generar_recordatorio_partidos(self, dias_antes=1):
+    def obtener_notificaciones_deportista(self, deportista_id, limite=10, solo_no_leidas=False):
         """
-        Genera recordatorios para partidos que están próximos.
+        Obtiene las notificaciones recientes de un deportista, de la más nueva a la más vieja,
+        junto con el total de no leídas. Es una sola consulta sobre los índices de la bandeja.
+        """
+        no_leidas = select(func.count(Notificacion.id)).where(
+            Notificacion.deportista_id == deportista_id,
+            Notificacion.leida == False
+        ).scalar_subquery()
+
+        query = self.db.query(Notificacion, no_leidas.label('no_leidas')).filter(
+            Notificacion.deportista_id == deportista_id
+        )
+        if solo_no_leidas:
+            query = query.filter(Notificacion.leida == False)
+
+        filas = query.order_by(Notificacion.id.desc()).limit(limite).all()
+
+        return {
+            'notificaciones': [fila.Notificacion.as_dict() for fila in filas],
+            'no_leidas': filas[0].no_leidas if filas else 0
+        }
+
+    def marcar_leidas(self, deportista_id, notificacion_ids=None):
+        """
+        Marca como leídas las notificaciones indicadas del deportista, o todas si no se indican.
+        """
+        query = self.db.query(Notificacion).filter(
+            Notificacion.deportista_id == deportista_id,
+            Notificacion.leida == False
+        )
+        if notificacion_ids:
+            query = query.filter(Notificacion.id.in_(notificacion_ids))
+
+        actualizadas = query.update({Notificacion.leida: True}, synchronize_session=False)
+        self.db.commit()
+        return actualizadas
+
+    def _query_partidos_a_recordar(self, dias_antes):
+        """
+        Partidos programados para dentro de dias_antes días, con el torneo y ambos
+        deportistas cargados en la misma consulta.
         """
         fecha_limite = datetime.now().date() + timedelta(days=dias_antes)
-        
-        partidos_proximos = self.db.query(Partido).filter(
+
+        return self.db.query(Partido).options(
+            joinedload(Partido.torneo),
+            joinedload(Partido.deportista1),
+            joinedload(Partido.deportista2)
+        ).filter(
             Partido.fecha_partido == fecha_limite,
             Partido.estado == 'programado'
-        ).all()
+        ).order_by(Partido.id)
 
+    def _recordatorios_partido(self, partido):
+        """
+        Arma los recordatorios de un partido, uno por deportista.
+        """
+        torneo = partido.torneo
+        mensaje = PLANTILLAS_MENSAJE['recordatorio'](torneo=torneo.nombre)
         recordatorios = []
-        for partido in partidos_proximos:
-            for deportista_id in [partido.deportista1_id, partido.deportista2_id]:
-                if deportista_id:
-                    deportista = self.db.query(Usuario).filter(Usuario.id == deportista_id).first()
-                    if deportista:
-                        recordatorios.append({
-                            'deportista_id': deportista_id,
-                            'tipo': 'recordatorio',
-                            'mensaje': f'Recordatorio: Tienes un partido mañana en {partido.torneo.nombre}',
-                            'detalles': {
-                                'torneo': partido.torneo.nombre,
-                                'ronda': partido.ronda,
-                                'fecha': partido.fecha_partido.isoformat(),
-                                'superficie': partido.torneo.superficie
-                            }
-                        })
+        for deportista in [partido.deportista1, partido.deportista2]:
+            if deportista:
+                recordatorios.append({
+                    'deportista_id': deportista.id,
+                    'torneo_id': torneo.id,
+                    'partido_id': partido.id,
+                    'clave': f'recordatorio:{partido.id}:{deportista.id}:{partido.fecha_partido.isoformat()}',
+                    'tipo': 'recordatorio',
+                    'mensaje': mensaje,
+                    'detalles': {
+                        'torneo': torneo.nombre,
+                        'ronda': partido.ronda,
+                        'fecha': partido.fecha_partido.isoformat(),
+                        'superficie': torneo.superficie
+                    }
+                })
+        return recordatorios
 
+    def generar_recordatorio_partidos(self, dias_antes=1):
+        """
+        Genera recordatorios para partidos que están próximos.
+        """
+        recordatorios = []
+        for partido in self._query_partidos_a_recordar(dias_antes):
+            recordatorios.extend(self._recordatorios_partido(partido))
         return recordatorios
+
+    def guardar_recordatorios_partidos(self, dias_antes=1, tamano_lote=500):
+        """
+        Guarda en la bandeja los recordatorios de los partidos próximos, recorriendo
+        los partidos en lotes de tamano_lote por id (cada lote es una consulta
+        independiente, así que se puede hacer commit entre lotes).
+        Es idempotente: cada recordatorio tiene una clave única y los que ya existen
+        se omiten, así que puede ejecutarse varias veces por día o desde varios procesos.
+        Retorna cuántos recordatorios nuevos se guardaron.
+        """
+        guardados = 0
+        ultimo_id = 0
+        while True:
+            partidos = self._query_partidos_a_recordar(dias_antes).filter(
+                Partido.id > ultimo_id
+            ).limit(tamano_lote).all()
+            if not partidos:
+                break
+
+            recordatorios = []
+            for partido in partidos:
+                recordatorios.extend(self._recordatorios_partido(partido))
+            ultimo_id = partidos[-1].id
+
+            guardados += self._guardar_lote_recordatorios(recordatorios)
+            if len(partidos) < tamano_lote:
+                break
+        return guardados
+
+    def _guardar_lote_recordatorios(self, recordatorios):
+        """
+        Inserta los recordatorios del lote cuya clave aún no existe.
+        Si otro proceso insertó alguno entre la consulta y el INSERT, reintenta una vez.
+        """
+        for intento in range(2):
+            claves = [r['clave'] for r in recordatorios]
+            existentes = {fila.clave for fila in self.db.query(Notificacion.clave).filter(Notificacion.clave.in_(claves))}
+            nuevos = [r for r in recordatorios if r['clave'] not in existentes]
+            try:
+                self.guardar_notificaciones(nuevos)
+                self.db.commit()
+                return len(nuevos)
+            except IntegrityError:
+                self.db.rollback()
+                if intento == 1:
+                    raise
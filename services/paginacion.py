@@ -0,0 +1,52 @@
+# services/paginacion.py
+from datetime import date, datetime
+
+# Límite superior para evitar páginas arbitrariamente grandes
+LIMITE_MAXIMO = 500
+
+# Columnas que nunca se exponen mediante proyección
+CAMPOS_EXCLUIDOS = {'password_hash'}
+
+def columnas_proyeccion(modelo, fields):
+    """
+    Valida los campos solicitados y devuelve las columnas a seleccionar.
+    El id se incluye siempre porque es la clave del cursor.
+    """
+    columnas_validas = set(modelo.__table__.columns.keys()) - CAMPOS_EXCLUIDOS
+    invalidos = [f for f in fields if f not in columnas_validas]
+    if invalidos:
+        raise ValueError(f"Campos no válidos: {', '.join(invalidos)}")
+
+    nombres = ['id'] + [f for f in fields if f != 'id']
+    return [getattr(modelo, nombre) for nombre in nombres]
+
+def fila_a_dict(fila):
+    """
+    Convierte una fila proyectada en un diccionario serializable.
+    """
+    return {
+        clave: valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+        for clave, valor in fila._mapping.items()
+    }
+
+def paginar(query, modelo, limit=None, after=None, fields=None):
+    """
+    Aplica paginación keyset sobre el id y, opcionalmente, proyección de columnas.
+    Sin fields retorna instancias del modelo; con fields retorna diccionarios.
+    """
+    if fields:
+        query = query.with_entities(*columnas_proyeccion(modelo, fields))
+
+    if after is not None:
+        query = query.filter(modelo.id > after)
+
+    query = query.order_by(modelo.id)
+
+    if limit is not None:
+        if limit <= 0:
+            raise ValueError("El parámetro limit debe ser mayor que 0")
+        query = query.limit(min(limit, LIMITE_MAXIMO))
+
+    if fields:
+        return [fila_a_dict(fila) for fila in query]
+    return query.all()
@@ -3,6 +3,11 @@ from datetime import datetime
 from models.partido_model import Partido
 from models.torneo_model import Torneo
 from models.usuario_model import Usuario
+from models.notificacion_model import Notificacion
+from services.paginacion import paginar
+from services.cuadro_service import CuadroService
+from services.notificacion_service import NotificacionService
+from services.eventos import bus_eventos, canal_cuadro
 
 class PartidoService:
     def __init__(self, db_session):
@@ -11,14 +16,36 @@ class PartidoService:
         """
         self.db = db_session
 
-    def listar_partidos(self):
-        return self.db.query(Partido).all()
+    def _query_partidos(self):
+        """
+        Consulta base de partidos con los usuarios referenciados ya cargados.
+        """
+        return self.db.query(Partido).options(*Partido.opciones_carga_usuarios())
+
+    def listar_partidos(self, limit=None, after=None, fields=None):
+        """
+        Lista partidos paginados por id (keyset). Con fields retorna solo esas columnas.
+        """
+        query = self.db.query(Partido) if fields else self._query_partidos()
+        return paginar(query, Partido, limit, after, fields)
+
+    def iterar_partidos(self, tamano_lote=500):
+        """
+        Itera todos los partidos por lotes, sin materializar la tabla completa.
+        """
+        return self._query_partidos().order_by(Partido.id).yield_per(tamano_lote)
 
     def listar_partidos_por_torneo(self, torneo_id):
-        return self.db.query(Partido).filter(Partido.torneo_id == torneo_id).all()
+        return self._query_partidos().filter(Partido.torneo_id == torneo_id).all()
+
+    def listar_partidos_por_ronda(self, torneo_id, numero_ronda):
+        return self._query_partidos().filter(
+            Partido.torneo_id == torneo_id,
+            Partido.numero_ronda == numero_ronda
+        ).all()
 
     def listar_partidos_por_deportista(self, deportista_id):
-        return self.db.query(Partido).filter(
+        return self._query_partidos().filter(
             (Partido.deportista1_id == deportista_id) | 
             (Partido.deportista2_id == deportista_id)
         ).all()
@@ -140,6 +167,8 @@ class PartidoService:
         if torneo.tipo == 'cerrado' and usuario_perfil != 'administrador' and torneo.profesor_id != usuario_id:
             raise ValueError("No tienes permisos para eliminar partidos en este torneo")
 
+        # ON DELETE CASCADE solo actúa con PRAGMA foreign_keys=ON en SQLite
+        self.db.query(Notificacion).filter(Notificacion.partido_id == partido_id).delete(synchronize_session=False)
         self.db.delete(partido)
         self.db.commit()
         return True
@@ -155,6 +184,9 @@ class PartidoService:
         if not partido:
             raise ValueError("El partido no existe")
 
+        if partido.deportista1_id is None or partido.deportista2_id is None:
+            raise ValueError("El partido aún no tiene definidos ambos participantes")
+
         # Verificar que el ganador es uno de los participantes
         if ganador_id not in [partido.deportista1_id, partido.deportista2_id]:
             raise ValueError("El ganador debe ser uno de los participantes del partido")
@@ -167,5 +199,27 @@ class PartidoService:
         partido.resultado = resultado
         partido.estado = 'finalizado'
 
+        # En cuadros completos el ganador pasa al partido de la siguiente ronda
+        cuadro_service = CuadroService(self.db)
+        padre = cuadro_service.colocar_ganador_en_cuadro(partido)
+        notificaciones = NotificacionService(self.db).guardar_resultado_partido(partido)
+        if padre:
+            notificaciones += cuadro_service.guardar_partido_definido(padre)
+
+        # Armar el evento antes del commit, que expira los atributos cargados
+        evento = {
+            'partido_id': partido.id,
+            'numero_ronda': partido.numero_ronda,
+            'posicion_cuadro': partido.posicion_cuadro,
+            'ganador_id': ganador_id,
+            'perdedor_id': perdedor_id,
+            'resultado': resultado,
+            'partido_siguiente_id': padre.id if padre else None
+        }
+        torneo_id = partido.torneo_id
+
         self.db.commit()
+
+        bus_eventos.publicar(canal_cuadro(torneo_id), 'resultado', evento)
+        bus_eventos.publicar_notificaciones(notificaciones)
         return partido
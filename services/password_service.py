@@ -0,0 +1,91 @@
+# services/password_service.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from config.jwt_config import BCRYPT_ROUNDS, BCRYPT_MAX_WORKERS, BCRYPT_MAX_PENDIENTES
+
+logger = logging.getLogger(__name__)
+
+class PasswordPoolSaturadoError(Exception):
+    """
+    Se lanza cuando el pool de bcrypt tiene la cola llena y el trabajo se rechaza.
+    """
+    pass
+
+class PasswordService:
+    """
+    Ejecuta bcrypt en un pool de hilos acotado. Los trabajos que exceden
+    max_workers + max_pendientes se rechazan de inmediato en lugar de encolarse,
+    para que una ráfaga de logins no bloquee a los demás requests.
+    """
+    def __init__(self, rounds=BCRYPT_ROUNDS, max_workers=BCRYPT_MAX_WORKERS, max_pendientes=BCRYPT_MAX_PENDIENTES):
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+        self._cupos = threading.BoundedSemaphore(max_workers + max_pendientes)
+
+    def _ejecutar(self, funcion, *args):
+        if not self._cupos.acquire(blocking=False):
+            logger.warning("Pool de bcrypt saturado, trabajo rechazado")
+            raise PasswordPoolSaturadoError("El servidor está ocupado verificando credenciales, intenta de nuevo")
+        try:
+            futuro = self._executor.submit(funcion, *args)
+        except Exception:
+            self._cupos.release()
+            raise
+        futuro.add_done_callback(lambda _: self._cupos.release())
+        return futuro.result()
+
+    def hash_password(self, password):
+        """
+        Genera el hash bcrypt de una contraseña con el costo configurado.
+        """
+        def generar():
+            salt = bcrypt.gensalt(rounds=self.rounds)
+            return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        return self._ejecutar(generar)
+
+    def check_password(self, password, password_hash):
+        """
+        Verifica una contraseña contra su hash bcrypt.
+        """
+        return self._ejecutar(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def necesita_rehash(self, password_hash):
+        """
+        Indica si el hash se generó con un costo distinto del configurado.
+        El formato bcrypt es $2b$<costo>$<salt+hash>.
+        """
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+def medir_costo(rounds, repeticiones=3):
+    """
+    Mide en este equipo el tiempo medio (ms) de un hash bcrypt con el costo dado.
+    """
+    salt = bcrypt.gensalt(rounds=rounds)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        bcrypt.hashpw(b'calibracion-bcrypt', salt)
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+def recomendar_costo(objetivo_ms, minimo=10, maximo=16, repeticiones=3):
+    """
+    Mide los costos desde minimo hasta superar el objetivo y recomienda el
+    mayor costo cuyo tiempo no lo excede (o el mínimo si ninguno cabe).
+    Retorna (costo_recomendado, {costo: ms}).
+    """
+    mediciones = {}
+    recomendado = minimo
+    for rounds in range(minimo, maximo + 1):
+        mediciones[rounds] = medir_costo(rounds, repeticiones)
+        if mediciones[rounds] > objetivo_ms:
+            break
+        recomendado = rounds
+    return recomendado, mediciones
+
+# Instancia compartida por todo el proceso
+password_service = PasswordService()
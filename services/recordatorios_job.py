@@ -0,0 +1,73 @@
+# services/recordatorios_job.py
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+from config.database import get_db_session, close_db_session
+from services.notificacion_service import NotificacionService
+
+logger = logging.getLogger(__name__)
+
+def ejecutar_recordatorios(dias_antes=1, tamano_lote=500):
+    """
+    Ejecuta una corrida del job de recordatorios con su propia sesión.
+    Retorna cuántos recordatorios nuevos se guardaron.
+    """
+    try:
+        service = NotificacionService(get_db_session())
+        guardados = service.guardar_recordatorios_partidos(dias_antes, tamano_lote)
+        logger.info(f"Recordatorios de partidos guardados: {guardados}")
+        return guardados
+    finally:
+        close_db_session()
+
+class ProgramadorRecordatorios:
+    """
+    Ejecuta el job de recordatorios una vez por día a la hora indicada (HH:MM),
+    en un hilo de fondo dentro del proceso. Si hay varios workers con el programador
+    activo, la idempotencia del job evita recordatorios duplicados.
+    """
+    def __init__(self, hora='08:00', dias_antes=1, tamano_lote=500):
+        self.hora = datetime.strptime(hora, '%H:%M').time()
+        self.dias_antes = dias_antes
+        self.tamano_lote = tamano_lote
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def _segundos_hasta_proxima(self):
+        ahora = datetime.now()
+        proxima = datetime.combine(ahora.date(), self.hora)
+        if proxima <= ahora:
+            proxima += timedelta(days=1)
+        return (proxima - ahora).total_seconds()
+
+    def _bucle(self):
+        while not self._detener.wait(self._segundos_hasta_proxima()):
+            try:
+                ejecutar_recordatorios(self.dias_antes, self.tamano_lote)
+            except Exception as e:
+                logger.error(f"Error en el job de recordatorios: {str(e)}")
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name='recordatorios', daemon=True)
+            self._hilo.start()
+            logger.info(f"Job de recordatorios programado a las {self.hora.strftime('%H:%M')}")
+
+    def detener(self):
+        self._detener.set()
+
+def iniciar_programador_recordatorios():
+    """
+    Inicia el programador si RECORDATORIOS_HORA está configurada (ej. 08:00).
+    """
+    hora = os.getenv('RECORDATORIOS_HORA')
+    if not hora:
+        return None
+    programador = ProgramadorRecordatorios(
+        hora=hora,
+        dias_antes=int(os.getenv('RECORDATORIOS_DIAS_ANTES', 1)),
+        tamano_lote=int(os.getenv('RECORDATORIOS_TAMANO_LOTE', 500))
+    )
+    programador.iniciar()
+    return programador
@@ -0,0 +1,99 @@
+# services/revocacion_service.py
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from sqlalchemy.exc import IntegrityError
+from models.token_revocado_model import TokenRevocado
+
+logger = logging.getLogger(__name__)
+
+def _fecha_desde_exp(exp):
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+class RevocacionTokens:
+    """
+    Lista de jti revocados. La tabla tokens_revocados es la fuente de verdad y cada
+    proceso mantiene una copia en memoria (jti -> exp) para que la verificación en
+    cada request sea una búsqueda O(1) en un dict. Cada intervalo_sincronizacion
+    segundos se traen las revocaciones hechas por otros procesos desde la última
+    fecha_revocacion vista menos margen_sincronizacion segundos. No se usa el id como
+    marca porque en MySQL se asigna al insertar y no al confirmar: una transacción con
+    un id menor puede confirmarse después de que otro proceso ya leyó uno mayor. El
+    margen cubre ese intervalo entre el INSERT y el commit; las filas releídas no cambian nada.
+    """
+    def __init__(self, intervalo_sincronizacion=5, margen_sincronizacion=60):
+        self.intervalo_sincronizacion = intervalo_sincronizacion
+        self.margen_sincronizacion = margen_sincronizacion
+        self._revocados = {}
+        self._ultima_revocacion = None
+        self._proxima_sincronizacion = 0.0
+        self._lock = threading.Lock()
+
+    def esta_revocado(self, db, jti):
+        """
+        Retorna True si el jti fue revocado y el token aún no expira.
+        """
+        if time.monotonic() >= self._proxima_sincronizacion:
+            self.sincronizar(db)
+        exp = self._revocados.get(jti)
+        return exp is not None and exp > time.time()
+
+    def sincronizar(self, db):
+        """
+        Trae las revocaciones nuevas y descarta de memoria las ya expiradas.
+        """
+        with self._lock:
+            ahora = time.time()
+            query = db.query(TokenRevocado.jti, TokenRevocado.expira, TokenRevocado.fecha_revocacion).filter(
+                TokenRevocado.expira > _fecha_desde_exp(ahora)
+            )
+            if self._ultima_revocacion is not None:
+                # La marca sale de la base, así que no depende del reloj de este proceso
+                query = query.filter(TokenRevocado.fecha_revocacion >= self._ultima_revocacion - timedelta(
+                    seconds=self.margen_sincronizacion
+                ))
+            for fila in query.all():
+                self._revocados[fila.jti] = fila.expira.replace(tzinfo=timezone.utc).timestamp()
+                if fila.fecha_revocacion and (self._ultima_revocacion is None
+                                              or fila.fecha_revocacion > self._ultima_revocacion):
+                    self._ultima_revocacion = fila.fecha_revocacion
+            for jti in [j for j, exp in self._revocados.items() if exp <= ahora]:
+                del self._revocados[jti]
+            self._proxima_sincronizacion = time.monotonic() + self.intervalo_sincronizacion
+
+    def revocar(self, db, claims):
+        """
+        Revoca el token descrito por sus claims y purga de la tabla los tokens ya expirados.
+        Retorna False si el token ya estaba revocado, por ejemplo por otra solicitud concurrente.
+        """
+        jti = claims['jti']
+        exp = claims['exp']
+        db.query(TokenRevocado).filter(
+            TokenRevocado.expira <= _fecha_desde_exp(time.time())
+        ).delete(synchronize_session=False)
+        db.add(TokenRevocado(
+            jti=jti,
+            tipo=claims.get('type', 'access'),
+            usuario_id=int(claims['sub']) if claims.get('sub') else None,
+            expira=_fecha_desde_exp(exp)
+        ))
+        try:
+            db.commit()
+            revocado = True
+        except IntegrityError:
+            # Ya estaba revocado
+            db.rollback()
+            revocado = False
+        with self._lock:
+            self._revocados[jti] = exp
+        if revocado:
+            logger.info(f"Token revocado ({claims.get('type')}) para usuario ID: {claims.get('sub')}")
+        return revocado
+
+# Instancia compartida por la aplicación
+revocacion_tokens = RevocacionTokens(
+    intervalo_sincronizacion=float(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', 5)),
+    margen_sincronizacion=float(os.getenv('TOKEN_REVOCATION_SYNC_MARGIN_SECONDS', 60))
+)
@@ -2,6 +2,9 @@
 from datetime import datetime
 from models.torneo_model import Torneo
 from models.usuario_model import Usuario
+from models.notificacion_model import Notificacion
+from services.paginacion import paginar
+from services.inscripcion_service import cache_rosters
 
 class TorneoService:
     def __init__(self, db_session):
@@ -10,8 +13,11 @@ class TorneoService:
         """
         self.db = db_session
 
-    def listar_torneos(self):
-        return self.db.query(Torneo).all()
+    def listar_torneos(self, limit=None, after=None, fields=None):
+        """
+        Lista torneos paginados por id (keyset). Con fields retorna solo esas columnas.
+        """
+        return paginar(self.db.query(Torneo), Torneo, limit, after, fields)
 
     def obtener_torneo(self, torneo_id):
         return self.db.query(Torneo).filter(Torneo.id == torneo_id).first()
@@ -97,8 +103,11 @@ class TorneoService:
         if usuario_perfil != 'administrador' and torneo.profesor_id != usuario_id:
             raise ValueError("No tienes permisos para eliminar este torneo")
 
+        # ON DELETE CASCADE solo actúa con PRAGMA foreign_keys=ON en SQLite
+        self.db.query(Notificacion).filter(Notificacion.torneo_id == torneo_id).delete(synchronize_session=False)
         self.db.delete(torneo)
         self.db.commit()
+        cache_rosters.invalidar(torneo_id)
         return torneo
 
     def listar_torneos_abiertos(self):
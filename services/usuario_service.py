@@ -1,12 +1,24 @@
 # services/usuario_service.py
+import os
 from models.usuario_model import Usuario
+from services.paginacion import paginar
+from services.cache import CacheLRU
+
+# Usuarios serializados (as_dict) por id, para respuestas como /auth/me
+cache_usuarios = CacheLRU(
+    max_items=int(os.getenv('USER_CACHE_MAX_ITEMS', 1024)),
+    ttl=float(os.getenv('USER_CACHE_TTL', 300))
+)
 
 class UsuarioService:
     def __init__(self, db_session):
         self.db = db_session
 
-    def listar_usuarios(self):
-        return self.db.query(Usuario).all()
+    def listar_usuarios(self, limit=None, after=None, fields=None):
+        """
+        Lista usuarios paginados por id (keyset). Con fields retorna solo esas columnas.
+        """
+        return paginar(self.db.query(Usuario), Usuario, limit, after, fields)
 
     def listar_usuarios_por_perfil(self, perfil):
         return self.db.query(Usuario).filter(
@@ -23,6 +35,17 @@ class UsuarioService:
     def obtener_usuario(self, usuario_id):
         return self.db.query(Usuario).filter(Usuario.id == usuario_id).first()
 
+    def obtener_usuarios_por_ids(self, usuario_ids):
+        """
+        Obtiene varios usuarios con una sola consulta IN.
+        Retorna un diccionario id -> Usuario; los ids nulos o inexistentes se omiten.
+        """
+        ids = {usuario_id for usuario_id in usuario_ids if usuario_id is not None}
+        if not ids:
+            return {}
+        usuarios = self.db.query(Usuario).filter(Usuario.id.in_(ids)).all()
+        return {usuario.id: usuario for usuario in usuarios}
+
     def obtener_usuario_por_email(self, email):
         return self.db.query(Usuario).filter(Usuario.email == email).first()
 
@@ -96,6 +119,7 @@ class UsuarioService:
                 usuario.activo = data['activo']
 
         self.db.commit()
+        cache_usuarios.invalidar(usuario.id)
         return usuario
 
     def eliminar_usuario(self, usuario_id, usuario_eliminador_id, usuario_eliminador_perfil):
@@ -117,6 +141,7 @@ class UsuarioService:
         # En lugar de eliminar, desactivar el usuario
         usuario.activo = False
         self.db.commit()
+        cache_usuarios.invalidar(usuario.id)
         return True
 
     def activar_usuario(self, usuario_id, usuario_activador_perfil):
@@ -133,4 +158,5 @@ class UsuarioService:
 
         usuario.activo = True
         self.db.commit()
+        cache_usuarios.invalidar(usuario.id)
         return usuario